@@ -0,0 +1,235 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+
+from .events import meeting_code
+
+try:
+    import psutil
+except ImportError:  # Only the bot budget is enforced without psutil
+    psutil = None
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# How often a queue held back by host load (rather than the budget) is looked at again
+RECHECK_SECONDS = 5
+
+# Bots admitted this recently have not reached their working set yet; host memory is
+# projected with MEET_BOT_EXPECTED_MB for each of them
+WARMUP_SECONDS = 30
+
+
+class Admission:
+    """One request to run a bot: waiting, admitted, or merged into the bot already on that meeting."""
+
+    def __init__(self, meeting, job_id, start_at, notify=None, merged_into=None):
+        self.meeting = meeting
+        self.job_id = job_id
+        self.start_at = start_at
+        self.notify = notify
+        self.merged_into = merged_into
+        self.requested_at = time.monotonic()
+        self.admitted_at = self.requested_at if merged_into is not None else None
+        self.released = False
+
+    @property
+    def wait_seconds(self):
+        """Time spent waiting for admission (so far, while still waiting)."""
+        return (self.admitted_at or time.monotonic()) - self.requested_at
+
+
+class AdmissionController:
+    """
+    Process-wide gate in front of bot launches.
+
+    At most ``budget`` bots run at once, and while any run a new one is only
+    admitted if host memory (counting bots still warming up) and CPU are
+    below their limits. A join for a meeting code that already has a bot,
+    running or waiting, is merged into it instead of launching a second
+    browser. Waiting requests are admitted in start time order.
+    """
+
+    def __init__(self, budget=None, max_memory_percent=None, max_cpu_percent=None):
+        self.budget = budget or getattr(settings, 'MEET_BOT_MAX_BOTS', 4)
+        self.max_memory_percent = max_memory_percent or getattr(settings, 'MEET_BOT_MAX_MEMORY_PERCENT', 85)
+        self.max_cpu_percent = max_cpu_percent or getattr(settings, 'MEET_BOT_MAX_CPU_PERCENT', 90)
+        self.expected_mb = getattr(settings, 'MEET_BOT_EXPECTED_MB', 400)
+        self._lock = threading.Lock()
+        self._heap = []  # (start timestamp, sequence, admission)
+        self._sequence = itertools.count()
+        self._live = []
+        self._by_meeting = {}  # meeting code -> waiting or live admission
+        self._waits = deque(maxlen=100)  # seconds waited by recent admissions
+        self._timer = None
+
+    @staticmethod
+    def _host_load():
+        """(memory percent, CPU percent, total memory in MB) of the host, all None without psutil."""
+        if psutil is None:
+            return None, None, None
+        memory = psutil.virtual_memory()
+        return memory.percent, psutil.cpu_percent(interval=None), memory.total / (1024 * 1024)
+
+    def _has_room(self, load):
+        if len(self._live) >= self.budget:
+            return False
+        memory, cpu, total_mb = load
+        # A single bot always runs, whatever else loads the host
+        if not self._live or memory is None:
+            return True
+
+        now = time.monotonic()
+        warming = sum(1 for admission in self._live if now - admission.admitted_at < WARMUP_SECONDS)
+        projected = memory + warming * self.expected_mb * 100 / total_mb
+        return projected < self.max_memory_percent and cpu < self.max_cpu_percent
+
+    def _recheck(self):
+        with self._lock:
+            self._timer = None
+        self._dispatch()
+
+    def _dispatch(self):
+        admitted = []
+        with self._lock:
+            load = self._host_load() if self._heap else None
+            while self._heap:
+                admission = self._heap[0][2]
+                if admission.released:
+                    heapq.heappop(self._heap)
+                    continue
+                if not self._has_room(load):
+                    break
+                heapq.heappop(self._heap)
+                admission.admitted_at = time.monotonic()
+                self._live.append(admission)
+                self._waits.append(admission.wait_seconds)
+                admitted.append(admission)
+
+            if self._heap and len(self._live) < self.budget and self._timer is None:
+                # Held back by host load, which no release may ever signal
+                self._timer = threading.Timer(RECHECK_SECONDS, self._recheck)
+                self._timer.daemon = True
+                self._timer.start()
+
+        for admission in admitted:
+            logger.info(f"Admitted bot for {admission.meeting} (job {admission.job_id}) "
+                        f"after {admission.wait_seconds:.1f}s")
+            admission.notify()
+
+    def _request(self, meet_link, job_id, start_at, notify):
+        code = meeting_code(meet_link)
+        with self._lock:
+            primary = self._by_meeting.get(code)
+            if primary is not None and not primary.released:
+                logger.info(f"Merged job {job_id} into the bot for {code} (job {primary.job_id})")
+                return Admission(code, job_id, start_at, merged_into=primary)
+
+            admission = Admission(code, job_id, start_at, notify)
+            self._by_meeting[code] = admission
+            order = start_at.timestamp() if start_at is not None else time.time()
+            heapq.heappush(self._heap, (order, next(self._sequence), admission))
+        self._dispatch()
+        return admission
+
+    def admit(self, meet_link, job_id=None, start_at=None):
+        """
+        Block until a bot may be launched for ``meet_link``.
+
+        Returns:
+            Admission: Release it when the bot is done; when ``merged_into``
+            is set another bot already covers the meeting and none should
+            be launched
+        """
+        ready = threading.Event()
+        admission = self._request(meet_link, job_id, start_at, ready.set)
+        if admission.merged_into is None:
+            ready.wait()
+        return admission
+
+    async def admit_async(self, meet_link, job_id=None, start_at=None):
+        """``admit`` for coroutines; waiting does not block the event loop."""
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+
+        def notify():
+            loop.call_soon_threadsafe(lambda: ready.done() or ready.set_result(None))
+
+        admission = self._request(meet_link, job_id, start_at, notify)
+        if admission.merged_into is None:
+            try:
+                await ready
+            except asyncio.CancelledError:
+                self.release(admission)
+                raise
+        return admission
+
+    def release(self, admission):
+        """Free the slot of a finished bot, or withdraw a request still waiting."""
+        with self._lock:
+            if admission.released or admission.merged_into is not None:
+                return
+            admission.released = True
+            if admission in self._live:
+                self._live.remove(admission)
+            if self._by_meeting.get(admission.meeting) is admission:
+                del self._by_meeting[admission.meeting]
+        self._dispatch()
+
+    def available(self, reserved=0):
+        """
+        How many more bots could start right now; bot workers claim no more jobs than this.
+
+        Args:
+            reserved (int): Jobs already accepted that have not asked for admission yet
+        """
+        with self._lock:
+            waiting = sum(1 for _, _, admission in self._heap if not admission.released)
+            free = self.budget - len(self._live) - waiting - reserved
+            if free > 0 and not self._has_room(self._host_load()):
+                return 0
+            return max(0, free)
+
+    def stats(self):
+        """Live and waiting bots, host load and recent admission waits."""
+        with self._lock:
+            waiting = sorted(
+                (entry for entry in self._heap if not entry[2].released), key=lambda entry: entry[:2]
+            )
+            live = len(self._live)
+            waits = list(self._waits)
+        memory, cpu, _ = self._host_load()
+
+        def iso(value):
+            return value.astimezone(dt_timezone.utc).isoformat() if value else None
+
+        return {
+            "budget": self.budget,
+            "live": live,
+            "memory_percent": memory,
+            "cpu_percent": cpu,
+            "waiting": [
+                {
+                    "job_id": admission.job_id,
+                    "meeting": admission.meeting,
+                    "start_at": iso(admission.start_at),
+                    "waiting_seconds": round(admission.wait_seconds, 1),
+                }
+                for _, _, admission in waiting
+            ],
+            "recent_waits": {
+                "count": len(waits),
+                "average_seconds": round(sum(waits) / len(waits), 1) if waits else None,
+                "max_seconds": round(max(waits), 1) if waits else None,
+            },
+        }
+
+
+admission_controller = AdmissionController()
@@ -0,0 +1,85 @@
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .admission import admission_controller
+from .events import meeting_code
+from .meeting_jobs import WORKER_ID, MeetingJobRunner, job_lease
+from .models import MeetingJob
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+
+class BotWorker:
+    """
+    Pulls queued MeetingJobs from the database and runs them, one host of many.
+
+    Each poll re-queues jobs whose lease expired (their worker crashed or
+    lost the database), then claims as many due jobs as there are free
+    slots, as limited by the runner and by admission control. Claimed jobs
+    run on a MeetingJobRunner, whose heartbeat renews their leases and
+    stops the bot of a job that was cancelled or taken over; its writes are
+    fenced off by worker id anyway.
+
+    A claimed job whose meeting already has a bot on any host is merged
+    into that bot's job; it is re-queued if that bot fails or leaves before
+    the job's start.
+    """
+
+    def __init__(self, max_concurrent=None, poll_interval=None):
+        self.runner = MeetingJobRunner(max_concurrent)
+        self.poll_interval = poll_interval or getattr(settings, 'MEETING_QUEUE_POLL_SECONDS', 2)
+        self.lease = job_lease()
+        self.max_attempts = getattr(settings, 'MEETING_QUEUE_MAX_ATTEMPTS', 3)
+        # Jobs are claimed this far ahead of their start so the browser is prewarmed in time
+        self.lead = timedelta(seconds=getattr(settings, 'MEETING_PREWARM_SECONDS', 60))
+        self._stop = threading.Event()
+
+    def poll(self):
+        """Re-queue expired leases and claim due jobs for the free slots."""
+        requeued, failed = MeetingJob.requeue_expired(self.max_attempts)
+        if requeued or failed:
+            logger.warning(f"Re-queued {requeued} meeting jobs with expired leases, failed {failed}")
+
+        requeued = MeetingJob.requeue_merged()
+        if requeued:
+            logger.info(f"Re-queued {len(requeued)} merged meeting jobs whose covering bot is gone")
+
+        # Jobs this host cannot launch soon are left for other workers; claimed jobs still
+        # sleeping until their prewarm lead will need admission too
+        free = min(
+            self.runner.max_concurrent - len(self.runner.running()),
+            admission_controller.available(self.runner.awaiting_admission()),
+        )
+        if free <= 0:
+            return
+        for job in MeetingJob.claim(WORKER_ID, free, timezone.now() + self.lead, self.lease):
+            # Admission control only sees this process; check bots on other hosts as well
+            primary = MeetingJob.merge_into_active(job, meeting_code(job.meet_link))
+            if primary is not None:
+                logger.info(f"Merged meeting job {job.pk} into job {primary.pk} on {primary.worker_id}")
+                continue
+            logger.info(f"Claimed meeting job {job.pk} for {job.meet_link} (attempt {job.attempts})")
+            self.runner.start(job, job.scheduled_at)
+
+    def run_forever(self):
+        """Poll until ``stop()`` is called."""
+        logger.info(f"Bot worker {WORKER_ID} started (poll every {self.poll_interval}s, "
+                    f"lease {self.lease}, {self.runner.max_concurrent} concurrent meetings)")
+
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Bot worker poll failed: {e}")
+            finally:
+                close_old_connections()
+            self._stop.wait(self.poll_interval)
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,287 @@
+import json
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.request
+
+from django.conf import settings
+
+from .playwright_google_meet import PRODUCTION_LAUNCH_ARGS, production_mode
+
+try:
+    import psutil
+except ImportError:  # Memory based recycling is skipped without psutil
+    psutil = None
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Flags matching what GoogleMeetAutomation passes to chromium.launch(), plus the
+# --no-sandbox Playwright adds itself (Chromium refuses to start sandboxed as root)
+CHROMIUM_ARGS = [
+    '--no-sandbox',
+    '--use-fake-ui-for-media-stream',  # Auto-allow camera/mic permissions
+    '--no-first-run',
+    '--no-default-browser-check',
+]
+
+# Pooled browsers are started without Playwright, so production mode asks for new headless itself
+PRODUCTION_HEADLESS_ARGS = ['--headless=new']
+
+# Seconds to wait for a freshly launched Chromium to open its DevTools endpoint
+LAUNCH_TIMEOUT = 30
+
+# Last bytes of Chromium's stderr quoted when it fails to start
+STDERR_TAIL_BYTES = 2000
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _chromium_executable(default=None):
+    """
+    Chromium binary to run: BROWSER_POOL_CHROMIUM_PATH or ``default``.
+
+    Callers pass their Playwright's ``chromium.executable_path``; starting
+    a second Playwright here would fail on a thread already running one.
+    """
+    path = getattr(settings, 'BROWSER_POOL_CHROMIUM_PATH', None) or default
+    if not path:
+        raise RuntimeError("No Chromium executable: set BROWSER_POOL_CHROMIUM_PATH")
+    return path
+
+
+class PooledBrowser:
+    """One long-lived Chromium process, reachable over the DevTools protocol."""
+
+    def __init__(self, executable, production=False):
+        self.port = _free_port()
+        self.user_data_dir = tempfile.mkdtemp(prefix='meet-bot-chromium-')
+        args = [executable, f'--remote-debugging-port={self.port}', f'--user-data-dir={self.user_data_dir}']
+        if production:
+            args += PRODUCTION_HEADLESS_ARGS + PRODUCTION_LAUNCH_ARGS
+        # stderr goes to a file: a pipe nobody reads would eventually block Chromium
+        self.stderr_path = os.path.join(self.user_data_dir, 'chromium-stderr.log')
+        with open(self.stderr_path, 'wb') as stderr:
+            self.process = subprocess.Popen(args + CHROMIUM_ARGS, stdout=subprocess.DEVNULL, stderr=stderr)
+        self.uses = 0
+        self.active = 0
+        self.retiring = False
+        self.endpoint = self._wait_for_endpoint()
+
+    def _wait_for_endpoint(self):
+        deadline = time.monotonic() + LAUNCH_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                break
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{self.port}/json/version', timeout=1) as response:
+                    return json.load(response)['webSocketDebuggerUrl']
+            except (OSError, ValueError, KeyError):
+                time.sleep(0.1)
+
+        code = self.process.poll()
+        stderr = self._stderr_tail()
+        self.terminate()
+        if code is not None:
+            raise RuntimeError(f"Chromium exited with code {code} before opening its DevTools endpoint: {stderr}")
+        raise RuntimeError(f"Chromium did not open its DevTools endpoint on port {self.port} "
+                           f"within {LAUNCH_TIMEOUT}s: {stderr}")
+
+    def _stderr_tail(self):
+        try:
+            with open(self.stderr_path, 'rb') as stderr:
+                stderr.seek(0, os.SEEK_END)
+                stderr.seek(max(0, stderr.tell() - STDERR_TAIL_BYTES))
+                return stderr.read().decode(errors='replace').strip() or '(no output)'
+        except OSError:
+            return '(no output)'
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def rss_mb(self):
+        """Resident memory of the whole Chromium process tree, or None without psutil."""
+        if psutil is None:
+            return None
+        try:
+            root = psutil.Process(self.process.pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return 0.0
+
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.NoSuchProcess:
+                pass
+        return total / (1024 * 1024)
+
+    def terminate(self):
+        try:
+            self.process.terminate()
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        except Exception as e:
+            logger.error(f"Error stopping Chromium on port {self.port}: {e}")
+        shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+
+class BrowserLease:
+    """
+    A pooled browser handed to one meeting; connect to ``endpoint`` and create a context on it.
+
+    An ``overflow`` browser was launched outside the pool because none
+    became available in time; it is stopped when the lease is returned.
+    """
+
+    def __init__(self, browser, overflow=False):
+        self.browser = browser
+        self.endpoint = browser.endpoint
+        self.overflow = overflow
+
+
+class BrowserPool:
+    """
+    Small pool of long-lived Chromium processes shared by all meetings.
+
+    Each meeting leases a browser, connects to it over CDP from its own
+    thread (Playwright's sync API objects cannot cross threads) and opens an
+    isolated ``BrowserContext`` on it, so concurrent meetings share one
+    process tree instead of launching their own. A browser is retired once
+    it has served ``max_uses`` contexts or its memory exceeds
+    ``max_rss_mb``; it is stopped when its last lease is returned and a
+    fresh one is launched on demand.
+
+    No more than ``size`` Chromium processes run at once, retiring ones
+    included. A lease that finds none to share waits up to ``wait_timeout``
+    for one, then launches a browser of its own outside the pool.
+    """
+
+    def __init__(self, size=None, max_uses=None, max_rss_mb=None, production=None, wait_timeout=None):
+        self.size = size if size is not None else getattr(settings, 'BROWSER_POOL_SIZE', 2)
+        self.max_uses = max_uses or getattr(settings, 'BROWSER_POOL_MAX_USES', 20)
+        self.max_rss_mb = max_rss_mb or getattr(settings, 'BROWSER_POOL_MAX_RSS_MB', 2048)
+        self.wait_timeout = wait_timeout or getattr(settings, 'BROWSER_POOL_WAIT_SECONDS', 60)
+        self.production = production
+        self._browsers = []
+        self._launching = 0
+        self._lock = threading.Lock()
+        # Signalled whenever a launch ends or a browser is released or stopped
+        self._changed = threading.Condition(self._lock)
+
+    @property
+    def enabled(self):
+        return self.size > 0
+
+    def _launch(self, executable_path):
+        started = time.monotonic()
+        browser = PooledBrowser(_chromium_executable(executable_path), production=production_mode(self.production))
+        logger.info(f"Launched pooled Chromium on port {browser.port} in {time.monotonic() - started:.2f}s")
+        return browser
+
+    def _should_retire(self, browser):
+        if not browser.alive() or browser.uses >= self.max_uses:
+            return True
+        rss = browser.rss_mb()
+        return rss is not None and rss > self.max_rss_mb
+
+    def lease(self, executable_path=None):
+        """
+        Lease the least busy live browser, launching one while the pool is below ``size``.
+
+        Args:
+            executable_path (str): Chromium to launch when BROWSER_POOL_CHROMIUM_PATH is not set,
+                normally the caller's ``playwright.chromium.executable_path``
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        with self._changed:
+            while True:
+                for browser in list(self._browsers):
+                    if not browser.retiring and self._should_retire(browser):
+                        self._retire(browser)
+
+                if len(self._browsers) + self._launching < self.size:
+                    self._launching += 1
+                    overflow = False
+                    break
+
+                candidates = [browser for browser in self._browsers if not browser.retiring]
+                if candidates:
+                    browser = min(candidates, key=lambda candidate: candidate.active)
+                    browser.uses += 1
+                    browser.active += 1
+                    return BrowserLease(browser)
+
+                # Every slot is taken by a browser still starting or retiring
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(f"No pooled browser available after {self.wait_timeout}s, "
+                                   f"launching one outside the pool")
+                    overflow = True
+                    break
+                self._changed.wait(remaining)
+
+        # Launching takes seconds; other meetings keep leasing the running browsers meanwhile
+        browser = None
+        try:
+            browser = self._launch(executable_path)
+        finally:
+            with self._changed:
+                if not overflow:
+                    self._launching -= 1
+                if browser is not None:
+                    browser.uses += 1
+                    browser.active += 1
+                    if not overflow:
+                        self._browsers.append(browser)
+                self._changed.notify_all()
+        return BrowserLease(browser, overflow)
+
+    def release(self, lease):
+        """Return a lease; stops its browser if it was retired (or launched for overflow) and is now idle."""
+        browser = lease.browser
+        if lease.overflow:
+            browser.terminate()
+            return
+
+        with self._changed:
+            browser.active -= 1
+            if not browser.retiring and self._should_retire(browser):
+                self._retire(browser)
+            elif browser.retiring and browser.active <= 0:
+                self._stop(browser)
+            self._changed.notify_all()
+
+    def _retire(self, browser):
+        rss = browser.rss_mb()
+        logger.info(f"Retiring pooled Chromium on port {browser.port} after {browser.uses} uses"
+                    + (f" ({rss:.0f} MB)" if rss is not None else ""))
+        browser.retiring = True
+        if browser.active <= 0:
+            self._stop(browser)
+
+    def _stop(self, browser):
+        browser.terminate()
+        if browser in self._browsers:
+            self._browsers.remove(browser)
+        self._changed.notify_all()
+
+    def close(self):
+        """Stop every pooled browser."""
+        with self._lock:
+            for browser in list(self._browsers):
+                self._stop(browser)
+
+
+browser_pool = BrowserPool()
@@ -0,0 +1,91 @@
+import fcntl
+import logging
+import os
+import re
+import shutil
+
+from django.conf import settings
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Cache directories dropped when a profile grows past its size limit. Cookies and
+# other profile state are kept; the caches simply warm up again on the next join.
+CACHE_DIRS = [
+    os.path.join('Default', 'Cache'),
+    os.path.join('Default', 'Code Cache'),
+    os.path.join('Default', 'GPUCache'),
+    os.path.join('Default', 'Service Worker', 'CacheStorage'),
+    'ShaderCache',
+    'GrShaderCache',
+]
+
+
+def profiles_root():
+    return getattr(settings, 'MEET_BOT_PROFILE_DIR', os.path.join(settings.BASE_DIR, '.browser_profiles'))
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class BrowserProfile:
+    """
+    A per-account Chromium profile directory held under an exclusive lock.
+
+    Chromium refuses to share a user data dir between processes, so every
+    concurrent meeting of an account gets its own slot directory; the lock
+    file next to it keeps other bots (in this or any other process) out until
+    ``release()``.
+    """
+
+    def __init__(self, path, lock_file):
+        self.path = path
+        self._lock_file = lock_file
+
+    def release(self):
+        """Prune the caches if the profile grew too large, then unlock it."""
+        try:
+            max_mb = getattr(settings, 'MEET_BOT_PROFILE_MAX_MB', 500)
+            size_mb = _dir_size(self.path) / (1024 * 1024)
+            if size_mb > max_mb:
+                logger.info(f"Profile {self.path} is {size_mb:.0f} MB (limit {max_mb} MB), clearing its caches")
+                for cache_dir in CACHE_DIRS:
+                    shutil.rmtree(os.path.join(self.path, cache_dir), ignore_errors=True)
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+
+
+def acquire_profile(account='', slots=None):
+    """
+    Lock a free profile slot of ``account``.
+
+    Returns:
+        BrowserProfile: The locked profile, or None when all ``slots`` are in use
+    """
+    slots = slots or getattr(settings, 'MEET_BOT_PROFILE_SLOTS', 2)
+    account_dir = os.path.join(profiles_root(), re.sub(r'[^\w.@-]', '_', account) or 'default')
+    os.makedirs(account_dir, exist_ok=True)
+
+    for slot in range(slots):
+        lock_file = open(os.path.join(account_dir, f'{slot}.lock'), 'w')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            continue
+
+        path = os.path.join(account_dir, str(slot))
+        os.makedirs(path, exist_ok=True)
+        return BrowserProfile(path, lock_file)
+
+    logger.info(f"All {slots} browser profiles of '{account or 'default'}' are in use")
+    return None
@@ -0,0 +1,134 @@
+import json
+import logging
+import os
+import threading
+
+import google_auth_httplib2
+import httplib2
+from django.conf import settings
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+DISCOVERY_URL = 'https://www.googleapis.com/discovery/v1/apis/calendar/v3/rest'
+
+# Socket timeout for the pooled Calendar API transport, in seconds
+HTTP_TIMEOUT = 30
+
+_discovery_document = None
+_discovery_lock = threading.Lock()
+
+
+def _discovery_cache_file():
+    cache_dir = getattr(settings, 'CALENDAR_DISCOVERY_CACHE_DIR', os.path.join(settings.BASE_DIR, '.discovery_cache'))
+    return os.path.join(cache_dir, 'calendar.v3.json')
+
+
+def get_discovery_document():
+    """
+    Return the parsed Calendar v3 discovery document, loading it once per process.
+
+    Uses the copy bundled with google-api-python-client; if that is missing, a
+    disk cache is used and only populated from the network the very first time.
+    """
+    global _discovery_document
+
+    with _discovery_lock:
+        if _discovery_document is not None:
+            return _discovery_document
+
+        content = discovery_cache.get_static_doc('calendar', 'v3')
+        if content is None:
+            cache_file = _discovery_cache_file()
+            if os.path.exists(cache_file):
+                with open(cache_file, 'r', encoding='utf-8') as file:
+                    content = file.read()
+            else:
+                logger.info(f"No bundled discovery document, fetching {DISCOVERY_URL}")
+                response, body = httplib2.Http(timeout=HTTP_TIMEOUT).request(DISCOVERY_URL)
+                if response.status != 200:
+                    raise RuntimeError(f"Failed to fetch discovery document: HTTP {response.status}")
+                content = body.decode('utf-8')
+                os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+                with open(cache_file, 'w', encoding='utf-8') as file:
+                    file.write(content)
+
+        _discovery_document = json.loads(content)
+        return _discovery_document
+
+
+def authorized_http(credentials):
+    """Return a keep-alive HTTP transport that signs requests with ``credentials``."""
+    return google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+
+
+def build_calendar_service(credentials, http=None):
+    """Build an uncached Calendar v3 resource from the in-memory discovery document."""
+    return build_from_document(get_discovery_document(), http=http or authorized_http(credentials))
+
+
+class _CachedService:
+    """Cache entry for one account. httplib2 is not thread-safe, so each thread gets its own transport."""
+
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.local = threading.local()
+
+
+class CalendarServiceCache:
+    """
+    Process-level cache of built Calendar API resources, keyed by account.
+
+    Each entry reuses a keep-alive ``httplib2.Http`` transport and a resource
+    built from the in-memory discovery document, so no discovery fetch or
+    parse happens per call. An entry is dropped when the account's refresh
+    token or client changes; a new access token for the same grant is simply
+    swapped into the existing transport.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _fingerprint(credentials):
+        return credentials.client_id, credentials.refresh_token
+
+    def get(self, credentials, account='default'):
+        """Return a Calendar v3 resource for ``account`` authorised with ``credentials``."""
+        fingerprint = self._fingerprint(credentials)
+
+        with self._lock:
+            entry = self._entries.get(account)
+            if entry is None or entry.fingerprint != fingerprint:
+                if entry is not None:
+                    logger.info(f"Credentials rotated for account '{account}', rebuilding Calendar service")
+                entry = _CachedService(fingerprint)
+                self._entries[account] = entry
+
+        local = entry.local
+        if getattr(local, 'service', None) is None:
+            local.http = authorized_http(credentials)
+            local.service = build_calendar_service(credentials, local.http)
+        elif local.http.credentials is not credentials:
+            local.http.credentials = credentials
+
+        return local.service
+
+    def invalidate(self, account=None):
+        """Drop the cached service for ``account``, or every account when None."""
+        with self._lock:
+            if account is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(account, None)
+
+
+service_cache = CalendarServiceCache()
+
+
+def get_calendar_service(credentials, account='default'):
+    """Return a cached Calendar v3 resource for the given credentials."""
+    return service_cache.get(credentials, account)
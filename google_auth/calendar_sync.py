@@ -0,0 +1,514 @@
+import csv
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time
+
+import pytz
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from googleapiclient.errors import HttpError
+
+from .calendar_service import get_calendar_service
+from .models import CalendarSyncState, Meeting, OAuthToken, parse_calendar_ids
+from .recurrence import reset_master
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Largest page size accepted by events.list
+PAGE_SIZE = 250
+
+# Calendars of one account fetched concurrently
+FETCH_WORKERS = getattr(settings, 'CALENDAR_FETCH_WORKERS', 8)
+
+# Number of meetings written per bulk upsert
+WRITE_BATCH_SIZE = 500
+
+# Events of one calendar read ahead of the merge; its fetch pauses while this many are waiting
+PREFETCH_EVENTS = 2 * PAGE_SIZE
+
+# Columns of the optional meeting_invites.csv export
+CSV_HEADERS = ['Summary', 'Start Time', 'End Time', 'Meet Link', 'Conference URI']
+
+# Partial-response mask: only the event fields the extractor actually reads
+EVENT_FIELDS = (
+    'nextPageToken,nextSyncToken,'
+    'items(id,etag,status,summary,start,end,hangoutLink,conferenceData/entryPoints,'
+    'recurrence,recurringEventId,originalStartTime)'
+)
+
+
+class SyncTokenExpired(Exception):
+    """Raised when Google rejects a stored sync token (HTTP 410 Gone)."""
+
+
+class EventStream:
+    """
+    Lazily iterate over every event of an events.list query, one page at a time.
+
+    Only a single page is held in memory. Google returns nextSyncToken on the
+    final page only, so ``next_sync_token`` is set once the stream is exhausted.
+    """
+
+    def __init__(self, service, fields=EVENT_FIELDS, **params):
+        self.service = service
+        self.params = dict(params, maxResults=PAGE_SIZE, fields=fields)
+        self.next_sync_token = None
+        self.pages_fetched = 0
+
+    def __iter__(self):
+        page_token = None
+
+        while True:
+            params = dict(self.params, pageToken=page_token) if page_token else self.params
+            try:
+                response = self.service.events().list(**params).execute()
+            except HttpError as e:
+                if e.resp.status == 410:
+                    raise SyncTokenExpired(str(e))
+                raise
+            self.pages_fetched += 1
+
+            for event in response.get('items', []):
+                yield event
+
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                self.next_sync_token = response.get('nextSyncToken')
+                return
+
+
+def expand_recurrence_locally():
+    """Whether recurring series are fetched as masters and expanded here instead of by the API."""
+    return getattr(settings, 'CALENDAR_EXPAND_RECURRENCE_LOCALLY', False)
+
+
+def full_sync(service, calendar_id='primary', single_events=True):
+    """Return an EventStream over every upcoming event on the calendar."""
+    now = datetime.now(pytz.UTC)
+    logger.info(f"Full sync of calendar '{calendar_id}' for events after {now}")
+    return EventStream(
+        service,
+        calendarId=calendar_id,
+        timeMin=now.isoformat(),
+        singleEvents=single_events,
+    )
+
+
+def incremental_sync(service, sync_token, calendar_id='primary', single_events=True):
+    """Return an EventStream over the events changed or cancelled since ``sync_token``."""
+    logger.info(f"Incremental sync of calendar '{calendar_id}'")
+    return EventStream(
+        service,
+        calendarId=calendar_id,
+        syncToken=sync_token,
+        singleEvents=single_events,
+    )
+
+
+class CalendarSync:
+    """
+    Stream calendar changes, using the stored sync token when one exists.
+
+    Iterating yields raw event resources (cancelled ones included, with
+    ``status == 'cancelled'``). Falls back to a full resync when there is no
+    token yet, Google rejects the stored one, or the token was obtained in the
+    other recurrence mode (see CALENDAR_EXPAND_RECURRENCE_LOCALLY). With local
+    expansion, recurring series arrive as masters carrying their RRULE/EXDATE
+    lines instead of one resource per occurrence. Call ``commit()`` once every
+    event has been written so the new nextSyncToken is only persisted after
+    the changes it covers are safely stored. A full resync records the ids
+    it returned in ``seen_ids`` (see ``cancel_unseen``).
+
+    Args:
+        service: Calendar API resource returned by ``googleapiclient.discovery.build``
+        calendar_id (str): Calendar to synchronise
+        account (str): Account the calendar is read as (sync tokens are per account)
+    """
+
+    def __init__(self, service, calendar_id='primary', account=''):
+        self.service = service
+        self.calendar_id = calendar_id
+        self.account = account
+        self.state, _ = CalendarSyncState.objects.get_or_create(account=account, calendar_id=calendar_id)
+        self.single_events = not expand_recurrence_locally()
+        self.full_sync = not self.state.sync_token or self.state.single_events != self.single_events
+        self.stream = None
+        self.changed_count = 0
+        self.cancelled_count = 0
+        self.seen_ids = set()
+
+    def __iter__(self):
+        if not self.full_sync:
+            self.stream = incremental_sync(self.service, self.state.sync_token, self.calendar_id,
+                                           self.single_events)
+            try:
+                for event in self._count(self.stream):
+                    yield event
+                return
+            except SyncTokenExpired:
+                logger.warning(f"Sync token for calendar '{self.calendar_id}' expired. Running full resync.")
+                self.full_sync = True
+
+        self.seen_ids = set()
+        self.stream = full_sync(self.service, self.calendar_id, self.single_events)
+        for event in self._count(self.stream):
+            yield event
+
+    def _count(self, events):
+        for event in events:
+            if event.get('status') == 'cancelled':
+                self.cancelled_count += 1
+            else:
+                self.changed_count += 1
+                if self.full_sync:
+                    self.seen_ids.add(event['id'])
+            yield event
+
+    def commit(self):
+        """Persist the nextSyncToken obtained by a fully consumed stream."""
+        if self.stream is None or self.stream.next_sync_token is None:
+            logger.warning(f"Calendar '{self.calendar_id}' stream not fully consumed; sync token not updated")
+            return
+
+        self.state.sync_token = self.stream.next_sync_token
+        self.state.single_events = self.single_events
+        if self.full_sync:
+            self.state.last_full_sync = timezone.now()
+        self.state.save()
+        logger.info(
+            f"Calendar '{self.calendar_id}' sync finished: {self.changed_count} changed, "
+            f"{self.cancelled_count} cancelled in {self.stream.pages_fetched} page(s) "
+            f"(full sync: {self.full_sync})"
+        )
+
+
+def _parse_event_time(value):
+    """Convert an event start/end resource into an aware datetime (all-day events start at midnight UTC)."""
+    if not value:
+        return None
+    if value.get('dateTime'):
+        return parse_datetime(value['dateTime'])
+    if value.get('date'):
+        return pytz.UTC.localize(datetime.combine(parse_date(value['date']), time.min))
+    return None
+
+
+def event_to_meeting(event, calendar_id='primary', account=''):
+    """
+    Build an unsaved Meeting from a Calendar event resource, or None if it has no start time.
+
+    Cancelled instances of a recurring series carry only ``originalStartTime``,
+    which is used as their start so the cancellation can be stored.
+    """
+    start = event.get('start') or event.get('originalStartTime') or {}
+    start_time = _parse_event_time(start)
+    if start_time is None:
+        return None
+
+    return Meeting(
+        event_id=event['id'],
+        account=account,
+        calendar_id=calendar_id,
+        etag=event.get('etag', ''),
+        status=event.get('status', Meeting.STATUS_CONFIRMED),
+        summary=event.get('summary', 'No Title'),
+        start_time=start_time,
+        end_time=_parse_event_time(event.get('end')),
+        meet_link=event.get('hangoutLink', ''),
+        conference_uri=event.get('conferenceData', {}).get('entryPoints', [{}])[0].get('uri', ''),
+        time_zone=start.get('timeZone', ''),
+        all_day='date' in start and 'dateTime' not in start,
+        recurrence='\n'.join(event.get('recurrence', [])),
+        recurring_event_id=event.get('recurringEventId', ''),
+        is_generated=False,
+    )
+
+
+def _flush(batch):
+    Meeting.objects.bulk_create(
+        batch,
+        update_conflicts=True,
+        unique_fields=['account', 'event_id'],
+        update_fields=['calendar_id', 'etag', 'status', 'summary', 'start_time',
+                       'end_time', 'meet_link', 'conference_uri', 'time_zone', 'all_day',
+                       'recurrence', 'recurring_event_id', 'is_generated', 'expanded_until',
+                       'updated_at'],
+    )
+
+    # Recurring masters (local expansion mode): regenerate their occurrences
+    affected_ids = []
+    for meeting in batch:
+        if meeting.recurrence:
+            affected_ids.extend(reset_master(meeting))
+    return affected_ids
+
+
+def upsert_meetings(events, calendar_id='primary', account='', batch_size=WRITE_BATCH_SIZE):
+    """
+    Write a stream of Calendar events to the Meeting table with bulk upserts.
+
+    Active events are inserted or updated on (account, event id); cancelled
+    events (which Google sends without start/end) are marked cancelled in
+    place for this account only, and
+    cancelled instances of a recurring series are stored so local expansion
+    does not bring them back. Recurring masters get their occurrences
+    (re)generated up to the horizon. Only one batch is held in memory at a time.
+
+    Returns:
+        dict: ``upserted`` count, ``upserted_event_ids`` and ``cancelled_event_ids``
+    """
+    # Keyed by event id: PostgreSQL refuses to upsert the same row twice in one statement
+    batch = {}
+    upserted_ids = []
+    cancelled_ids = []
+
+    for event in events:
+        if event.get('status') == Meeting.STATUS_CANCELLED:
+            cancelled_ids.append(event['id'])
+            if not event.get('originalStartTime'):
+                continue
+
+        meeting = event_to_meeting(event, calendar_id, account)
+        if meeting is None:
+            logger.info(f"Skipping event without start time: {event.get('id')}")
+            continue
+
+        batch[meeting.event_id] = meeting
+        if len(batch) >= batch_size:
+            upserted_ids.extend(_flush(list(batch.values())))
+            upserted_ids.extend(batch)
+            batch = {}
+
+    if batch:
+        upserted_ids.extend(_flush(list(batch.values())))
+        upserted_ids.extend(batch)
+
+    generated_ids = []
+    for i in range(0, len(cancelled_ids), batch_size):
+        chunk = cancelled_ids[i:i + batch_size]
+        Meeting.objects.filter(account=account, event_id__in=chunk).update(
+            status=Meeting.STATUS_CANCELLED, updated_at=timezone.now()
+        )
+        # Occurrences generated from a cancelled recurring master
+        generated = Meeting.objects.filter(account=account, recurring_event_id__in=chunk, is_generated=True,
+                                           start_time__gt=timezone.now())
+        generated_ids.extend(generated.values_list('event_id', flat=True))
+        generated.update(status=Meeting.STATUS_CANCELLED, updated_at=timezone.now())
+
+    return {
+        "upserted": len(upserted_ids),
+        "upserted_event_ids": upserted_ids,
+        "cancelled_event_ids": cancelled_ids + generated_ids,
+    }
+
+
+def cancel_unseen(account, calendar_id, seen_ids, batch_size=WRITE_BATCH_SIZE):
+    """
+    Cancel the calendar's upcoming meetings (and live series) a full resync did not return.
+
+    A full resync lists live events only, so events deleted while the sync
+    token was invalid never arrive as cancelled; Google asks clients to
+    clear their store after 410 Gone. Locally generated occurrences follow
+    their vanished master.
+
+    Returns:
+        list: Event ids of the cancelled meetings
+    """
+    now = timezone.now()
+    candidates = (Meeting.objects.filter(account=account, calendar_id=calendar_id, is_generated=False)
+                  .exclude(status=Meeting.STATUS_CANCELLED)
+                  .filter(Q(start_time__gt=now) | ~Q(recurrence='')))
+    stale_ids = [event_id for event_id in candidates.values_list('event_id', flat=True).iterator()
+                 if event_id not in seen_ids]
+
+    cancelled_ids = list(stale_ids)
+    for i in range(0, len(stale_ids), batch_size):
+        chunk = stale_ids[i:i + batch_size]
+        Meeting.objects.filter(account=account, event_id__in=chunk).update(
+            status=Meeting.STATUS_CANCELLED, updated_at=now
+        )
+        generated = Meeting.objects.filter(account=account, recurring_event_id__in=chunk, is_generated=True,
+                                           start_time__gt=now)
+        cancelled_ids.extend(generated.values_list('event_id', flat=True))
+        generated.update(status=Meeting.STATUS_CANCELLED, updated_at=now)
+
+    if stale_ids:
+        logger.info(f"Full resync of calendar '{calendar_id}' cancelled {len(stale_ids)} meetings it no longer lists")
+    return cancelled_ids
+
+
+def sync_calendar_to_db(service, calendar_id='primary', account=''):
+    """
+    Stream calendar changes into the Meeting table and advance the sync token.
+
+    Returns:
+        dict: ``total_events``, ``upserted``, ``upserted_event_ids``,
+        ``cancelled_event_ids`` and ``full_sync``
+    """
+    calendar_sync = CalendarSync(service, calendar_id=calendar_id, account=account)
+    result = upsert_meetings(calendar_sync, calendar_id=calendar_id, account=account)
+    if calendar_sync.full_sync and calendar_sync.stream.next_sync_token is not None:
+        result["cancelled_event_ids"].extend(cancel_unseen(account, calendar_id, calendar_sync.seen_ids))
+    calendar_sync.commit()
+
+    result["total_events"] = calendar_sync.changed_count
+    result["full_sync"] = calendar_sync.full_sync
+    return result
+
+
+def export_meetings_csv(csv_filepath):
+    """Write upcoming meetings to ``csv_filepath`` in the legacy meeting_invites.csv format."""
+    tmp_filepath = f"{csv_filepath}.tmp"
+    count = 0
+
+    with open(tmp_filepath, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=CSV_HEADERS)
+        writer.writeheader()
+        for meeting in Meeting.objects.upcoming().iterator():
+            writer.writerow({
+                'Summary': meeting.summary,
+                'Start Time': meeting.start_time.isoformat(),
+                'End Time': meeting.end_time.isoformat() if meeting.end_time else '',
+                'Meet Link': meeting.meet_link,
+                'Conference URI': meeting.conference_uri,
+            })
+            count += 1
+
+    os.replace(tmp_filepath, csv_filepath)
+    logger.info(f"Exported {count} upcoming meetings to {os.path.abspath(csv_filepath)}")
+    return count
+
+
+# Ends the queue of a calendar fetched by _fetch_calendar
+_FETCH_DONE = object()
+
+
+def calendar_ids_for(account):
+    """Return the calendar ids configured for ``account``."""
+    value = OAuthToken.objects.filter(account=account).values_list('calendar_ids', flat=True).first()
+    return parse_calendar_ids(value)
+
+
+def _fetch_calendar(calendar_sync, credentials, events, stop):
+    """
+    Stream one calendar's changes into the ``events`` queue on a worker thread.
+
+    Each thread builds its own service, so each has its own transport. The
+    queue ends with ``_FETCH_DONE`` or with the exception that ended the
+    fetch; setting ``stop`` abandons the fetch.
+    """
+    def put(item):
+        while not stop.is_set():
+            try:
+                events.put(item, timeout=1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    try:
+        calendar_sync.service = get_calendar_service(credentials, calendar_sync.account)
+        for event in calendar_sync:
+            if not put(event):
+                return
+        put(_FETCH_DONE)
+    except Exception as e:
+        put(e)
+
+
+def _drain(events):
+    """Yield the events queued by ``_fetch_calendar``, re-raising the error that ended the fetch."""
+    while True:
+        item = events.get()
+        if item is _FETCH_DONE:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+
+def sync_calendars_to_db(credentials, account, calendar_ids=None):
+    """
+    Sync several calendars of one account concurrently into the Meeting table.
+
+    Calendars are fetched in parallel on a bounded thread pool, so the fetch
+    takes about as long as the slowest calendar, and each one is upserted in
+    batches as its pages arrive, in configured order. Only event ids are kept
+    across calendars: an event shared by several calendars is stored once
+    (first configured calendar wins), and it is only marked cancelled when
+    no calendar still has it active, so cancellations are written last.
+    Sync tokens are committed after everything is written.
+
+    Returns:
+        dict: Same keys as ``sync_calendar_to_db`` plus ``calendars``
+    """
+    calendar_ids = calendar_ids or calendar_ids_for(account)
+
+    if len(calendar_ids) == 1:
+        # Nothing to merge: stream the single calendar straight into the table
+        result = sync_calendar_to_db(get_calendar_service(credentials, account), calendar_ids[0], account)
+        result["calendars"] = calendar_ids
+        return result
+
+    # Sync states are loaded here: the fetch threads never touch the database
+    calendar_syncs = [CalendarSync(None, calendar_id, account) for calendar_id in calendar_ids]
+    active = set()
+    cancelled = {}  # event id -> (calendar id, event)
+    result = {"upserted": 0, "upserted_event_ids": [], "cancelled_event_ids": []}
+
+    def merge(calendar_id, events):
+        for event in events:
+            if event.get('status') == Meeting.STATUS_CANCELLED:
+                cancelled.setdefault(event['id'], (calendar_id, event))
+            elif event['id'] not in active:
+                active.add(event['id'])
+                yield event
+
+    def add(written):
+        result["upserted"] += written["upserted"]
+        result["upserted_event_ids"].extend(written["upserted_event_ids"])
+        result["cancelled_event_ids"].extend(written["cancelled_event_ids"])
+
+    # A pool per sync: calendars are drained in submission order, so the one being
+    # drained has always started and no fetch waits on a merge that waits on it
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(calendar_ids)),
+                            thread_name_prefix='calendar-fetch') as executor:
+        queues = []
+        for calendar_sync in calendar_syncs:
+            queues.append(queue.Queue(PREFETCH_EVENTS))
+            executor.submit(_fetch_calendar, calendar_sync, credentials, queues[-1], stop)
+        try:
+            for calendar_sync, events in zip(calendar_syncs, queues):
+                add(upsert_meetings(merge(calendar_sync.calendar_id, _drain(events)),
+                                    calendar_id=calendar_sync.calendar_id, account=account))
+        finally:
+            stop.set()
+
+    by_calendar = {}
+    for event_id, (calendar_id, event) in cancelled.items():
+        if event_id not in active:
+            by_calendar.setdefault(calendar_id, []).append(event)
+    for calendar_id, events in by_calendar.items():
+        add(upsert_meetings(events, calendar_id=calendar_id, account=account))
+
+    # A row may be stored under another calendar of the merge, so anything active anywhere counts as seen
+    for calendar_sync in calendar_syncs:
+        if calendar_sync.full_sync and calendar_sync.stream.next_sync_token is not None:
+            result["cancelled_event_ids"].extend(
+                cancel_unseen(account, calendar_sync.calendar_id, calendar_sync.seen_ids | active)
+            )
+
+    for calendar_sync in calendar_syncs:
+        calendar_sync.commit()
+
+    result["total_events"] = len(active)
+    result["full_sync"] = any(calendar_sync.full_sync for calendar_sync in calendar_syncs)
+    result["calendars"] = calendar_ids
+    return result
@@ -0,0 +1,186 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytz
+from django.conf import settings
+from django.db import close_old_connections
+from google.auth.exceptions import RefreshError, TransportError
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+
+from .models import OAuthToken
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+
+def _utcnow():
+    # google-auth compares expiry as naive UTC
+    return datetime.now(pytz.UTC).replace(tzinfo=None)
+
+
+def credentials_from_token(token_entry):
+    """Decode a stored OAuthToken into google-auth Credentials."""
+    return Credentials(
+        token=token_entry.token,
+        refresh_token=token_entry.refresh_token,
+        token_uri=token_entry.token_uri,
+        client_id=token_entry.client_id,
+        client_secret=token_entry.client_secret,
+        scopes=token_entry.scopes.split(',') if isinstance(token_entry.scopes, str) else token_entry.scopes,
+        # google-auth expects a naive UTC expiry
+        expiry=token_entry.get_expiry().replace(tzinfo=None)
+    )
+
+
+def resolve_account(account=None):
+    """Return ``account``, or the most recently authorised account when None."""
+    if account:
+        return account
+    return OAuthToken.objects.order_by('-id').values_list('account', flat=True).first()
+
+
+class _Entry:
+    def __init__(self, token_id, credentials):
+        self.token_id = token_id
+        self.credentials = credentials
+        self.refresh = None  # Future of the in-flight refresh, if any
+
+
+class CredentialManager:
+    """
+    In-process cache of decoded OAuth credentials with refresh-ahead.
+
+    Credentials are read from the database once and kept in memory. When a
+    token gets within ``refresh_ahead`` of its expiry it is refreshed in the
+    background and written back to OAuthToken, while callers keep using the
+    still-valid token. Concurrent callers share a single in-flight refresh per
+    account; only a caller holding an already expired token waits for it.
+
+    ``start()`` additionally runs a daemon thread that refreshes cached
+    tokens ahead of expiry even when nobody asks for them. The first
+    ``get()`` that caches credentials starts it, so it only runs in
+    processes that use them (not in ``migrate`` and the like).
+    """
+
+    def __init__(self, refresh_ahead=None, max_workers=2):
+        if refresh_ahead is None:
+            refresh_ahead = timedelta(seconds=getattr(settings, 'GOOGLE_TOKEN_REFRESH_AHEAD_SECONDS', 300))
+        self.refresh_ahead = refresh_ahead
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='token-refresh')
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _load(self, account):
+        queryset = OAuthToken.objects.all()
+        try:
+            if account is None:
+                token_entry = queryset.latest('id')
+            else:
+                token_entry = queryset.filter(account=account).latest('id')
+        except OAuthToken.DoesNotExist:
+            return None
+        return _Entry(token_entry.id, credentials_from_token(token_entry))
+
+    def get(self, account=None):
+        """
+        Return cached Credentials for ``account`` (latest stored token when None).
+
+        Returns:
+            Credentials: Valid credentials, or None when no token is stored or an
+            expired token could not be refreshed (rejected or Google unreachable)
+        """
+        with self._lock:
+            entry = self._entries.get(account)
+
+        if entry is None:
+            entry = self._load(account)
+            if entry is None:
+                return None
+            with self._lock:
+                entry = self._entries.setdefault(account, entry)
+                start = self._thread is None
+            if start:
+                self.start()
+
+        expiry = entry.credentials.expiry
+        if expiry is None:
+            return entry.credentials
+
+        remaining = expiry - _utcnow()
+        if remaining <= timedelta(0):
+            # Cold path: the token is already expired, so the caller has to wait
+            try:
+                self._refresh_async(account, entry).result()
+            except (RefreshError, TransportError):
+                return None
+        elif remaining <= self.refresh_ahead:
+            self._refresh_async(account, entry)
+
+        return entry.credentials
+
+    def _refresh_async(self, account, entry):
+        """Start a refresh unless one is already in flight, and return its Future."""
+        with self._lock:
+            if entry.refresh is None or entry.refresh.done():
+                entry.refresh = self._executor.submit(self._refresh, account, entry)
+            return entry.refresh
+
+    def _refresh(self, account, entry):
+        credentials = entry.credentials
+        try:
+            credentials.refresh(Request())
+            expiry = pytz.UTC.localize(credentials.expiry) if credentials.expiry else None
+            OAuthToken.objects.filter(pk=entry.token_id).update(token=credentials.token, expiry=expiry)
+            logger.info(f"Refreshed OAuth token for account '{account or 'default'}', new expiry: {expiry}")
+        except RefreshError as e:
+            logger.error(f"Failed to refresh OAuth token for account '{account or 'default'}': {e}")
+            # Reload from the database next time (the user may have signed in again)
+            with self._lock:
+                if self._entries.get(account) is entry:
+                    del self._entries[account]
+            raise
+        except TransportError as e:
+            # Keep the entry: the token is still good, only the network failed
+            logger.error(f"Could not reach Google to refresh the token of '{account or 'default'}': {e}")
+            raise
+        finally:
+            close_old_connections()
+
+    def invalidate(self, account=None):
+        """Forget cached credentials for ``account``, or for every account when None."""
+        with self._lock:
+            if account is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(account, None)
+
+    def start(self, interval=30):
+        """Refresh cached tokens ahead of expiry from a background thread."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(interval,), name='token-refresh-ahead',
+                                            daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            with self._lock:
+                entries = list(self._entries.items())
+            now = _utcnow()
+            for account, entry in entries:
+                expiry = entry.credentials.expiry
+                if expiry is not None and expiry - now <= self.refresh_ahead:
+                    self._refresh_async(account, entry)
+
+
+credential_manager = CredentialManager()
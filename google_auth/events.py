@@ -0,0 +1,229 @@
+import asyncio
+import itertools
+import json
+import logging
+import queue
+import select
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.db import close_old_connections, connection, connections
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# PostgreSQL channel the events of every process's bots are sent on
+CHANNEL = 'meet_bot_events'
+
+# Events waiting for the sender thread; when the database falls behind, new events are dropped
+QUEUE_SIZE = 1000
+
+# NOTIFY payloads must stay below 8000 bytes
+MAX_PAYLOAD_BYTES = 7900
+
+# How often the listener checks for stop(), and waits before reconnecting after an error
+LISTEN_POLL_SECONDS = 1
+LISTEN_RETRY_SECONDS = 5
+
+
+def meeting_code(meeting):
+    """'abc-defg-hij' for a Meet link or a bare meeting code."""
+    return urlparse(meeting).path.strip('/') if '/' in meeting else meeting
+
+
+class Subscription:
+    """
+    One listener's view of the event stream, consumed on its own event loop.
+
+    Events are buffered in a bounded deque: when the client reads too slowly
+    the oldest events are dropped, so publishing never waits for it.
+    """
+
+    def __init__(self, loop, meeting=None, buffer_size=100):
+        self.loop = loop
+        self.meeting = meeting_code(meeting) if meeting else None
+        self.dropped = 0
+        self._events = deque(maxlen=buffer_size)
+        self._ready = asyncio.Event()
+
+    def wants(self, event):
+        return self.meeting is None or event['meeting'] == self.meeting
+
+    def push(self, event):
+        """Called from any thread; never blocks."""
+        if len(self._events) == self._events.maxlen:
+            self.dropped += 1
+        self._events.append(event)
+        self.loop.call_soon_threadsafe(self._ready.set)
+
+    async def get(self, timeout=None):
+        """
+        Wait for the buffered events.
+
+        Returns:
+            list: The events, oldest first; empty when ``timeout`` passed first
+        """
+        if not self._events:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+
+        events = []
+        while self._events:
+            events.append(self._events.popleft())
+        return events
+
+
+def _notifications(raw_connection, timeout):
+    """Yield the payloads NOTIFYd to a LISTENing psycopg2 or psycopg (3.2+) connection within ``timeout``."""
+    if hasattr(raw_connection, 'poll'):  # psycopg2
+        if select.select([raw_connection], [], [], timeout)[0]:
+            raw_connection.poll()
+        while raw_connection.notifies:
+            yield raw_connection.notifies.pop(0).payload
+    else:
+        for notify in raw_connection.notifies(timeout=timeout):
+            yield notify.payload
+
+
+class EventPublisher:
+    """
+    Fan-out of bot lifecycle and phase events to live subscribers, across processes.
+
+    On PostgreSQL ``publish`` queues the event for a sender thread that
+    NOTIFYs it on ``CHANNEL`` (bots may run on an event loop, where the ORM
+    is off limits, and must never wait on the database), and the first
+    ``subscribe`` in a process starts a thread that LISTENs on it and hands
+    the events to that process's subscribers. Bots run by ``run_scheduler``
+    or ``bot_worker`` thus reach the web process. Other databases only
+    deliver within the process.
+    """
+
+    def __init__(self, shared=None):
+        self._shared = shared
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._outbox = queue.Queue(QUEUE_SIZE)
+        self._sender = None
+        self._listener = None
+        self._listening = threading.Event()
+        self._stop = threading.Event()
+        self.dropped = 0  # events the sender could not keep up with
+
+    @property
+    def shared(self):
+        """Whether events travel through PostgreSQL NOTIFY (decided by the default database)."""
+        if self._shared is None:
+            self._shared = connections['default'].vendor == 'postgresql'
+        return self._shared
+
+    def _ensure_thread(self, name, target):
+        with self._lock:
+            thread = getattr(self, name)
+            if thread is None or not thread.is_alive():
+                thread = threading.Thread(target=target, name=f'bot-events-{name.strip("_")}', daemon=True)
+                setattr(self, name, thread)
+                thread.start()
+
+    def subscribe(self, meeting=None):
+        """Subscribe from a coroutine; events for ``meeting`` only, or all meetings when None."""
+        subscription = Subscription(
+            asyncio.get_running_loop(), meeting, getattr(settings, 'BOT_EVENTS_BUFFER_SIZE', 100)
+        )
+        with self._lock:
+            self._subscriptions.add(subscription)
+        if self.shared:
+            self._ensure_thread('_listener', self._listen_forever)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+        if subscription.dropped:
+            logger.info(f"Event subscriber dropped {subscription.dropped} events")
+
+    def publish(self, event_type, meeting_link, **data):
+        """Send an event to every interested subscriber, in any process, without waiting for any of them."""
+        event = {
+            'type': event_type,
+            'meeting': meeting_code(meeting_link),
+            'time': time.time(),
+            'data': data,
+        }
+        if not self.shared:
+            self._deliver(event)
+            return
+
+        self._ensure_thread('_sender', self._send_forever)
+        try:
+            self._outbox.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def _deliver(self, event):
+        """Hand an event to this process's subscribers; ids count the events delivered here."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        if not subscriptions:
+            return
+
+        event = dict(event, id=next(self._ids))
+        for subscription in subscriptions:
+            if subscription.wants(event):
+                try:
+                    subscription.push(event)
+                except RuntimeError:
+                    # The subscriber's loop is closed; it will never read again
+                    self.unsubscribe(subscription)
+
+    def _send_forever(self):
+        while True:
+            event = self._outbox.get()
+            if event is None:
+                return
+            payload = json.dumps(event)
+            if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+                payload = json.dumps(dict(event, data={'truncated': True}))
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, payload])
+            except Exception as e:
+                logger.error(f"Failed to publish bot event '{event['type']}': {e}")
+            finally:
+                close_old_connections()
+
+    def _listen_forever(self):
+        while not self._stop.is_set():
+            try:
+                connection.ensure_connection()
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN {CHANNEL}')
+                self._listening.set()
+                logger.info(f"Listening for bot events on '{CHANNEL}'")
+
+                while not self._stop.is_set():
+                    for payload in _notifications(connection.connection, LISTEN_POLL_SECONDS):
+                        self._deliver(json.loads(payload))
+            except Exception as e:
+                logger.error(f"Bot event listener failed, reconnecting: {e}")
+                self._stop.wait(LISTEN_RETRY_SECONDS)
+            finally:
+                self._listening.clear()
+                connection.close()
+
+    def stop(self, timeout=None):
+        """Stop the sender and listener threads (for tests and shutdown) and close their connections."""
+        self._stop.set()
+        self._outbox.put(None)
+        for thread in (self._sender, self._listener):
+            if thread is not None:
+                thread.join(timeout)
+
+
+event_publisher = EventPublisher()
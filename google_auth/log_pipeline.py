@@ -0,0 +1,155 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from django.conf import settings
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Browser console and page errors go to their own logger, never through the
+# synchronous handlers configured in settings.LOGGING
+browser_logger = logging.getLogger('google_auth.browser_console')
+
+# Console message types (ConsoleMessage.type) mapped to log levels
+CONSOLE_LEVELS = {
+    'error': logging.ERROR,
+    'assert': logging.ERROR,
+    'warning': logging.WARNING,
+    'info': logging.INFO,
+    'log': logging.DEBUG,
+    'debug': logging.DEBUG,
+    'trace': logging.DEBUG,
+}
+
+# Records waiting for the listener thread; when it falls behind, new records are dropped
+QUEUE_SIZE = 10000
+
+
+class RateLimitFilter(logging.Filter):
+    """Let at most ``rate`` records per ``per`` seconds through for each console message type."""
+
+    def __init__(self, rate, per=60.0):
+        super().__init__()
+        self.rate = rate
+        self.per = per
+        self._buckets = {}  # console type -> (tokens, last refill)
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        key = getattr(record, 'console_type', '')
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.rate, now))
+            tokens = min(self.rate, tokens + (now - last) * self.rate / self.per)
+            allowed = tokens >= 1
+            self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+        return allowed
+
+
+class DedupFilter(logging.Filter):
+    """
+    Drop repeats of the same message from the same meeting within ``window`` seconds.
+
+    The next distinct message of that meeting notes how many repeats were dropped.
+    """
+
+    def __init__(self, window=30.0):
+        super().__init__()
+        self.window = window
+        self._last = {}  # meeting -> (message, first seen, repeats)
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        meeting = getattr(record, 'meeting', '')
+        message = record.getMessage()
+        now = time.monotonic()
+        with self._lock:
+            last_message, seen_at, repeats = self._last.get(meeting, (None, 0.0, 0))
+            if message == last_message and now - seen_at < self.window:
+                self._last[meeting] = (last_message, seen_at, repeats + 1)
+                return False
+            self._last[meeting] = (message, now, 0)
+
+        if repeats:
+            record.msg = f"[previous message repeated {repeats} times] {message}"
+            record.args = None
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks: records are dropped (and counted) when the queue is full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener = None
+_setup_lock = threading.Lock()
+
+
+def setup_browser_logging():
+    """
+    Wire ``browser_logger`` to a rotated file through a queue, once per process.
+
+    The automation thread only runs the cheap filters and a non-blocking
+    queue put; formatting and file I/O happen on the listener thread.
+    """
+    global _listener
+
+    with _setup_lock:
+        if _listener is not None:
+            return
+
+        file_handler = RotatingFileHandler(
+            getattr(settings, 'MEET_BOT_CONSOLE_LOG_FILE', 'browser_console.log'),
+            maxBytes=getattr(settings, 'MEET_BOT_CONSOLE_LOG_MAX_BYTES', 10 * 1024 * 1024),
+            backupCount=getattr(settings, 'MEET_BOT_CONSOLE_LOG_BACKUPS', 3),
+        )
+        file_handler.setFormatter(logging.Formatter('{levelname} {asctime} {console_type} {meeting} {message}', style='{'))
+
+        queue_handler = DroppingQueueHandler(queue.Queue(QUEUE_SIZE))
+        queue_handler.addFilter(DedupFilter(getattr(settings, 'MEET_BOT_CONSOLE_DEDUP_SECONDS', 30)))
+        queue_handler.addFilter(RateLimitFilter(getattr(settings, 'MEET_BOT_CONSOLE_RATE_PER_MINUTE', 30)))
+
+        browser_logger.setLevel(getattr(settings, 'MEET_BOT_CONSOLE_LOG_LEVEL', 'WARNING'))
+        browser_logger.addHandler(queue_handler)
+        browser_logger.propagate = False
+
+        _listener = QueueListener(queue_handler.queue, file_handler)
+        _listener.start()
+        atexit.register(stop_browser_logging)
+        logger.info("Browser console log pipeline started")
+
+
+def stop_browser_logging():
+    """Flush the queued records and stop the listener thread."""
+    with _setup_lock:
+        if _listener is not None and _listener._thread is not None:
+            _listener.stop()
+
+
+def attach_console_logging(page, meeting_link):
+    """Route a page's console messages and uncaught errors into the browser log pipeline."""
+    setup_browser_logging()
+
+    def on_console(msg):
+        level = CONSOLE_LEVELS.get(msg.type, logging.INFO)
+        if browser_logger.isEnabledFor(level):
+            browser_logger.log(level, msg.text, extra={'console_type': msg.type, 'meeting': meeting_link})
+
+    def on_page_error(error):
+        browser_logger.error(str(error), extra={'console_type': 'pageerror', 'meeting': meeting_link})
+
+    page.on("console", on_console)
+    page.on("pageerror", on_page_error)
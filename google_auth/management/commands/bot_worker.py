@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from google_auth.bot_worker import BotWorker
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Runs a bot worker that claims queued meeting jobs from the database and joins them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll-interval', type=float, help='Seconds between checks for queued jobs')
+        parser.add_argument('--max-concurrent', type=int, help='Maximum number of meetings attended at once')
+
+    def handle(self, *args, **options):
+        worker = BotWorker(
+            max_concurrent=options.get('max_concurrent'),
+            poll_interval=options.get('poll_interval'),
+        )
+
+        self.stdout.write(self.style.SUCCESS('Bot worker running. Press Ctrl+C to stop.'))
+        try:
+            worker.run_forever()
+        except KeyboardInterrupt:
+            worker.stop()
+            self.stdout.write('Bot worker stopped')
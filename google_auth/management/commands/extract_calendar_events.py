@@ -20,11 +20,11 @@ class Command(BaseCommand):
             if hasattr(response, 'content'):
                 # Decode and log the response content
                 response_data = json.loads(response.content.decode('utf-8'))
-                logger.info(f'Calendar extraction successful. Events found: {len(response_data.get("events", []))}')
+                logger.info(f'Calendar extraction successful. Events found: {response_data.get("total_events_found", 0)}')
 
                 self.stdout.write(
                     self.style.SUCCESS(
-                        f'Successfully executed calendar extraction. Found {len(response_data.get("events", []))} events')
+                        f'Successfully executed calendar extraction. Found {response_data.get("total_events_found", 0)} events')
                 )
             else:
                 logger.error('Response has no content')
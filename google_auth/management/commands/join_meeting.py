@@ -4,12 +4,17 @@ import os
 import json
 import logging
 from django.conf import settings
+from django.utils import timezone
+from google_auth.meeting_jobs import flush_transitions, lease_fields, meeting_job_runner, queue_transition
+from google_auth.models import MeetingJob
 from google_auth.playwright_google_meet import GoogleMeetAutomation
 
 # Setup logger
 logger = logging.getLogger(__name__)
 
 
+# The MeetingJob runs inline: the command exits only once the bot left and the job's final
+# status is written, so no job is left running for a process that is gone
 class Command(BaseCommand):
     help = 'Join a scheduled Google Meet meeting'
 
@@ -39,17 +44,25 @@ class Command(BaseCommand):
             with open(log_file, 'a') as f:
                 f.write(f"Attempting to join meeting: {summary} at {meet_link}\n")
 
-            google_meet = GoogleMeetAutomation(meeting_link=meet_link)
+            job = MeetingJob.objects.create(
+                meet_link=meet_link, summary=summary, scheduled_at=timezone.now(), **lease_fields()
+            )
+            meeting_job_runner.track(job.pk)
+            google_meet = GoogleMeetAutomation(
+                meeting_link=meet_link, listener=lambda status: queue_transition(job.pk, status)
+            )
             response = google_meet.join_google_meet()
 
             with open(log_file, 'a') as f:
                 f.write(f"Join attempt response: {response}\n")
 
             if response["status"] == "success":
+                queue_transition(job.pk, MeetingJob.STATUS_LEFT)
                 self.stdout.write(
                     self.style.SUCCESS(f'Successfully joined meeting: {summary}')
                 )
             else:
+                queue_transition(job.pk, MeetingJob.STATUS_FAILED, response["message"])
                 self.stdout.write(
                     self.style.ERROR(f'Failed to join meeting: {response["message"]}')
                 )
@@ -57,8 +70,13 @@ class Command(BaseCommand):
         except Exception as e:
             error_msg = f'Error in join_meeting command: {str(e)}'
             logger.error(error_msg)
+            if 'job' in locals():
+                queue_transition(job.pk, MeetingJob.STATUS_FAILED, error_msg)
             with open(log_file, 'a') as f:
                 f.write(f"Error: {error_msg}\n")
         finally:
             if 'google_meet' in locals():
-                google_meet.close_browser()
\ No newline at end of file
+                google_meet.close_browser()
+            if 'job' in locals():
+                meeting_job_runner.untrack(job.pk)
+                flush_transitions()
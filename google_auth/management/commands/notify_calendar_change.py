@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from google_auth.calendar_watch import LocalCalendarNotifier, notification_dispatcher
+from google_auth.credentials import resolve_account
+from google_auth.models import CalendarWatchChannel
+
+
+class Command(BaseCommand):
+    help = 'Sends a local stand-in Calendar push notification to test the webhook flow offline.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--account', type=str, help='Account to notify for (latest signed-in account by default)')
+        parser.add_argument('--calendar', type=str, default='primary', help='Calendar id to notify for')
+        parser.add_argument('--state', type=str, default='exists', help='X-Goog-Resource-State to send')
+        parser.add_argument('--url', type=str, help='Webhook URL of a running server (in-process when omitted)')
+
+    def handle(self, *args, **options):
+        notifier = LocalCalendarNotifier()
+        account = resolve_account(options.get('account')) or ''
+        calendar_id = options['calendar']
+
+        channel = (CalendarWatchChannel.objects.filter(account=account, calendar_id=calendar_id)
+                   .order_by('-expiration').first())
+        if channel is None:
+            channel = notifier.register_channel(calendar_id, account)
+            self.stdout.write(f'Registered local channel {channel.channel_id} for calendar {calendar_id}')
+
+        status = notifier.notify(channel, state=options['state'], url=options.get('url'))
+        self.stdout.write(f'Webhook responded with HTTP {status}')
+
+        if not options.get('url'):
+            # The sync runs in a background thread; wait for it before the command exits
+            notification_dispatcher.wait_idle()
+            self.stdout.write(self.style.SUCCESS('Notification processed'))
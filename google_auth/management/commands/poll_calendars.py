@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from google_auth.credentials import credential_manager
+from google_auth.polling import CalendarPoller
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Polls the calendars of every signed-in account, spread over time slots and a bounded worker pool.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Poll every account once and exit')
+        parser.add_argument('--interval', type=int, help='Seconds between two polls of the same account')
+        parser.add_argument('--slots', type=int, help='Number of time slots accounts are spread over')
+        parser.add_argument('--workers', type=int, help='Maximum number of concurrent polls')
+
+    def handle(self, *args, **options):
+        poller = CalendarPoller(
+            interval=options.get('interval'),
+            slots=options.get('slots'),
+            max_workers=options.get('workers'),
+        )
+
+        if options['once']:
+            polled = poller.poll_all_once()
+            self.stdout.write(self.style.SUCCESS(f'Polled {polled} account(s)'))
+            return
+
+        credential_manager.start()
+        self.stdout.write(
+            f'Polling accounts every {poller.interval}s over {poller.slots} slots with {poller.max_workers} workers'
+        )
+        try:
+            poller.run_forever()
+        except KeyboardInterrupt:
+            poller.stop()
+            self.stdout.write('Calendar poller stopped')
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from google_auth.calendar_service import get_calendar_service
+from google_auth.calendar_watch import renew_watches
+from google_auth.credentials import credential_manager
+from google_auth.models import OAuthToken
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Registers Calendar push notification channels and renews those about to expire.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calendar', action='append', dest='calendars',
+                            help="Calendar id to watch (repeatable, defaults to each account's calendars)")
+        parser.add_argument('--account', type=str, help='Only renew channels of this account')
+
+    def handle(self, *args, **options):
+        tokens = OAuthToken.objects.all()
+        if options.get('account'):
+            tokens = tokens.filter(account=options['account'])
+
+        try:
+            created = 0
+            for token in tokens:
+                account = token.account
+                calendar_ids = options.get('calendars') or token.get_calendar_ids()
+                credentials = credential_manager.get(account)
+                if not credentials:
+                    self.stdout.write(self.style.ERROR(f'No usable credentials for {account}, skipping'))
+                    continue
+                created += renew_watches(get_calendar_service(credentials, account), calendar_ids, account)
+
+            self.stdout.write(self.style.SUCCESS(f'Watch channels checked, {created} channel(s) created'))
+
+        except Exception as e:
+            logger.error(f'Failed to renew calendar watches: {str(e)}')
+            self.stdout.write(
+                self.style.ERROR(f'Failed to renew calendar watches: {str(e)}')
+            )
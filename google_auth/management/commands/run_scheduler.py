@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from google_auth.scheduler import MeetingScheduler, enqueue_join, run_join
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Runs the resident meeting scheduler that joins upcoming meetings at their start time.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--refresh-interval', type=float, help='Seconds between checks for changed meetings')
+        parser.add_argument('--max-concurrent', type=int, help='Maximum number of meetings joined at once')
+
+    def handle(self, *args, **options):
+        # With the queue backend the joins are left to `manage.py bot_worker` processes
+        queue = getattr(settings, 'MEETING_SCHEDULER_BACKEND', 'daemon') == 'queue'
+        scheduler = MeetingScheduler(
+            refresh_interval=options.get('refresh_interval'),
+            max_concurrent=options.get('max_concurrent'),
+            join_func=enqueue_join if queue else run_join,
+        )
+
+        self.stdout.write(self.style.SUCCESS('Meeting scheduler running. Press Ctrl+C to stop.'))
+        try:
+            scheduler.run_forever()
+        except KeyboardInterrupt:
+            scheduler.stop()
+            self.stdout.write('Meeting scheduler stopped')
@@ -1,15 +1,12 @@
 from django.core.management.base import BaseCommand
-from datetime import datetime
-import csv
-import pytz
-import json
-from django.conf import settings
 import os
 from crontab import CronTab
+from google_auth.meeting_crons import add_meeting_job, meeting_jobs, schedulable_meetings
+from google_auth.recurrence import expand_recurring_meetings
 
 
 class Command(BaseCommand):
-    help = 'Sets up cron jobs for upcoming meetings from CSV'
+    help = 'Sets up cron jobs for upcoming meetings'
 
     def add_arguments(self, parser):
         # Add a show option
@@ -22,11 +19,11 @@ class Command(BaseCommand):
     def show_crons(self):
         """Display all meeting crons"""
         cron = CronTab(user=True)
-        meeting_jobs = [job for job in cron if job.comment == 'meeting_join']
+        jobs = meeting_jobs(cron)
 
-        if meeting_jobs:
+        if jobs:
             self.stdout.write("\nCurrently active meeting crons:")
-            for job in meeting_jobs:
+            for job in jobs:
                 self.stdout.write(f"\nSchedule: {job.slices}")
                 self.stdout.write(f"Command: {job.command}")
                 self.stdout.write(f"Comment: {job.comment}")
@@ -42,45 +39,28 @@ class Command(BaseCommand):
         try:
             self.stdout.write('Removing existing meeting cron jobs...')
             cron = CronTab(user=True)
-            cron.remove_all(comment='meeting_join')
+            for job in meeting_jobs(cron):
+                cron.remove(job)
+
+            # Materialise occurrences of locally expanded recurring meetings up to the horizon
+            expand_recurring_meetings()
 
             project_path = os.getcwd()
             jobs_added = 0
 
-            with open('meeting_invites.csv', 'r') as file:
-                csv_reader = csv.DictReader(file)
-                current_time = datetime.now(pytz.UTC)
-
-                for row in csv_reader:
-                    meeting_time = datetime.fromisoformat(row['Start Time'])
-
-                    if meeting_time > current_time:
-                        minute = meeting_time.minute
-                        hour = meeting_time.hour
-                        day = meeting_time.day
-                        month = meeting_time.month
-
-                        meeting_data = json.dumps({
-                            'summary': row['Summary'],
-                            'meet_link': row['Meet Link']
-                        })
-
-                        cron_time = f'{minute} {hour} {day} {month} *'
-                        command = f'cd {project_path} && python3 manage.py join_meeting --meeting=\'{meeting_data}\''
-
-                        self.stdout.write(
-                            self.style.SUCCESS(
-                                f'Setting up cron for "{row["Summary"]}" at {meeting_time}'
-                            )
-                        )
-
-                        job = cron.new(command=command, comment='meeting_join')
-                        job.setall(cron_time)
-                        jobs_added += 1
-
-            # Write the crontab if we added any jobs
+            # One indexed range query on Meeting.start_time
+            for meeting in schedulable_meetings():
+                add_meeting_job(cron, meeting, project_path)
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f'Setting up cron for "{meeting.summary}" at {meeting.start_time.astimezone()}'
+                    )
+                )
+                jobs_added += 1
+
+            # Write the crontab so removed jobs are dropped even when nothing new was added
+            cron.write()
             if jobs_added > 0:
-                cron.write()
                 self.stdout.write(self.style.SUCCESS(f'Successfully set up {jobs_added} meeting cron jobs'))
                 self.show_crons()  # Show the crons after adding them
             else:
@@ -0,0 +1,81 @@
+import json
+import logging
+import os
+
+from crontab import CronTab
+from django.conf import settings
+
+from .models import Meeting
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Every meeting job is tagged "meeting_join:<event id>" so it can be replaced on its own
+CRON_COMMENT = 'meeting_join'
+
+
+def job_comment(meeting):
+    return f'{CRON_COMMENT}:{meeting.event_id}'
+
+
+def meeting_jobs(cron):
+    """Return every crontab job created for a meeting."""
+    return [job for job in cron if job.comment.startswith(CRON_COMMENT)]
+
+
+def add_meeting_job(cron, meeting, project_path=None):
+    """Add a crontab job that runs join_meeting at the meeting's start minute."""
+    project_path = project_path or os.getcwd()
+
+    # Cron runs in the host's local time zone
+    meeting_time = meeting.start_time.astimezone()
+    cron_time = f'{meeting_time.minute} {meeting_time.hour} {meeting_time.day} {meeting_time.month} *'
+
+    meeting_data = json.dumps({
+        'summary': meeting.summary,
+        'meet_link': meeting.meet_link
+    })
+    command = f'cd {project_path} && python3 manage.py join_meeting --meeting=\'{meeting_data}\''
+
+    job = cron.new(command=command, comment=job_comment(meeting))
+    job.setall(cron_time)
+    return job
+
+
+def schedulable_meetings():
+    """Upcoming meetings that have a Meet link to join."""
+    return Meeting.objects.upcoming().exclude(meet_link='')
+
+
+def reschedule_meetings(event_ids, project_path=None):
+    """
+    Replace the crontab jobs of the given meetings only.
+
+    Jobs of cancelled, moved or no-longer-upcoming meetings are removed and
+    fresh ones are added for those still upcoming. Other meetings' jobs are
+    left untouched.
+
+    Only used with the legacy ``MEETING_SCHEDULER_BACKEND = 'cron'``; the
+    resident scheduler (run_scheduler) picks changed meetings up by itself.
+
+    Returns:
+        int: Number of jobs written
+    """
+    event_ids = set(event_ids)
+    if not event_ids or getattr(settings, 'MEETING_SCHEDULER_BACKEND', 'daemon') != 'cron':
+        return 0
+
+    cron = CronTab(user=True)
+    comments = {f'{CRON_COMMENT}:{event_id}' for event_id in event_ids}
+    for job in meeting_jobs(cron):
+        if job.comment in comments:
+            cron.remove(job)
+
+    jobs_added = 0
+    for meeting in schedulable_meetings().filter(event_id__in=event_ids):
+        add_meeting_job(cron, meeting, project_path)
+        jobs_added += 1
+
+    cron.write()
+    logger.info(f"Rescheduled {len(event_ids)} changed meetings, {jobs_added} cron jobs written")
+    return jobs_added
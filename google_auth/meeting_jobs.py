@@ -0,0 +1,318 @@
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from playwright.async_api import async_playwright
+
+from .admission import admission_controller
+from .models import MeetingJob
+from .playwright_google_meet import AsyncGoogleMeetAutomation, browser_launch_options
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Identifies this process in MeetingJob.worker_id
+WORKER_ID = f'{socket.gethostname()}:{os.getpid()}'
+
+
+def job_lease():
+    """How long a job stays held by its worker without a heartbeat."""
+    return timedelta(seconds=getattr(settings, 'MEETING_QUEUE_LEASE_SECONDS', 30))
+
+
+def lease_fields():
+    """MeetingJob fields for a job this process creates and runs itself."""
+    now = timezone.now()
+    return {'worker_id': WORKER_ID, 'attempts': 1, 'heartbeat_at': now, 'lease_expires_at': now + job_lease()}
+
+
+# Transitions are written here, in order. Bots must not touch the ORM themselves: the
+# event loop (async API) or Playwright's own loop (sync API) runs on their thread,
+# and Django refuses synchronous queries there.
+_db_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='meeting-job-db')
+
+
+def record_transition(job_id, status, failure_reason=''):
+    try:
+        if not MeetingJob.transition(job_id, status, failure_reason, worker_id=WORKER_ID):
+            logger.info(f"Meeting job {job_id} not moved to '{status}' (finished or held by another worker)")
+    except Exception as e:
+        logger.error(f"Failed to record '{status}' for meeting job {job_id}: {e}")
+    finally:
+        close_old_connections()
+
+
+def queue_transition(job_id, status, failure_reason=''):
+    """
+    Record a MeetingJob transition on the DB writer thread without waiting for it.
+
+    Only jobs this process holds are moved, so a bot whose job was re-queued
+    to another worker cannot overwrite the new run's progress.
+    """
+    _db_writer.submit(record_transition, job_id, status, failure_reason)
+
+
+def flush_transitions():
+    """Wait until every transition queued so far is written, e.g. before a short-lived process exits."""
+    _db_writer.submit(lambda: None).result()
+
+
+def record_update(job_id, fields):
+    try:
+        MeetingJob.objects.filter(pk=job_id, worker_id=WORKER_ID).update(**fields)
+    except Exception as e:
+        logger.error(f"Failed to update meeting job {job_id}: {e}")
+    finally:
+        close_old_connections()
+
+
+def queue_admission(job_id, admission):
+    """Record on the DB writer thread how long a job waited to launch, or the job it was merged into."""
+    if admission.merged_into is not None:
+        _db_writer.submit(record_update, job_id, {'merged_into_id': admission.merged_into.job_id})
+        queue_transition(job_id, MeetingJob.STATUS_MERGED)
+    else:
+        _db_writer.submit(record_update, job_id, {'launch_wait': admission.wait_seconds})
+
+
+class MeetingJobRunner:
+    """
+    Runs meeting jobs on a background asyncio loop that owns the browser.
+
+    Web requests only create, read or cancel MeetingJob rows, so they return
+    at once no matter how many bots are in meetings. All meetings share one
+    async browser (a context each) and at most ``max_concurrent`` run at a
+    time. Launches also pass the process-wide admission controller, which
+    may merge a job into the bot already on its meeting. Status transitions
+    go through ``queue_transition``.
+
+    A heartbeat thread renews the leases of the jobs this process runs
+    (including ones registered with ``track``), stops bots whose job was
+    cancelled or taken over, and fails or re-queues jobs whose worker died.
+    """
+
+    def __init__(self, max_concurrent=None):
+        self.max_concurrent = max_concurrent or getattr(settings, 'MEETING_JOB_MAX_CONCURRENT', 20)
+        self.heartbeat_interval = getattr(settings, 'MEETING_QUEUE_HEARTBEAT_SECONDS', 10)
+        self.max_attempts = getattr(settings, 'MEETING_QUEUE_MAX_ATTEMPTS', 3)
+        self._futures = {}  # job id -> concurrent future of its task
+        self._tracked = set()  # jobs run outside the runner, e.g. by the scheduler's threads
+        self._unadmitted = set()  # started jobs that have not reached admission control yet
+        self._lock = threading.Lock()
+        self._heartbeat_thread = None
+        self._loop = None
+        self._thread = None
+        self._semaphore = None
+        self._browser_lock = None
+        self._playwright = None
+        self._browser = None
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name='meeting-jobs', daemon=True
+                )
+                self._thread.start()
+        self._ensure_heartbeat()
+        return self._loop
+
+    def _ensure_heartbeat(self):
+        with self._lock:
+            if self._heartbeat_thread is None or not self._heartbeat_thread.is_alive():
+                self._heartbeat_thread = threading.Thread(
+                    target=self._heartbeat_forever, name='meeting-job-heartbeat', daemon=True
+                )
+                self._heartbeat_thread.start()
+
+    def _heartbeat_forever(self):
+        while True:
+            time.sleep(self.heartbeat_interval)
+            try:
+                self.heartbeat()
+            except Exception as e:
+                logger.error(f"Meeting job heartbeat failed: {e}")
+            finally:
+                close_old_connections()
+
+    def heartbeat(self):
+        """Renew this process's leases, stop bots it no longer holds and recover dead workers' jobs."""
+        held_here = self.running()
+        if held_here:
+            held = MeetingJob.renew_leases(WORKER_ID, held_here, job_lease())
+            for job_id in held_here - held:
+                if self.cancel(job_id):
+                    logger.warning(f"Meeting job {job_id} was cancelled or taken over, stopped its bot")
+                else:
+                    logger.warning(f"Meeting job {job_id} was cancelled or taken over, but its bot cannot be stopped")
+                    self.untrack(job_id)
+
+        # Without bot workers nobody would run a re-queued job, so it fails instead
+        queue = getattr(settings, 'MEETING_SCHEDULER_BACKEND', 'daemon') == 'queue'
+        requeued, failed = MeetingJob.requeue_expired(self.max_attempts, requeue=queue)
+        if requeued or failed:
+            logger.warning(f"Re-queued {requeued} meeting jobs with expired leases, failed {failed}")
+
+        # Merged jobs whose covering bot failed or left before their start need a bot of their
+        # own: queued for the workers, or taken over and run here
+        job_ids = MeetingJob.requeue_merged('' if queue else WORKER_ID, job_lease())
+        if job_ids and not queue:
+            for job in MeetingJob.objects.filter(pk__in=job_ids):
+                logger.info(f"Meeting job {job.pk} is no longer covered by the bot it was merged into")
+                self.start(job, job.scheduled_at)
+
+    async def _get_browser(self):
+        """Launch the shared browser on first use, and again if it went away."""
+        if self._browser_lock is None:
+            self._browser_lock = asyncio.Lock()
+
+        # Jobs starting together wait for one launch instead of each starting a browser
+        async with self._browser_lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is not None:
+                    # The driver of a browser that went away is stopped before starting another
+                    try:
+                        await self._playwright.stop()
+                    except Exception as e:
+                        logger.warning(f"Error stopping Playwright driver of the lost browser: {e}")
+                    self._playwright = None
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(**browser_launch_options())
+                logger.info("Launched shared browser for meeting jobs")
+            return self._browser
+
+    async def _run(self, job_id, meet_link, account, start_at):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        google_meet = None
+        admission = None
+        try:
+            # Sleep without holding a slot until the browser should be prewarmed
+            if start_at is not None:
+                lead = getattr(settings, 'MEETING_PREWARM_SECONDS', 60)
+                await asyncio.sleep(max(0.0, (start_at - timezone.now()).total_seconds() - lead))
+
+            admission = await admission_controller.admit_async(meet_link, job_id, start_at)
+            self._admitted(job_id)
+            queue_admission(job_id, admission)
+            if admission.merged_into is not None:
+                return
+
+            async with self._semaphore:
+                google_meet = AsyncGoogleMeetAutomation(
+                    meet_link, browser=await self._get_browser(), account=account,
+                    listener=lambda status: queue_transition(job_id, status),
+                )
+
+                result = await google_meet.prewarm() if start_at is not None else None
+                if result is None or result["status"] == "success":
+                    result = await google_meet.join(start_at)
+                if result["status"] != "success":
+                    queue_transition(job_id, MeetingJob.STATUS_FAILED, result.get("message", ""))
+                    return
+
+                await google_meet.wait_for_meeting_end()
+                queue_transition(job_id, MeetingJob.STATUS_LEFT)
+        except asyncio.CancelledError:
+            logger.info(f"Meeting job {job_id} cancelled")
+            queue_transition(job_id, MeetingJob.STATUS_FAILED, 'cancelled')
+            raise
+        except Exception as e:
+            logger.error(f"Meeting job {job_id} failed: {e}")
+            queue_transition(job_id, MeetingJob.STATUS_FAILED, str(e))
+        finally:
+            self._admitted(job_id)
+            if google_meet is not None:
+                await google_meet.close()
+            if admission is not None:
+                admission_controller.release(admission)
+
+    def _admitted(self, job_id):
+        with self._lock:
+            self._unadmitted.discard(job_id)
+
+    def submit(self, meet_link, start_at=None, account='', summary='', meeting=None):
+        """
+        Create a MeetingJob and start it on the runner, returning without waiting.
+
+        Raises:
+            ValueError: If the meeting link is not a Google Meet link
+        """
+        # Validate up front so a bad link is rejected by the request, not the job
+        AsyncGoogleMeetAutomation(meet_link)
+
+        job = MeetingJob.objects.create(
+            meeting=meeting, meet_link=meet_link, summary=summary, account=account,
+            scheduled_at=start_at or timezone.now(), **lease_fields(),
+        )
+        self.start(job, start_at)
+        return job
+
+    def start(self, job, start_at=None):
+        """Run an existing MeetingJob held by this process, joining at ``start_at`` (now when None)."""
+        future = asyncio.run_coroutine_threadsafe(
+            self._run(job.pk, job.meet_link, job.account, start_at), self._ensure_loop()
+        )
+        with self._lock:
+            self._futures[job.pk] = future
+            self._unadmitted.add(job.pk)
+        future.add_done_callback(lambda done: self._forget(job.pk, done))
+        logger.info(f"Started meeting job {job.pk} for {job.meet_link}")
+
+    def _forget(self, job_id, future):
+        with self._lock:
+            # A re-claimed job may already be running again under the same id
+            if self._futures.get(job_id) is future:
+                del self._futures[job_id]
+
+    def track(self, job_id):
+        """Keep the lease of a job this process runs outside the runner alive until ``untrack``."""
+        with self._lock:
+            self._tracked.add(job_id)
+        self._ensure_heartbeat()
+
+    def untrack(self, job_id):
+        with self._lock:
+            self._tracked.discard(job_id)
+
+    def awaiting_admission(self):
+        """How many started jobs are still sleeping until their prewarm lead."""
+        with self._lock:
+            return len(self._unadmitted)
+
+    def running(self):
+        """Ids of the jobs this process is working on."""
+        with self._lock:
+            return set(self._futures) | self._tracked
+
+    def cancel(self, job_id):
+        """
+        Stop the bot of a job run by this runner; it leaves the meeting and its context is closed.
+
+        The job row is left alone: callers mark it cancelled (see
+        meeting_job_view), or it already belongs to another worker.
+
+        Returns:
+            bool: Whether a running job was found
+        """
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is None:
+            return False
+
+        # Thread-safe: cancels the task on the runner's loop
+        future.cancel()
+        return True
+
+
+meeting_job_runner = MeetingJobRunner()
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.18 on 2026-10-18 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('google_auth', '0002_calendarsyncstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Meeting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.CharField(max_length=1024, unique=True)),
+                ('calendar_id', models.CharField(default='primary', max_length=255)),
+                ('etag', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(default='confirmed', max_length=32)),
+                ('summary', models.TextField(blank=True)),
+                ('start_time', models.DateTimeField(db_index=True)),
+                ('end_time', models.DateTimeField(blank=True, null=True)),
+                ('meet_link', models.URLField(blank=True)),
+                ('conference_uri', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
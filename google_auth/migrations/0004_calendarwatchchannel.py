@@ -0,0 +1,25 @@
+# Generated by Django 4.2.18 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('google_auth', '0003_meeting'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarWatchChannel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel_id', models.CharField(max_length=64, unique=True)),
+                ('resource_id', models.CharField(blank=True, max_length=255)),
+                ('calendar_id', models.CharField(default='primary', max_length=255)),
+                ('token', models.CharField(max_length=255)),
+                ('expiration', models.DateTimeField(db_index=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.18 on 2026-10-18 12:41
+
+from django.db import migrations, models
+
+
+def fill_missing_accounts(apps, schema_editor):
+    """Give tokens saved before accounts were tracked a unique placeholder account."""
+    OAuthToken = apps.get_model('google_auth', 'OAuthToken')
+    for token in OAuthToken.objects.filter(models.Q(account__isnull=True) | models.Q(account='')):
+        token.account = f'account-{token.pk}'
+        token.save(update_fields=['account'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('google_auth', '0004_calendarwatchchannel'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_missing_accounts, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='oauthtoken',
+            name='account',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='calendarsyncstate',
+            name='calendar_id',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AddField(
+            model_name='calendarsyncstate',
+            name='account',
+            field=models.CharField(default='', max_length=255),
+        ),
+        migrations.AddConstraint(
+            model_name='calendarsyncstate',
+            constraint=models.UniqueConstraint(fields=('account', 'calendar_id'), name='unique_account_calendar_sync'),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='account',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='calendarwatchchannel',
+            name='account',
+            field=models.CharField(db_index=True, default='', max_length=255),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.18 on 2026-10-18 13:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('google_auth', '0005_multi_account'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='oauthtoken',
+            name='calendar_ids',
+            field=models.TextField(blank=True),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.18 on 2026-10-18 14:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('google_auth', '0006_oauthtoken_calendar_ids'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='calendarsyncstate',
+            name='single_events',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='time_zone',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='all_day',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='recurrence',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='recurring_event_id',
+            field=models.CharField(blank=True, db_index=True, max_length=1024),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='is_generated',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='expanded_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
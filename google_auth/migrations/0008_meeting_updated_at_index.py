@@ -0,0 +1,18 @@
+# Generated by Django 4.2.18 on 2026-10-18 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('google_auth', '0007_local_recurrence'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='meeting',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.18 on 2026-10-18 16:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('google_auth', '0008_meeting_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeetingJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('meet_link', models.URLField()),
+                ('summary', models.TextField(blank=True)),
+                ('account', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('scheduled', 'Scheduled'), ('launching', 'Launching'), ('waiting_admission', 'Waiting for admission'), ('in_meeting', 'In meeting'), ('left', 'Left'), ('failed', 'Failed')], default='scheduled', max_length=32)),
+                ('scheduled_at', models.DateTimeField(db_index=True)),
+                ('launching_at', models.DateTimeField(blank=True, null=True)),
+                ('waiting_admission_at', models.DateTimeField(blank=True, null=True)),
+                ('in_meeting_at', models.DateTimeField(blank=True, null=True)),
+                ('left_at', models.DateTimeField(blank=True, null=True)),
+                ('failed_at', models.DateTimeField(blank=True, null=True)),
+                ('failure_reason', models.TextField(blank=True)),
+                ('worker_id', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('meeting', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='google_auth.meeting')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'scheduled_at'], name='meetingjob_status_sched_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.18 on 2026-10-18 19:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('google_auth', '0010_meetingjob_lease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meetingjob',
+            name='launch_wait',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='meetingjob',
+            name='merged_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='meetingjob',
+            name='merged_into',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='merged_jobs', to='google_auth.meetingjob'),
+        ),
+        migrations.AlterField(
+            model_name='meetingjob',
+            name='status',
+            field=models.CharField(choices=[('scheduled', 'Scheduled'), ('launching', 'Launching'), ('waiting_admission', 'Waiting for admission'), ('in_meeting', 'In meeting'), ('left', 'Left'), ('failed', 'Failed'), ('merged', 'Merged into another bot')], default='scheduled', max_length=32),
+        ),
+    ]
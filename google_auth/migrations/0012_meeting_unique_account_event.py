@@ -0,0 +1,22 @@
+# Generated by Django 4.2.18 on 2026-10-18 20:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('google_auth', '0011_meetingjob_admission'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='meeting',
+            name='event_id',
+            field=models.CharField(max_length=1024),
+        ),
+        migrations.AddConstraint(
+            model_name='meeting',
+            constraint=models.UniqueConstraint(fields=('account', 'event_id'), name='unique_account_event'),
+        ),
+    ]
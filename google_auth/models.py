@@ -1,7 +1,17 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F, Q
 from django.utils import timezone
+from datetime import timedelta
 import pytz
 
+
+def parse_calendar_ids(value):
+    """Split a comma-separated calendar id list, falling back to settings.GOOGLE_CALENDAR_IDS"""
+    calendar_ids = [calendar_id.strip() for calendar_id in (value or '').split(',') if calendar_id.strip()]
+    return calendar_ids or list(getattr(settings, 'GOOGLE_CALENDAR_IDS', ['primary']))
+
+
 class OAuthToken(models.Model):
     token = models.TextField()
     refresh_token = models.TextField(blank=True)
@@ -10,7 +20,10 @@ class OAuthToken(models.Model):
     client_secret = models.TextField()
     scopes = models.TextField()
     universe_domain = models.TextField(blank=True, null=True)
-    account = models.TextField(blank=True, null=True)
+    # Google account (primary calendar id / email) the token belongs to
+    account = models.CharField(max_length=255, unique=True)
+    # Comma-separated calendar ids to read; empty means settings.GOOGLE_CALENDAR_IDS
+    calendar_ids = models.TextField(blank=True)
     expiry = models.DateTimeField(default=timezone.now)
 
     def save(self, *args, **kwargs):
@@ -22,4 +35,346 @@ class OAuthToken(models.Model):
         """Return timezone-aware expiry time"""
         if self.expiry and self.expiry.tzinfo is None:
             return pytz.UTC.localize(self.expiry)
-        return self.expiry.astimezone(pytz.UTC)
\ No newline at end of file
+        return self.expiry.astimezone(pytz.UTC)
+
+    def get_calendar_ids(self):
+        """Return the calendar ids configured for this account"""
+        return parse_calendar_ids(self.calendar_ids)
+
+class CalendarSyncState(models.Model):
+    """Incremental sync bookkeeping for a single Google Calendar of one account."""
+    account = models.CharField(max_length=255, default='')
+    calendar_id = models.CharField(max_length=255)
+    sync_token = models.TextField(blank=True)
+    # Whether the token was obtained with singleEvents=True (server-side recurrence expansion)
+    single_events = models.BooleanField(default=True)
+    last_full_sync = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'calendar_id'], name='unique_account_calendar_sync'),
+        ]
+
+    def __str__(self):
+        return f"CalendarSyncState({self.account}, {self.calendar_id})"
+
+
+class MeetingQuerySet(models.QuerySet):
+    def upcoming(self, now=None):
+        """Meetings that have not started yet and were not cancelled, soonest first."""
+        now = now or timezone.now()
+        return (self.filter(start_time__gt=now, recurrence='')
+                .exclude(status=Meeting.STATUS_CANCELLED)
+                .order_by('start_time'))
+
+    def masters(self):
+        """Recurring series masters (expanded locally into single occurrences)."""
+        return self.exclude(recurrence='')
+
+
+class Meeting(models.Model):
+    """A Google Calendar event the bot may join, keyed by account and Calendar event id."""
+    STATUS_CONFIRMED = 'confirmed'
+    STATUS_TENTATIVE = 'tentative'
+    STATUS_CANCELLED = 'cancelled'
+
+    # Unique per account: an event shared with several signed-in accounts is stored once for each
+    event_id = models.CharField(max_length=1024)
+    account = models.CharField(max_length=255, blank=True)
+    calendar_id = models.CharField(max_length=255, default='primary')
+    etag = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=32, default=STATUS_CONFIRMED)
+    summary = models.TextField(blank=True)
+    start_time = models.DateTimeField(db_index=True)
+    end_time = models.DateTimeField(blank=True, null=True)
+    meet_link = models.URLField(blank=True)
+    conference_uri = models.TextField(blank=True)
+    time_zone = models.CharField(max_length=64, blank=True)
+    all_day = models.BooleanField(default=False)
+    # RRULE/EXDATE/RDATE lines of a recurring master, one per line; empty for single events
+    recurrence = models.TextField(blank=True)
+    # Set on occurrences of a recurring series (generated locally or sent by Google as exceptions)
+    recurring_event_id = models.CharField(max_length=1024, blank=True, db_index=True)
+    is_generated = models.BooleanField(default=False)
+    # Masters only: occurrences exist up to this time
+    expanded_until = models.DateTimeField(blank=True, null=True)
+    # Indexed so the resident scheduler can cheaply pick up changed rows
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = MeetingQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'event_id'], name='unique_account_event'),
+        ]
+
+    def __str__(self):
+        return f"{self.summary} at {self.start_time}"
+
+
+class CalendarWatchChannel(models.Model):
+    """A Calendar events.watch push notification channel registered with Google."""
+    channel_id = models.CharField(max_length=64, unique=True)
+    resource_id = models.CharField(max_length=255, blank=True)
+    account = models.CharField(max_length=255, default='', db_index=True)
+    calendar_id = models.CharField(max_length=255, default='primary')
+    token = models.CharField(max_length=255)
+    expiration = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"CalendarWatchChannel({self.calendar_id}, expires {self.expiration})"
+
+
+class MeetingJobQuerySet(models.QuerySet):
+    def active(self):
+        """Bots currently launching, waiting in the lobby or in a meeting."""
+        return self.filter(status__in=MeetingJob.ACTIVE_STATUSES)
+
+    def queued(self):
+        """Jobs waiting for a bot worker to claim them."""
+        return self.filter(status=MeetingJob.STATUS_SCHEDULED, worker_id='')
+
+    def late(self, now=None, grace=None):
+        """Jobs still waiting to launch although their meeting should have started."""
+        now = now or timezone.now()
+        grace = grace if grace is not None else timedelta(minutes=1)
+        return self.filter(status=MeetingJob.STATUS_SCHEDULED, scheduled_at__lt=now - grace)
+
+    def running_or_late(self, now=None, grace=None):
+        return (self.active() | self.late(now, grace)).order_by('scheduled_at')
+
+
+class MeetingJob(models.Model):
+    """One bot run for a meeting, with the time it entered each lifecycle status."""
+    STATUS_SCHEDULED = 'scheduled'
+    STATUS_LAUNCHING = 'launching'
+    STATUS_WAITING_ADMISSION = 'waiting_admission'
+    STATUS_IN_MEETING = 'in_meeting'
+    STATUS_LEFT = 'left'
+    STATUS_FAILED = 'failed'
+    STATUS_MERGED = 'merged'
+
+    STATUS_CHOICES = [
+        (STATUS_SCHEDULED, 'Scheduled'),
+        (STATUS_LAUNCHING, 'Launching'),
+        (STATUS_WAITING_ADMISSION, 'Waiting for admission'),
+        (STATUS_IN_MEETING, 'In meeting'),
+        (STATUS_LEFT, 'Left'),
+        (STATUS_FAILED, 'Failed'),
+        (STATUS_MERGED, 'Merged into another bot'),
+    ]
+    ACTIVE_STATUSES = (STATUS_LAUNCHING, STATUS_WAITING_ADMISSION, STATUS_IN_MEETING)
+    FINAL_STATUSES = (STATUS_LEFT, STATUS_FAILED, STATUS_MERGED)
+    # Field stamped when a job enters each status; 'scheduled' is set on creation or re-queue only
+    STATUS_TIMESTAMPS = {
+        STATUS_LAUNCHING: 'launching_at',
+        STATUS_WAITING_ADMISSION: 'waiting_admission_at',
+        STATUS_IN_MEETING: 'in_meeting_at',
+        STATUS_LEFT: 'left_at',
+        STATUS_FAILED: 'failed_at',
+        STATUS_MERGED: 'merged_at',
+    }
+
+    meeting = models.ForeignKey(Meeting, blank=True, null=True, on_delete=models.SET_NULL, related_name='jobs')
+    meet_link = models.URLField()
+    summary = models.TextField(blank=True)
+    account = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=32, choices=STATUS_CHOICES, default=STATUS_SCHEDULED)
+    scheduled_at = models.DateTimeField(db_index=True)
+    launching_at = models.DateTimeField(blank=True, null=True)
+    waiting_admission_at = models.DateTimeField(blank=True, null=True)
+    in_meeting_at = models.DateTimeField(blank=True, null=True)
+    left_at = models.DateTimeField(blank=True, null=True)
+    failed_at = models.DateTimeField(blank=True, null=True)
+    merged_at = models.DateTimeField(blank=True, null=True)
+    failure_reason = models.TextField(blank=True)
+    # Seconds spent waiting for a launch slot (see google_auth.admission)
+    launch_wait = models.FloatField(blank=True, null=True)
+    # The job whose bot covers this meeting, for joins merged into it
+    merged_into = models.ForeignKey('self', blank=True, null=True, on_delete=models.SET_NULL, related_name='merged_jobs')
+    # host:pid of the process running the bot; blank while queued for a bot worker
+    worker_id = models.CharField(max_length=255, blank=True)
+    # Bot worker lease: renewed by heartbeats, re-queued by any worker once it expires
+    attempts = models.PositiveIntegerField(default=0)
+    heartbeat_at = models.DateTimeField(blank=True, null=True)
+    lease_expires_at = models.DateTimeField(blank=True, null=True, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = MeetingJobQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'scheduled_at'], name='meetingjob_status_sched_idx'),
+        ]
+
+    @classmethod
+    def transition(cls, job_id, status, failure_reason='', worker_id=None):
+        """
+        Move a job to ``status`` with one single-row UPDATE, stamping ``<status>_at``.
+
+        Finished jobs (left, failed or merged) are never moved again. With
+        ``worker_id`` the job is only moved while that worker holds it.
+
+        Returns:
+            bool: Whether the job was updated
+
+        Raises:
+            ValueError: If ``status`` is not a status a job can move to
+        """
+        if status not in cls.STATUS_TIMESTAMPS:
+            raise ValueError(f"Cannot transition a meeting job to '{status}'")
+        now = timezone.now()
+        fields = {'status': status, cls.STATUS_TIMESTAMPS[status]: now, 'updated_at': now}
+        if failure_reason:
+            fields['failure_reason'] = failure_reason[:2000]
+        jobs = cls.objects.filter(pk=job_id).exclude(status__in=cls.FINAL_STATUSES)
+        if worker_id is not None:
+            jobs = jobs.filter(worker_id=worker_id)
+        return jobs.update(**fields) == 1
+
+    @classmethod
+    def claim(cls, worker_id, limit, due_by, lease):
+        """
+        Take up to ``limit`` queued jobs scheduled by ``due_by`` for ``worker_id``, soonest first.
+
+        Rows being claimed by another worker are skipped (FOR UPDATE SKIP
+        LOCKED), so any number of workers can poll the queue without
+        blocking each other or claiming a job twice.
+
+        Returns:
+            list: The claimed jobs
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            job_ids = list(
+                cls.objects.queued().filter(scheduled_at__lte=due_by).order_by('scheduled_at')
+                .select_for_update(skip_locked=True).values_list('pk', flat=True)[:limit]
+            )
+            cls.objects.filter(pk__in=job_ids).update(
+                worker_id=worker_id, attempts=F('attempts') + 1,
+                heartbeat_at=now, lease_expires_at=now + lease, updated_at=now,
+            )
+        return list(cls.objects.filter(pk__in=job_ids).order_by('scheduled_at'))
+
+    @classmethod
+    def merge_into_active(cls, job, code):
+        """
+        Merge ``job`` into another job whose bot is already on the meeting ``code``, on any worker.
+
+        Jobs claimed but not launched yet count as well when they were
+        created first, so two workers claiming duplicates at once never
+        merge into each other.
+
+        Returns:
+            MeetingJob: The covering job, or None when there is none
+        """
+        primary = (
+            cls.objects.filter(meet_link__icontains=code)
+            .filter(Q(status__in=cls.ACTIVE_STATUSES)
+                    | (Q(status=cls.STATUS_SCHEDULED, pk__lt=job.pk) & ~Q(worker_id='')))
+            .exclude(pk=job.pk).order_by('pk').first()
+        )
+        if primary is None:
+            return None
+
+        now = timezone.now()
+        cls.objects.filter(pk=job.pk, worker_id=job.worker_id).exclude(status__in=cls.FINAL_STATUSES).update(
+            status=cls.STATUS_MERGED, merged_at=now, merged_into=primary, lease_expires_at=None, updated_at=now,
+        )
+        return primary
+
+    @classmethod
+    def requeue_merged(cls, worker_id='', lease=None):
+        """
+        Re-queue merged jobs their covering job no longer covers.
+
+        That is when it failed, was itself merged, or left before the merged
+        job's start. With ``worker_id`` the jobs are handed to that worker
+        (leased for ``lease``) instead of the queue.
+
+        Returns:
+            list: Ids of the re-queued jobs
+        """
+        now = timezone.now()
+        uncovered = cls.objects.filter(status=cls.STATUS_MERGED).filter(
+            Q(merged_into__isnull=True)
+            | Q(merged_into__status__in=(cls.STATUS_FAILED, cls.STATUS_MERGED))
+            | Q(merged_into__status=cls.STATUS_LEFT, merged_into__left_at__lt=F('scheduled_at'))
+        )
+        fields = {'status': cls.STATUS_SCHEDULED, 'worker_id': worker_id, 'merged_into': None,
+                  'merged_at': None, 'updated_at': now}
+        if worker_id:
+            fields.update(attempts=F('attempts') + 1, heartbeat_at=now, lease_expires_at=now + lease)
+
+        with transaction.atomic():
+            job_ids = list(uncovered.select_for_update(skip_locked=True, of=('self',)).values_list('pk', flat=True))
+            cls.objects.filter(pk__in=job_ids).update(**fields)
+        return job_ids
+
+    @classmethod
+    def renew_leases(cls, worker_id, job_ids, lease):
+        """
+        Extend the leases ``worker_id`` still holds among ``job_ids``.
+
+        Returns:
+            set: Ids of the jobs the worker still holds
+        """
+        now = timezone.now()
+        held = cls.objects.filter(pk__in=job_ids, worker_id=worker_id).exclude(status__in=cls.FINAL_STATUSES)
+        held.update(heartbeat_at=now, lease_expires_at=now + lease)
+        return set(held.values_list('pk', flat=True))
+
+    @classmethod
+    def requeue_expired(cls, max_attempts, requeue=True):
+        """
+        Put unfinished jobs whose worker stopped heartbeating back in the queue.
+
+        Jobs already claimed ``max_attempts`` times fail instead, as do all
+        of them without ``requeue`` (no bot workers to run them).
+
+        Returns:
+            tuple: (requeued, failed) job counts
+        """
+        now = timezone.now()
+        expired = cls.objects.filter(lease_expires_at__lt=now).exclude(status__in=cls.FINAL_STATUSES)
+        if not requeue:
+            max_attempts = 0
+        failed = expired.filter(attempts__gte=max_attempts).update(
+            status=cls.STATUS_FAILED, failed_at=now, failure_reason='Worker lease expired',
+            lease_expires_at=None, updated_at=now,
+        )
+        requeued = expired.update(
+            status=cls.STATUS_SCHEDULED, worker_id='', heartbeat_at=None, lease_expires_at=None, updated_at=now,
+        )
+        return requeued, failed
+
+    def as_dict(self):
+        def iso(value):
+            return value.isoformat() if value else None
+
+        return {
+            "job_id": self.pk,
+            "meet_link": self.meet_link,
+            "summary": self.summary,
+            "account": self.account,
+            "status": self.status,
+            "scheduled_at": iso(self.scheduled_at),
+            "launching_at": iso(self.launching_at),
+            "waiting_admission_at": iso(self.waiting_admission_at),
+            "in_meeting_at": iso(self.in_meeting_at),
+            "left_at": iso(self.left_at),
+            "failed_at": iso(self.failed_at),
+            "merged_at": iso(self.merged_at),
+            "failure_reason": self.failure_reason,
+            "launch_wait": self.launch_wait,
+            "merged_into": self.merged_into_id,
+            "worker_id": self.worker_id,
+            "attempts": self.attempts,
+            "heartbeat_at": iso(self.heartbeat_at),
+        }
+
+    def __str__(self):
+        return f"MeetingJob({self.meet_link}, {self.status})"
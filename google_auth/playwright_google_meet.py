@@ -1,31 +1,327 @@
 import os
+import re
 import json
+import asyncio
+import inspect
 import logging
-from datetime import datetime
-from playwright.sync_api import sync_playwright
+import time
+from playwright.async_api import async_playwright
+from playwright.sync_api import Error as PlaywrightError, sync_playwright
 from django.conf import settings
+from django.utils import timezone
 from urllib.parse import urlparse
 from pathlib import Path
 
+from .browser_profiles import acquire_profile
+from .events import event_publisher
+from .log_pipeline import attach_console_logging
+from .screenshots import ScreenshotRecorder
+
 # Setup logger
 logger = logging.getLogger(__name__)
 
+# Screens Meet shows when the bot has to leave, matched case-insensitively
+MEETING_END_TEXTS = {
+    'removed': ["you've been removed from the meeting", "you have been removed from the meeting"],
+    'ended': ["the meeting has ended", "the call has ended", "you left the meeting", "return to home screen"],
+}
+
+# Watches the page with a MutationObserver and resolves once the bot is alone in the
+# meeting (participant counter shows 1), was removed, or the meeting ended. Only the
+# mutated nodes are inspected, so an idle meeting costs no CDP round-trips and next to
+# no CPU. The reason is also left on <html data-meet-bot-end> for debugging.
+MEETING_END_SCRIPT = """
+() => new Promise(resolve => {
+    const endTexts = __END_TEXTS__;
+    const normalise = text => (text || '').replace(/\u2019/g, "'").toLowerCase();
+    const visible = element => !!(element.offsetWidth || element.offsetHeight || element.getClientRects().length);
+
+    const isAloneCounter = element => element && element.tagName === 'DIV'
+        && Array.from(element.childNodes).some(child => child.nodeType === Node.TEXT_NODE && child.data === '1')
+        && visible(element);
+
+    const endText = node => {
+        const text = normalise(node.textContent);
+        for (const [reason, phrases] of Object.entries(endTexts)) {
+            if (phrases.some(phrase => text.includes(phrase))) {
+                return reason;
+            }
+        }
+        return null;
+    };
+
+    const inspect = node => {
+        if (node.nodeType === Node.TEXT_NODE) {
+            return isAloneCounter(node.parentElement) ? 'alone' : endText(node);
+        }
+        if (node.nodeType !== Node.ELEMENT_NODE) {
+            return null;
+        }
+        if (isAloneCounter(node)) {
+            return 'alone';
+        }
+        const counters = document.evaluate(".//div[text()='1']", node, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (let i = 0; i < counters.snapshotLength; i++) {
+            if (visible(counters.snapshotItem(i))) {
+                return 'alone';
+            }
+        }
+        return endText(node);
+    };
+
+    const finish = reason => {
+        observer.disconnect();
+        document.documentElement.setAttribute('data-meet-bot-end', reason);
+        resolve(reason);
+    };
+
+    const observer = new MutationObserver(records => {
+        for (const record of records) {
+            const nodes = record.type === 'characterData' ? [record.target] : Array.from(record.addedNodes);
+            for (const node of nodes) {
+                const reason = inspect(node);
+                if (reason) {
+                    return finish(reason);
+                }
+            }
+        }
+    });
+    observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+
+    const current = inspect(document.body || document.documentElement);
+    if (current) {
+        finish(current);
+    }
+})
+""".replace('__END_TEXTS__', json.dumps(MEETING_END_TEXTS))
+
+# Production mode: synthetic camera/mic and no audio output. Headless mode is not a flag
+# here: Playwright picks it from the launch options (see browser_launch_options).
+PRODUCTION_LAUNCH_ARGS = [
+    '--use-fake-device-for-media-stream',
+    '--mute-audio',
+    '--disable-gpu',
+    '--disable-dev-shm-usage',
+    '--disable-extensions',
+    '--disable-background-networking',
+]
+
+# Meet subscribes to video layers by rendered tile size, so a small viewport keeps
+# incoming streams at the lowest resolutions
+PRODUCTION_VIEWPORT = {'width': 640, 'height': 360}
+
+# Requests aborted in production mode. Only matching URLs are routed through
+# Playwright, everything else goes straight to the network.
+BLOCKED_REQUESTS = re.compile(
+    r'\.(png|jpe?g|gif|webp|svg|ico|woff2?|ttf|otf)(\?|$)'
+    r'|fonts\.(googleapis|gstatic)\.com'
+    r'|lh3\.googleusercontent\.com'
+    r'|google-analytics\.com|googletagmanager\.com|doubleclick\.net'
+    r'|play\.google\.com/log'
+)
+
+# Clicks the green room's microphone and camera toggles if they are still on
+MEDIA_OFF_SCRIPT = """
+() => {
+    const turnedOff = [];
+    for (const label of ['Turn off microphone', 'Turn off camera']) {
+        const button = document.querySelector(`[aria-label^="${label}"]`);
+        if (button) {
+            button.click();
+            turnedOff.push(label);
+        }
+    }
+    return turnedOff;
+}
+"""
+
+
+def production_mode(production=None):
+    """Whether bots run in low-footprint production mode (MEET_BOT_PRODUCTION_MODE)."""
+    return getattr(settings, 'MEET_BOT_PRODUCTION_MODE', False) if production is None else production
+
+
+def browser_launch_options(production=None):
+    """Keyword arguments for chromium.launch() in the given mode."""
+    if production_mode(production):
+        # The 'chromium' channel runs the full browser in new headless mode instead of
+        # the separate old-headless shell; no --headless flag may compete with it
+        return {
+            'headless': True, 'channel': 'chromium', 'args': MeetAutomationBase.LAUNCH_ARGS + PRODUCTION_LAUNCH_ARGS,
+        }
+    return {'headless': False, 'args': MeetAutomationBase.LAUNCH_ARGS}
+
+
+# Reports the participant count shown on the People button through the meetBotParticipants
+# binding whenever it changes; checks are batched to at most one per 250ms of DOM churn
+PARTICIPANT_WATCH_SCRIPT = """
+() => {
+    if (window.__meetBotParticipantWatch) {
+        return;
+    }
+    window.__meetBotParticipantWatch = true;
+
+    let last = null;
+    let scheduled = false;
+    const read = () => {
+        scheduled = false;
+        const button = document.querySelector('[aria-label^="Show everyone"], [aria-label^="People"], [aria-label*="participant"]');
+        const match = button && (button.textContent || '').match(/\\d+/);
+        const count = match ? parseInt(match[0], 10) : null;
+        if (count !== null && count !== last) {
+            last = count;
+            window.meetBotParticipants(count);
+        }
+    };
+
+    new MutationObserver(() => {
+        if (!scheduled) {
+            scheduled = true;
+            setTimeout(read, 250);
+        }
+    }).observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+    read();
+}
+"""
+
+# Bytes fetched over the network for the document and its resources (cache hits count as 0)
+TRANSFER_SIZE_SCRIPT = """
+() => performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'))
+    .reduce((total, entry) => total + (entry.transferSize || 0), 0)
+"""
+
+# Prejoin states raced at once: the first state (in order) with a visible match wins.
+# Joinable states carry the XPath of the button to click.
+JOIN_STATES = [
+    ('join_now', ["//span[text()='Join now']/.."]),
+    ('ask_to_join', [
+        "//span[contains(text(),'Ask to join')]/..",
+        "//button[contains(., 'Ask to join')]",
+        "//button[@aria-label='Ask to join']",
+    ]),
+    ('cant_join', [
+        "//*[contains(text(),\"You can't join this video call\")]",
+        "//*[contains(text(),'You can’t join this video call')]",
+    ]),
+    ('sign_in_required', [
+        "//*[contains(text(),'Sign in with your Google account')]",
+        "//input[@type='email']",  # Redirected to the Google sign-in page
+    ]),
+    ('not_started', [
+        "//*[contains(text(),'Waiting for the host')]",
+        "//*[contains(text(),\"This meeting hasn't started\")]",
+        "//*[contains(text(),'This meeting hasn’t started')]",
+    ]),
+]
+JOINABLE_STATES = ('join_now', 'ask_to_join')
+
+# How long the prejoin screen may take to settle on one of the JOIN_STATES, in ms
+JOIN_STATE_TIMEOUT = 15000
+
+# Navigation to the meeting, the join click and waiting to be admitted, in ms
+GOTO_TIMEOUT = 30000
+JOIN_CLICK_TIMEOUT = 5000
+ADMISSION_TIMEOUT = 60000
+
+# Evaluated by wait_for_function until one of the states is visible; returns {state, xpath}
+JOIN_STATE_SCRIPT = """
+states => {
+    const visible = element => !!(element.offsetWidth || element.offsetHeight || element.getClientRects().length);
+    for (const [state, xpaths] of states) {
+        for (const xpath of xpaths) {
+            const matches = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            for (let i = 0; i < matches.snapshotLength; i++) {
+                if (visible(matches.snapshotItem(i))) {
+                    return {state, xpath};
+                }
+            }
+        }
+    }
+    return null;
+}
+"""
+
+
+def _run_steps(steps):
+    """
+    Run a step generator of MeetAutomationBase with the sync API.
+
+    Each yielded call is made and its result sent back (or its exception
+    thrown in) until the generator returns.
+    """
+    send, value = steps.send, None
+    while True:
+        try:
+            call = send(value)
+        except StopIteration as done:
+            return done.value
+        try:
+            send, value = steps.send, call()
+        except Exception as e:
+            send, value = steps.throw, e
 
-class GoogleMeetAutomation:
-    """Class to automate joining a Google Meet and starting recording."""
+
+async def _run_steps_async(steps):
+    """Run a step generator of MeetAutomationBase with the async API, awaiting the calls that need it."""
+    send, value = steps.send, None
+    while True:
+        try:
+            call = send(value)
+        except StopIteration as done:
+            return done.value
+        try:
+            value = call()
+            if inspect.isawaitable(value):
+                value = await value
+            send = steps.send
+        except Exception as e:
+            send, value = steps.throw, e
+
+
+class MeetAutomationBase:
+    """
+    Meeting link validation, selectors and the join flow shared by the sync and async automations.
+
+    prewarm, join and wait_for_meeting_end are written once here as step
+    generators: they yield zero-argument calls into Playwright and get the
+    results back, so the subclasses only run them with ``_run_steps`` or
+    ``_run_steps_async`` and provide ``_setup_browser_context``, ``_sleep``
+    and ``_capture`` for their API.
+    """
 
     # SESSION_FILE = os.path.join(settings.BASE_DIR, 'google_session.json')
     SESSION_FILE = Path(__file__).resolve().parent.parent / 'google_session.json'
 
-    def __init__(self, meeting_link=None):
+    # Selectors
+    IN_MEETING_SELECTOR = "//div[contains(text(),'You’re in the meeting')]"
+
+    PERMISSIONS = ["microphone", "camera"]
+    LAUNCH_ARGS = ['--use-fake-ui-for-media-stream']  # Auto-allow camera/mic permissions
+
+    def __init__(self, meeting_link=None, production=None, account='', listener=None):
         """
         Initialize the automation class with a meeting link.
 
         Args:
             meeting_link (str): The Google Meet URL to join
+            production (bool): Low-footprint headless mode; defaults to MEET_BOT_PRODUCTION_MODE
+            account (str): Calendar account of the meeting, selects its browser profile
+            listener (callable): Called with each lifecycle status (launching,
+                waiting_admission, in_meeting, left) as the bot reaches it
         """
+        self.production = production_mode(production)
+        self.account = account
+        self.listener = listener
+        self.profile = None
+        self.transfer_bytes = None
         self.browser = None
         self.context = None
+        self.page = None
+        self.join_latency = None
+        self.join_state = None
+        self.timings = {}
+        self._join_selector = None
+        self._phase_mark = None
 
         if not meeting_link:
             raise ValueError("Meeting link is required")
@@ -35,6 +331,7 @@ class GoogleMeetAutomation:
             raise ValueError(f"Invalid Google Meet link: {meeting_link}")
 
         self.meeting_link = meeting_link
+        self.screenshots = ScreenshotRecorder(meeting_link)
         logger.info(f"Initializing automation for meeting: {self.meeting_link}")
 
     def _is_valid_meet_link(self, url):
@@ -46,130 +343,562 @@ class GoogleMeetAutomation:
             logger.error(f"Error validating meet link: {e}")
             return False
 
-    def _setup_browser_context(self, playwright):
-        """Set up browser context with necessary permissions."""
+    def _publish(self, event_type, **data):
+        """Stream a lifecycle or phase event to live subscribers (see google_auth.events)."""
+        event_publisher.publish(event_type, self.meeting_link, **data)
+
+    def _emit(self, status, **data):
+        """Report a lifecycle status to the listener and subscribers; listener errors never break the bot."""
+        self._publish(status, **data)
+        if self.listener is None:
+            return
+        try:
+            self.listener(status)
+        except Exception as e:
+            logger.error(f"Status listener failed for '{status}': {e}")
+
+    def _on_participants(self, source, count):
+        self._publish('participants', count=count)
+
+    def _context_options(self):
+        return {'viewport': PRODUCTION_VIEWPORT} if self.production else {}
+
+    def _acquire_profile(self):
+        """
+        Lock a persistent profile for this meeting when MEET_BOT_PERSISTENT_PROFILE is on.
+
+        Returns:
+            bool: True when the context should be launched on ``self.profile``
+        """
+        if getattr(settings, 'MEET_BOT_PERSISTENT_PROFILE', False) and self.profile is None:
+            self.profile = acquire_profile(self.account)
+        return self.profile is not None
+
+    def _release_profile(self):
+        if self.profile is not None:
+            self.profile.release()
+            self.profile = None
+
+    def _session_cookies(self):
+        """Cookies of the saved Google session, added to persistent profiles on every launch."""
+        if not os.path.exists(self.SESSION_FILE):
+            logger.info("No session file found. Using the profile's own cookies.")
+            return []
+        try:
+            with open(self.SESSION_FILE, 'r') as file:
+                return json.load(file).get('cookies', [])
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to load session: {e}. Using the profile's own cookies.")
+            return []
+
+    def _start_phases(self):
+        self._phase_mark = time.monotonic()
+
+    def _mark_phase(self, phase):
+        """Record how long ``phase`` took since the previous mark, in seconds."""
+        now = time.monotonic()
+        self.timings[phase] = round(now - (self._phase_mark or now), 3)
+        self._phase_mark = now
+
+    def _log_timings(self, response, prewarmed):
+        """Emit one JSON record per join attempt so phase timings can be aggregated across meetings."""
+        logger.info("Join timings: " + json.dumps({
+            "meeting_link": self.meeting_link,
+            "status": response["status"],
+            "join_state": self.join_state,
+            "prewarmed": prewarmed,
+            "join_latency": self.join_latency,
+            "transfer_bytes": self.transfer_bytes,
+            "persistent_profile": self.profile.path if self.profile else None,
+            "phases": self.timings,
+        }))
+
+    def _apply_join_state(self, detected, elapsed):
+        """
+        Record the prejoin state that won the race.
+
+        Returns:
+            dict: Error response when there is nothing to click, else None
+        """
+        self._publish('prejoin_detected', state=detected and detected['state'], seconds=round(elapsed, 3))
+        if detected is None:
+            logger.info("No known prejoin state appeared. Exiting.")
+            return {"status": "error", "message": "No join button found", "join_state": None}
+
+        self.join_state = detected['state']
+        logger.info(f"Prejoin state '{self.join_state}' detected after {elapsed:.2f}s")
+        if self.join_state not in JOINABLE_STATES:
+            return {"status": "error", "message": f"Cannot join: {self.join_state}", "join_state": self.join_state}
+
+        self._join_selector = f"xpath={detected['xpath']}"
+        return None
+
+    def _join_result(self, prewarmed):
+        return {
+            "status": "success",
+            "message": "Joined the meeting",
+            "join_state": self.join_state,
+            "prewarmed": prewarmed,
+            "join_latency": self.join_latency,
+            "timings": self.timings,
+        }
+
+    def _prewarm_steps(self):
+        if self.page is not None:
+            return {"status": "success", "message": "Already prewarmed", "join_state": self.join_state}
+
+        page = None
         try:
-            # Launch browser with video/audio permissions
-            self.browser = playwright.chromium.launch(
-                headless=False,
-                args=['--use-fake-ui-for-media-stream']  # Auto-allow camera/mic permissions
-            )
-            permissions = ["microphone", "camera"]
-
-            # Load existing session if available
-            if os.path.exists(self.SESSION_FILE):
+            self._emit('launching')
+            self._start_phases()
+            if self.context is None and not (yield self._setup_browser_context):
+                return {"status": "error", "message": "Failed to setup browser"}
+
+            # A persistent context starts with a blank tab, reuse it
+            page = self.context.pages[0] if self.context.pages else (yield self.context.new_page)
+            attach_console_logging(page, self.meeting_link)
+
+            # A live Meet page never goes network-idle; the prejoin UI is waited for below instead
+            logger.info(f"Navigating to meeting URL: {self.meeting_link}")
+            yield lambda: page.goto(self.meeting_link, timeout=GOTO_TIMEOUT, wait_until='domcontentloaded')
+            self._mark_phase('goto')
+            self._publish('navigated', seconds=self.timings['goto'])
+
+            # Race every known prejoin state instead of probing selectors one by one
+            try:
+                handle = yield lambda: page.wait_for_function(
+                    JOIN_STATE_SCRIPT, arg=JOIN_STATES, timeout=JOIN_STATE_TIMEOUT, polling=100
+                )
+                detected = yield handle.json_value
+            except PlaywrightError as detect_err:
+                logger.info(f"Prejoin state detection failed: {detect_err}")
+                detected = None
+            self._mark_phase('prejoin_ready')
+            self.transfer_bytes = yield lambda: page.evaluate(TRANSFER_SIZE_SCRIPT)
+
+            title = yield page.title
+            logger.info(f"Page title: {title}")
+
+            error = self._apply_join_state(detected, self.timings['prejoin_ready'])
+            yield lambda: self._capture(page, 'prejoin', failure=bool(error))
+            if error:
+                yield page.close
+                return error
+
+            if self.production:
+                turned_off = yield lambda: page.evaluate(MEDIA_OFF_SCRIPT)
+                logger.info(f"Media toggles switched: {turned_off}")
+
+            self.page = page
+            logger.info(f"Green room ready in {sum(self.timings.values()):.2f}s")
+            return {"status": "success", "message": "Prewarmed", "join_state": self.join_state}
+
+        except Exception as e:
+            logger.error(f"Error prewarming meeting page: {e}")
+            if page is not None and not page.is_closed():
+                yield lambda: self._capture(page, 'prewarm_error', failure=True)
+                yield page.close
+            return {"status": "error", "message": str(e)}
+
+    def _join_steps(self, start_at):
+        prewarmed = self.page is not None
+        if start_at is not None:
+            delay = (start_at - timezone.now()).total_seconds()
+            if delay > 0:
+                yield lambda: self._sleep(delay)
+        requested_at = max(start_at, timezone.now()) if start_at is not None else timezone.now()
+
+        response = yield from self._click_join_steps(requested_at, prewarmed)
+        self._log_timings(response, prewarmed)
+        if response["status"] != "success":
+            self._publish('failed', message=response.get("message"))
+        return response
+
+    def _click_join_steps(self, requested_at, prewarmed):
+        if not prewarmed:
+            response = yield from self._prewarm_steps()
+            if response["status"] != "success":
+                return response
+
+        page = self.page
+        self._start_phases()
+        needs_admission = self.join_state == 'ask_to_join'
+        logger.info(f"Clicking '{'Ask to join' if needs_admission else 'Join now'}' button")
+        yield lambda: page.click(self._join_selector, timeout=JOIN_CLICK_TIMEOUT)
+        self._mark_phase('click')
+        self._emit('waiting_admission' if needs_admission else 'in_meeting')
+
+        self.join_latency = (timezone.now() - requested_at).total_seconds()
+        logger.info(f"Join latency: {self.join_latency:.3f}s ({'prewarmed' if prewarmed else 'cold start'})")
+        self._publish('clicked', join_state=self.join_state, join_latency=self.join_latency)
+
+        if needs_admission:
+            # Wait to be admitted into the meeting
+            try:
+                yield lambda: page.wait_for_selector(self.IN_MEETING_SELECTOR, timeout=ADMISSION_TIMEOUT)
+                self._mark_phase('admitted')
+                self._publish('admitted', seconds=self.timings['admitted'])
+                self._emit('in_meeting')
+                logger.info("Successfully joined the meeting!")
+            except Exception as join_err:
+                logger.error(f"Error waiting for join confirmation: {join_err}")
+                yield lambda: self._capture(page, 'admission', failure=True)
+                return {"status": "error", "message": "Failed to confirm join request"}
+
+        yield lambda: self._capture(page, 'joined')
+        return self._join_result(prewarmed)
+
+    def _wait_for_meeting_end_steps(self):
+        page = self.page
+        try:
+            logger.info("Monitoring meeting status...")
+            yield lambda: page.expose_binding('meetBotParticipants', self._on_participants)
+
+            while True:
                 try:
-                    self.context = self.browser.new_context(storage_state=self.SESSION_FILE)
-                    logger.info("Loaded existing session from file.")
-                except Exception as e:
-                    logger.error(f"Failed to load session: {e}. Creating new context.")
-                    self.context = self.browser.new_context()
-            else:
-                logger.info("No session file found. Creating new context.")
-                self.context = self.browser.new_context()
+                    yield lambda: page.evaluate(PARTICIPANT_WATCH_SCRIPT)
+                    reason = yield lambda: page.evaluate(MEETING_END_SCRIPT)
+                    break
+                except PlaywrightError as e:
+                    if page.is_closed():
+                        reason = 'page closed'
+                        break
+                    if 'Execution context was destroyed' not in str(e):
+                        raise
+                    # Meet navigated to another document, watch that one instead
+                    yield lambda: page.wait_for_load_state('domcontentloaded')
+
+            logger.info(f"Meeting has ended ({reason}). Leaving now.")
+            self._emit('left', reason=reason)
+            if not page.is_closed():
+                yield lambda: self._capture(page, 'ended')
+                yield page.close
+
+        except Exception as end_meeting_err:
+            logger.error(f"Error checking meeting status: {end_meeting_err}")
+
+    def _join_google_meet_steps(self, start_at):
+        try:
+            logger.info(f"Attempting to join meeting at: {self.meeting_link}")
 
-            # Grant permissions
-            self.context.grant_permissions(permissions, origin="https://meet.google.com")
-            return True
+            response = yield from self._join_steps(start_at)
+            if response["status"] == "success":
+                yield from self._wait_for_meeting_end_steps()
+            return response
 
         except Exception as e:
-            logger.error(f"Error setting up browser context: {e}")
-            return False
+            logger.error(f"Comprehensive join error: {e}")
+            yield lambda: self._capture(self.page, 'error', failure=True)
+            return {"status": "error", "message": str(e)}
 
-    def join_google_meet(self):
+
+class GoogleMeetAutomation(MeetAutomationBase):
+    """Class to automate joining a Google Meet and starting recording."""
+
+    def __init__(self, meeting_link=None, pool=None, production=None, account='', listener=None):
         """
-        Automates the process of joining a Google Meet session and leaving when the meeting ends.
+        Initialize the automation class with a meeting link.
+
+        Args:
+            meeting_link (str): The Google Meet URL to join
+            pool (BrowserPool): Shared browsers to lease from instead of launching one
+            production (bool): Low-footprint headless mode; defaults to MEET_BOT_PRODUCTION_MODE
+            account (str): Calendar account of the meeting, selects its browser profile
+            listener (callable): Receives lifecycle statuses, see MeetAutomationBase
         """
+        self.pool = pool
+        self._lease = None
+        self._playwright = None
+        super().__init__(meeting_link, production, account, listener)
+
+    def _setup_persistent_context(self, playwright):
+        """Launch Chromium on the locked profile so Meet's HTTP and V8 code caches survive between joins."""
+        self.context = playwright.chromium.launch_persistent_context(
+            self.profile.path, **browser_launch_options(self.production), **self._context_options()
+        )
+        self._mark_phase('launch')
+        self.context.add_cookies(self._session_cookies())
+        logger.info(f"Using persistent profile {self.profile.path}")
+
+    def _setup_new_context(self, playwright):
+        if self.browser is None:
+            if self.pool is not None:
+                # Connect to a pooled browser; this meeting only gets its own context
+                self._lease = self.pool.lease(playwright.chromium.executable_path)
+                self.browser = playwright.chromium.connect_over_cdp(self._lease.endpoint)
+            else:
+                # Launch browser with video/audio permissions
+                self.browser = playwright.chromium.launch(**browser_launch_options(self.production))
+        self._mark_phase('launch')
+
+        # Load existing session if available
+        if os.path.exists(self.SESSION_FILE):
+            try:
+                self.context = self.browser.new_context(storage_state=self.SESSION_FILE, **self._context_options())
+                logger.info("Loaded existing session from file.")
+            except Exception as e:
+                logger.error(f"Failed to load session: {e}. Creating new context.")
+                self.context = self.browser.new_context(**self._context_options())
+        else:
+            logger.info("No session file found. Creating new context.")
+            self.context = self.browser.new_context(**self._context_options())
+
+    def _setup_browser_context(self):
+        """Set up browser context with necessary permissions."""
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
         try:
-            logger.info(f"Attempting to join meeting at: {self.meeting_link}")
+            if self._acquire_profile():
+                self._setup_persistent_context(self._playwright)
+            else:
+                self._setup_new_context(self._playwright)
 
-            with sync_playwright() as p:
-                if not self._setup_browser_context(p):
-                    return {"status": "error", "message": "Failed to setup browser"}
+            # Grant permissions
+            self.context.grant_permissions(self.PERMISSIONS, origin="https://meet.google.com")
+            if self.production:
+                self.context.route(BLOCKED_REQUESTS, lambda route: route.abort())
+            self._mark_phase('context')
+            return True
 
-                page = self.context.new_page()
-                page.on("console", lambda msg: logger.info(f"Browser Console: {msg.text}"))
-                page.on("pageerror", lambda err: logger.error(f"Page Error: {err}"))
+        except Exception as e:
+            logger.error(f"Error setting up browser context: {e}")
+            return False
 
-                logger.info(f"Navigating to meeting URL: {self.meeting_link}")
-                page.goto(self.meeting_link, timeout=30000, wait_until='networkidle')
+    def _sleep(self, seconds):
+        time.sleep(seconds)
 
-                logger.info(f"Page title: {page.title()}")
-                page.screenshot(path='meet_page.png')
+    def _capture(self, page, label, failure=False):
+        self.screenshots.capture(page, label, failure=failure)
 
-                # Selectors
-                join_now_selector = "//span[text()='Join now']/.."
-                ask_to_join_selectors = [
-                    "//span[contains(text(),'Ask to join')]/..",
-                    "button:has-text('Ask to join')",
-                    "button[aria-label='Ask to join']"
-                ]
+    def prewarm(self):
+        """
+        Launch the browser and park it on the meeting's green room.
 
-                # Click "Join now" if available, else click "Ask to join"
-                join_now_button = None
-                try:
-                    join_now_button = page.wait_for_selector(join_now_selector, timeout=5000)
-                except:
-                    pass
-
-                if join_now_button:
-                    logger.info("Clicking 'Join now' button")
-                    join_now_button.click()
-                else:
-                    join_button = None
-                    for selector in ask_to_join_selectors:
-                        try:
-                            join_button = page.wait_for_selector(selector, timeout=5000)
-                            if join_button:
-                                break
-                        except Exception as select_err:
-                            logger.info(f"Selector {selector} not found: {select_err}")
-
-                    if not join_button:
-                        logger.info("No 'Ask to join' or 'Join now' button found. Exiting.")
-                        return {"status": "error", "message": "No join button found"}
-
-                    logger.info("Clicking 'Ask to join' button")
-                    join_button.click()
-
-                    # Wait to be admitted into the meeting
-                    try:
-                        page.wait_for_selector("//div[contains(text(),'You’re in the meeting')]", timeout=60000)
-                        logger.info("Successfully joined the meeting!")
-                    except Exception as join_err:
-                        logger.error(f"Error waiting for join confirmation: {join_err}")
-                        return {"status": "error", "message": "Failed to confirm join request"}
-
-                # **Wait until meeting ends (when //div[text()='1'] is visible)**
-                try:
-                    logger.info("Monitoring meeting status...")
+        After this only the join click is left, so calling it ``lead`` seconds
+        before the start time takes browser launch, session loading and page
+        load off the join path.
+        """
+        return _run_steps(self._prewarm_steps())
 
-                    while True:
-                        if page.locator("//div[text()='1']").is_visible():
-                            logger.info("Meeting has ended (only 1 participant left). Leaving now.")
-                            break  # Exit the loop
+    def join(self, start_at=None):
+        """
+        Click the join button, prewarming first if that has not happened yet.
 
-                        page.wait_for_timeout(5000)  # Check every 5 seconds
+        Args:
+            start_at (datetime): Meeting start; the click waits for it and join
+                latency is measured from it. Defaults to now.
+        """
+        return _run_steps(self._join_steps(start_at))
 
-                    logger.info("Closing browser as meeting has ended.")
-                    page.close()
+    def wait_for_meeting_end(self):
+        """
+        Block until the bot is alone, removed or the meeting ended, then close the page.
 
-                except Exception as end_meeting_err:
-                    logger.error(f"Error checking meeting status: {end_meeting_err}")
+        The wait happens inside the page (see MEETING_END_SCRIPT): a single
+        evaluate call resolves the moment the state changes.
+        """
+        _run_steps(self._wait_for_meeting_end_steps())
 
-        except Exception as e:
-            logger.error(f"Comprehensive join error: {e}")
-            return {"status": "error", "message": str(e)}
+    def join_google_meet(self, start_at=None):
+        """
+        Automates the process of joining a Google Meet session and leaving when the meeting ends.
+
+        Args:
+            start_at (datetime): Scheduled start; see ``join``
+        """
+        return _run_steps(self._join_google_meet_steps(start_at))
 
     def close_browser(self):
         """Close the browser instance."""
         try:
-            if self.browser:
+            if self._lease is not None:
+                # Only this meeting's context is closed; the pooled browser keeps running
+                if self.context:
+                    self.context.close()
+                    self.context = None
+                if self.browser:
+                    self.browser.close()  # Disconnects from the pooled browser
+                    self.browser = None
+                self.pool.release(self._lease)
+                self._lease = None
+                logger.info("Returned pooled browser")
+            elif self.profile is not None:
+                # Closing a persistent context also stops its browser
+                if self.context:
+                    self.context.close()
+                    self.context = None
+                self._release_profile()
+                logger.info("Browser closed successfully")
+            elif self.browser:
                 self.browser.close()
+                self.browser = None
                 logger.info("Browser closed successfully")
+            if self._playwright:
+                self._playwright.stop()
+                self._playwright = None
         except Exception as e:
             logger.error(f"Error closing browser: {str(e)}")
 
     def __del__(self):
         """Destructor to ensure browser cleanup."""
-        self.close_browser()
\ No newline at end of file
+        self.close_browser()
+
+
+class AsyncGoogleMeetAutomation(MeetAutomationBase):
+    """
+    asyncio version of GoogleMeetAutomation built on ``playwright.async_api``.
+
+    Nothing here blocks the event loop and an idle meeting only waits on an
+    in-page promise, so dozens of meetings can run as tasks in one process.
+    Pass a shared ``browser`` so each meeting only adds a context; see
+    ``run_meetings``.
+    """
+
+    def __init__(self, meeting_link=None, browser=None, production=None, account='', listener=None):
+        """
+        Args:
+            meeting_link (str): The Google Meet URL to join
+            browser (Browser): Async browser to open the context in; one is launched when None
+            production (bool): Low-footprint headless mode; defaults to MEET_BOT_PRODUCTION_MODE
+            account (str): Calendar account of the meeting, selects its browser profile
+            listener (callable): Receives lifecycle statuses, see MeetAutomationBase.
+                Called on the event loop, so it must not block.
+        """
+        super().__init__(meeting_link, production, account, listener)
+        self.browser = browser
+        self._owns_browser = browser is None
+        self._playwright = None
+
+    async def _setup_persistent_context(self):
+        """Launch Chromium on the locked profile; a shared browser cannot host persistent contexts."""
+        if self.browser is not None:
+            browser_type = self.browser.browser_type
+        else:
+            self._playwright = await async_playwright().start()
+            browser_type = self._playwright.chromium
+
+        self.context = await browser_type.launch_persistent_context(
+            self.profile.path, **browser_launch_options(self.production), **self._context_options()
+        )
+        self._mark_phase('launch')
+        await self.context.add_cookies(self._session_cookies())
+        logger.info(f"Using persistent profile {self.profile.path}")
+
+    async def _setup_new_context(self):
+        if self.browser is None:
+            self._playwright = await async_playwright().start()
+            self.browser = await self._playwright.chromium.launch(**browser_launch_options(self.production))
+        self._mark_phase('launch')
+
+        # Load existing session if available
+        if os.path.exists(self.SESSION_FILE):
+            try:
+                self.context = await self.browser.new_context(
+                    storage_state=self.SESSION_FILE, **self._context_options()
+                )
+                logger.info("Loaded existing session from file.")
+            except Exception as e:
+                logger.error(f"Failed to load session: {e}. Creating new context.")
+                self.context = await self.browser.new_context(**self._context_options())
+        else:
+            logger.info("No session file found. Creating new context.")
+            self.context = await self.browser.new_context(**self._context_options())
+
+    async def _setup_browser_context(self):
+        """Set up browser context with necessary permissions."""
+        try:
+            if self._acquire_profile():
+                await self._setup_persistent_context()
+            else:
+                await self._setup_new_context()
+
+            await self.context.grant_permissions(self.PERMISSIONS, origin="https://meet.google.com")
+            if self.production:
+                await self.context.route(BLOCKED_REQUESTS, lambda route: route.abort())
+            self._mark_phase('context')
+            return True
+
+        except Exception as e:
+            logger.error(f"Error setting up browser context: {e}")
+            return False
+
+    async def _sleep(self, seconds):
+        await asyncio.sleep(seconds)
+
+    async def _capture(self, page, label, failure=False):
+        await self.screenshots.capture_async(page, label, failure=failure)
+
+    async def prewarm(self):
+        """Open the context and park the page on the meeting's green room."""
+        return await _run_steps_async(self._prewarm_steps())
+
+    async def join(self, start_at=None):
+        """Click the join button at ``start_at``, prewarming first if needed."""
+        return await _run_steps_async(self._join_steps(start_at))
+
+    async def wait_for_meeting_end(self):
+        """Wait until the bot is alone, removed or the meeting ended, then close the page."""
+        await _run_steps_async(self._wait_for_meeting_end_steps())
+
+    async def join_google_meet(self, start_at=None):
+        """Join the meeting and stay until it ends. Cancelling the task leaves the meeting."""
+        return await _run_steps_async(self._join_google_meet_steps(start_at))
+
+    async def close(self):
+        """Close this meeting's context, and the browser if it was launched here."""
+        try:
+            if self.context:
+                await self.context.close()
+                self.context = None
+            if self.profile is not None:
+                # Pruning walks the profile directory, keep that off the event loop
+                await asyncio.get_running_loop().run_in_executor(None, self._release_profile)
+            if self._owns_browser and self.browser:
+                await self.browser.close()
+                self.browser = None
+            if self._playwright:
+                await self._playwright.stop()
+                self._playwright = None
+        except Exception as e:
+            logger.error(f"Error closing browser: {str(e)}")
+
+
+async def _run_meeting(browser, meeting_link, start_at, timeout, production):
+    google_meet = None
+    try:
+        google_meet = AsyncGoogleMeetAutomation(meeting_link, browser=browser, production=production)
+        return await asyncio.wait_for(google_meet.join_google_meet(start_at), timeout)
+    except asyncio.TimeoutError:
+        logger.error(f"Meeting {meeting_link} timed out after {timeout}s, leaving")
+        return {"status": "error", "message": "Timed out"}
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+    finally:
+        if google_meet is not None:
+            await google_meet.close()
+
+
+async def run_meetings(meetings, timeout=None, production=None):
+    """
+    Attend several meetings concurrently from one browser in the current event loop.
+
+    Each meeting runs as its own task in its own context. Cancelling the
+    caller cancels every meeting and closes the browser.
+
+    Args:
+        meetings (list): (meeting_link, start_at) pairs; start_at may be None
+        timeout (float): Per-meeting limit in seconds, counted from the call
+        production (bool): Low-footprint headless mode; defaults to MEET_BOT_PRODUCTION_MODE
+
+    Returns:
+        list: One join result per meeting, in order
+    """
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(**browser_launch_options(production))
+        try:
+            return await asyncio.gather(*(
+                _run_meeting(browser, meeting_link, start_at, timeout, production)
+                for meeting_link, start_at in meetings
+            ))
+        finally:
+            await browser.close()
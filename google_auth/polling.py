@@ -0,0 +1,128 @@
+import logging
+import threading
+import time
+import zlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .calendar_sync import sync_calendars_to_db
+from .credentials import credential_manager
+from .meeting_crons import reschedule_meetings
+from .models import OAuthToken
+from .recurrence import expand_recurring_meetings
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+
+def poll_account(account):
+    """Incrementally sync one account's calendars and reschedule the meetings that changed."""
+    try:
+        credentials = credential_manager.get(account)
+        if not credentials:
+            logger.error(f"Skipping account '{account}': no usable credentials")
+            return None
+
+        result = sync_calendars_to_db(credentials, account)
+        reschedule_meetings(result['upserted_event_ids'] + result['cancelled_event_ids'])
+        return result
+    finally:
+        close_old_connections()
+
+
+class CalendarPoller:
+    """
+    Poll every account's calendars once per ``interval`` seconds.
+
+    Accounts are spread over ``slots`` equal time slots by a stable hash of
+    the account, so each slot only handles about 1/slots of the accounts and
+    load stays flat instead of spiking once per interval. Polls run on a
+    bounded worker pool; an account whose previous poll is still running is
+    skipped for that round rather than queued again.
+    """
+
+    def __init__(self, interval=None, slots=None, max_workers=None, poll_func=poll_account):
+        self.interval = interval or getattr(settings, 'CALENDAR_POLL_INTERVAL_SECONDS', 300)
+        self.slots = slots or getattr(settings, 'CALENDAR_POLL_SLOTS', 60)
+        self.max_workers = max_workers or getattr(settings, 'CALENDAR_POLL_WORKERS', 8)
+        self.poll_func = poll_func
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='calendar-poll')
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def slot_for(self, account):
+        """Stable slot index of an account (independent of process hash seeds)."""
+        return zlib.crc32(account.encode('utf-8')) % self.slots
+
+    @staticmethod
+    def accounts():
+        return list(OAuthToken.objects.order_by('account').values_list('account', flat=True))
+
+    def submit(self, account):
+        """Poll ``account`` on the worker pool unless a poll for it is already running."""
+        with self._lock:
+            if account in self._in_flight:
+                logger.info(f"Previous poll of '{account}' still running, skipping")
+                return None
+            self._in_flight.add(account)
+
+        return self._executor.submit(self._poll, account)
+
+    def _poll(self, account):
+        try:
+            return self.poll_func(account)
+        except Exception as e:
+            logger.error(f"Polling account '{account}' failed: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(account)
+
+    @staticmethod
+    def roll_recurrence_horizon():
+        """Materialise newly due occurrences of locally expanded recurring meetings."""
+        try:
+            reschedule_meetings(expand_recurring_meetings())
+        except Exception as e:
+            logger.error(f"Expanding recurring meetings failed: {e}")
+        finally:
+            close_old_connections()
+
+    def poll_all_once(self):
+        """Poll every account through the worker pool and wait for completion."""
+        futures = [future for future in map(self.submit, self.accounts()) if future is not None]
+        for future in futures:
+            future.result()
+        self.roll_recurrence_horizon()
+        return len(futures)
+
+    def run_forever(self):
+        """Walk through the time slots until ``stop()`` is called."""
+        slot_length = self.interval / self.slots
+        accounts_by_slot = None
+        logger.info(f"Calendar poller started: {self.slots} slots of {slot_length:.1f}s, {self.max_workers} workers")
+
+        while not self._stop.is_set():
+            now = time.time()
+            slot = int(now // slot_length) % self.slots
+
+            # Refresh the account list and recurrence horizon once per full cycle
+            if slot == 0 or accounts_by_slot is None:
+                accounts_by_slot = defaultdict(list)
+                for account in self.accounts():
+                    accounts_by_slot[self.slot_for(account)].append(account)
+                self.roll_recurrence_horizon()
+
+            for account in accounts_by_slot.get(slot, ()):
+                self.submit(account)
+
+            next_slot_start = (int(now // slot_length) + 1) * slot_length
+            self._stop.wait(max(0.0, next_slot_start - time.time()))
+
+        self._executor.shutdown(wait=True)
+
+    def stop(self):
+        self._stop.set()
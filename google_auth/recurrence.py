@@ -0,0 +1,158 @@
+import logging
+from datetime import timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import pytz
+from dateutil.rrule import rrulestr
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Meeting
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Masters expanded at least this close to the requested horizon are not expanded again
+EXPANSION_SLACK = timedelta(hours=1)
+
+
+def recurrence_horizon():
+    """How far ahead recurring meetings are expanded into single occurrences."""
+    return timedelta(days=getattr(settings, 'CALENDAR_RECURRENCE_HORIZON_DAYS', 14))
+
+
+def _event_tz(master):
+    if master.time_zone:
+        try:
+            return ZoneInfo(master.time_zone)
+        except ZoneInfoNotFoundError:
+            logger.warning(f"Unknown time zone '{master.time_zone}' on event {master.event_id}, using UTC")
+    return pytz.UTC
+
+
+def occurrence_id(master, start):
+    """
+    Id Google gives the instance of ``master`` starting at ``start``.
+
+    Matching Google's ``<master id>_<UTC start>`` format lets exceptions
+    (moved or cancelled instances) replace the locally generated occurrence.
+    """
+    if master.all_day:
+        return f"{master.event_id}_{start.strftime('%Y%m%d')}"
+    return f"{master.event_id}_{start.astimezone(pytz.UTC).strftime('%Y%m%dT%H%M%SZ')}"
+
+
+def expand_occurrences(master, after, before):
+    """
+    Lazily yield (start, end) of each occurrence of ``master`` in [after, before).
+
+    The RRULE/EXDATE/RDATE lines are evaluated in the event's own time zone so
+    occurrences keep their wall-clock time across DST changes.
+    """
+    if master.all_day:
+        # All-day series are evaluated on naive dates, stored at midnight UTC
+        dtstart = master.start_time.astimezone(pytz.UTC).replace(tzinfo=None)
+        after = after.astimezone(pytz.UTC).replace(tzinfo=None)
+        before = before.astimezone(pytz.UTC).replace(tzinfo=None)
+    else:
+        dtstart = master.start_time.astimezone(_event_tz(master))
+
+    duration = (master.end_time - master.start_time) if master.end_time else timedelta(0)
+    rules = rrulestr(master.recurrence, dtstart=dtstart, forceset=True)
+
+    for start in rules.xafter(after, inc=True):
+        if start >= before:
+            return
+        if master.all_day:
+            start = pytz.UTC.localize(start)
+        else:
+            start = start.astimezone(pytz.UTC)
+        yield start, start + duration
+
+
+def expand_master(master, until=None):
+    """
+    Create the occurrences of one recurring master up to ``until``.
+
+    Only the part of the horizon not expanded before is evaluated. Rows that
+    already exist (exceptions sent by Google, including cancelled instances)
+    are left untouched.
+
+    Returns:
+        list: Event ids of the occurrences in the newly expanded window
+    """
+    now = timezone.now()
+    until = until or now + recurrence_horizon()
+    after = max(master.expanded_until or now, now)
+    if after >= until:
+        return []
+
+    try:
+        occurrences = [
+            Meeting(
+                event_id=occurrence_id(master, start),
+                account=master.account,
+                calendar_id=master.calendar_id,
+                etag=master.etag,
+                status=master.status,
+                summary=master.summary,
+                start_time=start,
+                end_time=end,
+                meet_link=master.meet_link,
+                conference_uri=master.conference_uri,
+                time_zone=master.time_zone,
+                all_day=master.all_day,
+                recurring_event_id=master.event_id,
+                is_generated=True,
+            )
+            for start, end in expand_occurrences(master, after, until)
+        ]
+    except ValueError as e:
+        logger.error(f"Cannot expand recurrence of event {master.event_id}: {e}")
+        return []
+
+    Meeting.objects.bulk_create(occurrences, ignore_conflicts=True)
+    Meeting.objects.filter(account=master.account, event_id=master.event_id).update(expanded_until=until)
+    return [occurrence.event_id for occurrence in occurrences]
+
+
+def reset_master(master):
+    """
+    Drop the generated future occurrences of a changed master and expand it again.
+
+    Returns:
+        list: Event ids of the removed and regenerated occurrences
+    """
+    stale = Meeting.objects.filter(
+        account=master.account, recurring_event_id=master.event_id, is_generated=True,
+        start_time__gt=timezone.now(),
+    )
+    stale_ids = list(stale.values_list('event_id', flat=True))
+    stale.delete()
+    master.expanded_until = None
+    if master.status == Meeting.STATUS_CANCELLED:
+        return stale_ids
+    return stale_ids + expand_master(master)
+
+
+def expand_recurring_meetings(until=None):
+    """
+    Roll the expansion horizon of every active recurring master forward.
+
+    Cheap to call often: masters already expanded close to ``until`` are
+    skipped by the query itself.
+
+    Returns:
+        list: Event ids of the occurrences in the newly expanded windows
+    """
+    until = until or timezone.now() + recurrence_horizon()
+    masters = (Meeting.objects.masters()
+               .exclude(status=Meeting.STATUS_CANCELLED)
+               .exclude(expanded_until__gte=until - EXPANSION_SLACK))
+
+    event_ids = []
+    for master in masters.iterator():
+        event_ids.extend(expand_master(master, until))
+    if event_ids:
+        logger.info(f"Expanded {len(event_ids)} recurring meeting occurrences up to {until}")
+    return event_ids
@@ -0,0 +1,254 @@
+import heapq
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .admission import admission_controller
+from .browser_pool import browser_pool
+from .meeting_jobs import lease_fields, meeting_job_runner, queue_admission, queue_transition
+from .models import Meeting, MeetingJob
+from .playwright_google_meet import GoogleMeetAutomation
+from .recurrence import expand_recurring_meetings
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+# Rows committed slightly out of updated_at order are still picked up by re-reading this overlap
+REFRESH_OVERLAP = timedelta(seconds=5)
+
+# How often the recurrence horizon is rolled forward, in seconds
+RECURRENCE_INTERVAL = 3600
+
+
+def prewarm_lead():
+    """How long before the start time the browser is launched and parked in the green room."""
+    return timedelta(seconds=getattr(settings, 'MEETING_PREWARM_SECONDS', 60))
+
+
+def run_join(meeting):
+    """
+    Join one meeting with a fresh automation instance (runs on a scheduler worker thread).
+
+    The scheduler calls this ``prewarm_lead()`` ahead of the start; the
+    browser is prewarmed straight away and the join click waits for the
+    start time. Progress is recorded on a MeetingJob row. The launch waits
+    for admission control and is skipped when another bot already covers
+    the meeting.
+    """
+    google_meet = None
+    job = None
+    admission = None
+    try:
+        job = MeetingJob.objects.create(
+            meeting=meeting, meet_link=meeting.meet_link, summary=meeting.summary, account=meeting.account,
+            scheduled_at=meeting.start_time, **lease_fields(),
+        )
+        meeting_job_runner.track(job.pk)
+        admission = admission_controller.admit(meeting.meet_link, job.pk, meeting.start_time)
+        queue_admission(job.pk, admission)
+        if admission.merged_into is not None:
+            return None
+
+        logger.info(f"Preparing '{meeting.summary}' at {meeting.meet_link} "
+                    f"({(timezone.now() - meeting.start_time).total_seconds():+.2f}s from start)")
+        google_meet = GoogleMeetAutomation(
+            meeting_link=meeting.meet_link, account=meeting.account,
+            pool=browser_pool if browser_pool.enabled else None,
+            listener=lambda status: queue_transition(job.pk, status),
+        )
+        if prewarm_lead():
+            google_meet.prewarm()
+        response = google_meet.join_google_meet(start_at=meeting.start_time)
+        logger.info(f"Join attempt for '{meeting.summary}' finished: {response}")
+
+        if response["status"] == "success":
+            queue_transition(job.pk, MeetingJob.STATUS_LEFT)
+        else:
+            queue_transition(job.pk, MeetingJob.STATUS_FAILED, response.get("message", ""))
+        return response
+    except Exception as e:
+        logger.error(f"Error joining '{meeting.summary}': {e}")
+        if job is not None:
+            queue_transition(job.pk, MeetingJob.STATUS_FAILED, str(e))
+    finally:
+        if google_meet is not None:
+            google_meet.close_browser()
+        if admission is not None:
+            admission_controller.release(admission)
+        if job is not None:
+            meeting_job_runner.untrack(job.pk)
+        close_old_connections()
+
+
+def enqueue_join(meeting):
+    """
+    Queue a meeting for the bot workers instead of joining it here (queue backend).
+
+    The scheduler calls this ``prewarm_lead()`` ahead of the start, which is
+    when workers start claiming it.
+    """
+    try:
+        if MeetingJob.objects.filter(meeting=meeting, scheduled_at=meeting.start_time).exists():
+            return  # Already queued, e.g. before this scheduler restarted
+        job = MeetingJob.objects.create(
+            meeting=meeting, meet_link=meeting.meet_link, summary=meeting.summary, account=meeting.account,
+            scheduled_at=meeting.start_time,
+        )
+        logger.info(f"Queued meeting job {job.pk} for '{meeting.summary}' at {meeting.start_time}")
+    except Exception as e:
+        logger.error(f"Error queueing '{meeting.summary}': {e}")
+    finally:
+        close_old_connections()
+
+
+class MeetingScheduler:
+    """
+    Resident scheduler that fires meeting joins from an in-memory timer queue.
+
+    Upcoming meetings within ``lookahead`` are kept in a heap ordered by start
+    time. The main loop sleeps exactly until the next one is due (or the next
+    refresh) and hands due meetings to a worker pool ``prewarm_lead()``
+    ahead of their start, so the browser is ready and the join click lands
+    right at the start time.
+
+    Changes are picked up with cheap indexed queries instead of crontab
+    rewrites: rows whose ``updated_at`` moved since the last refresh, plus
+    meetings entering the lookahead window. A moved or cancelled meeting gets
+    a new version; stale heap entries are skipped when popped.
+    """
+
+    def __init__(self, refresh_interval=None, lookahead=None, max_concurrent=None, join_func=run_join):
+        self.refresh_interval = refresh_interval or getattr(settings, 'MEETING_SCHEDULER_REFRESH_SECONDS', 2)
+        self.lookahead = lookahead or timedelta(hours=getattr(settings, 'MEETING_SCHEDULER_LOOKAHEAD_HOURS', 24))
+        # Each join holds a worker for the whole meeting; by default there is one per admitted bot
+        self.max_concurrent = (max_concurrent or getattr(settings, 'MEETING_SCHEDULER_MAX_CONCURRENT', None)
+                               or admission_controller.budget)
+        self.join_func = join_func
+        self.lead = prewarm_lead()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix='meeting-join')
+        self._busy = 0
+        self._busy_lock = threading.Lock()
+        self._heap = []
+        self._entries = {}  # meeting id -> (version, start timestamp, meeting)
+        self._fired = {}  # (meeting id, start timestamp) -> fired at
+        self._version = 0
+        self._watermark = None
+        self._loaded_until = None
+        self._next_recurrence = 0
+        self._stop = threading.Event()
+
+    @staticmethod
+    def _key(meeting):
+        return meeting.start_time, meeting.meet_link, meeting.summary
+
+    def schedule(self, meeting):
+        """Queue (or re-queue) a meeting to be handed over ``lead`` before its start time."""
+        entry = self._entries.get(meeting.pk)
+        if entry is not None and self._key(entry[2]) == self._key(meeting):
+            return
+
+        self._version += 1
+        start = (meeting.start_time - self.lead).timestamp()
+        self._entries[meeting.pk] = (self._version, start, meeting)
+        heapq.heappush(self._heap, (start, self._version, meeting.pk))
+        logger.info(f"Scheduled '{meeting.summary}' at {meeting.start_time}")
+
+    def unschedule(self, meeting_id):
+        if self._entries.pop(meeting_id, None) is not None:
+            logger.info(f"Unscheduled meeting {meeting_id}")
+
+    def refresh(self):
+        """Pull meetings that changed or entered the lookahead window since the last refresh."""
+        now = timezone.now()
+        horizon = now + self.lookahead
+
+        if now.timestamp() >= self._next_recurrence:
+            expand_recurring_meetings()
+            self._next_recurrence = now.timestamp() + RECURRENCE_INTERVAL
+
+        window = Meeting.objects.filter(start_time__gt=self._loaded_until or now, start_time__lte=horizon)
+        for meeting in window.filter(recurrence='').exclude(status=Meeting.STATUS_CANCELLED).exclude(meet_link=''):
+            self.schedule(meeting)
+        self._loaded_until = horizon
+
+        if self._watermark is not None:
+            changed = Meeting.objects.filter(updated_at__gt=self._watermark - REFRESH_OVERLAP, recurrence='')
+            for meeting in changed:
+                if (meeting.status != Meeting.STATUS_CANCELLED and meeting.meet_link
+                        and now < meeting.start_time <= horizon):
+                    self.schedule(meeting)
+                else:
+                    self.unschedule(meeting.pk)
+
+        latest = Meeting.objects.order_by('-updated_at').values_list('updated_at', flat=True).first()
+        self._watermark = latest or now
+        close_old_connections()
+
+    def _fire_due(self):
+        now = time.time()
+        while self._heap and self._heap[0][0] <= now:
+            start, version, meeting_id = heapq.heappop(self._heap)
+            entry = self._entries.get(meeting_id)
+            if entry is None or entry[0] != version:
+                continue  # Moved or cancelled since it was queued
+
+            del self._entries[meeting_id]
+            if (meeting_id, start) in self._fired:
+                continue
+            self._fired[(meeting_id, start)] = now
+            self._submit(entry[2])
+
+        # Forget joins fired more than a day ago
+        for key in [key for key, fired_at in self._fired.items() if fired_at < now - 86400]:
+            del self._fired[key]
+
+    def _submit(self, meeting):
+        with self._busy_lock:
+            busy = self._busy
+            self._busy += 1
+        if busy >= self.max_concurrent:
+            logger.warning(f"All {self.max_concurrent} join workers are busy: '{meeting.summary}' at "
+                           f"{meeting.start_time} waits for one to free up and may start late")
+        self._executor.submit(self.join_func, meeting).add_done_callback(self._join_done)
+
+    def _join_done(self, future):
+        with self._busy_lock:
+            self._busy -= 1
+
+    def run_forever(self):
+        """Refresh and fire joins until ``stop()`` is called."""
+        logger.info(f"Meeting scheduler started (refresh every {self.refresh_interval}s, "
+                    f"lookahead {self.lookahead}, prewarm {self.lead}, {self.max_concurrent} concurrent joins)")
+        next_refresh = 0
+
+        while not self._stop.is_set():
+            if time.time() >= next_refresh:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.error(f"Scheduler refresh failed: {e}")
+                    close_old_connections()
+                next_refresh = time.time() + self.refresh_interval
+
+            self._fire_due()
+
+            wake_at = next_refresh
+            if self._heap:
+                wake_at = min(wake_at, self._heap[0][0])
+            self._stop.wait(max(0.0, wake_at - time.time()))
+
+        self._executor.shutdown(wait=False)
+        browser_pool.close()
+
+    def stop(self):
+        self._stop.set()
+
+    def pending(self):
+        """Scheduled meetings, soonest first."""
+        return sorted((meeting for _, _, meeting in self._entries.values()), key=lambda m: m.start_time)
@@ -0,0 +1,80 @@
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlparse
+
+from django.conf import settings
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+SCREENSHOT_MODES = ('off', 'on_failure', 'phases')
+
+# Disk writes and retention cleanup run here, never on the automation thread or event loop
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='screenshot-writer')
+
+
+def _write(directory, filename, data, keep):
+    # Imported here: views imports the automation module, which imports this one
+    from .views import cleanup_old_files
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, filename), 'wb') as file:
+            file.write(data)
+        cleanup_old_files(directory, max_files=keep)
+    except OSError as e:
+        logger.error(f"Failed to save screenshot {filename}: {e}")
+
+
+class ScreenshotRecorder:
+    """
+    Per-meeting screenshot capture controlled by MEET_BOT_SCREENSHOTS.
+
+    'off' never captures, 'on_failure' only when a step fails and 'phases'
+    at every phase as well. Captures are viewport JPEGs; only the capture
+    itself runs on the calling thread, the file is written in the background
+    into a directory per meeting that keeps the newest
+    MEET_BOT_SCREENSHOT_KEEP files.
+    """
+
+    def __init__(self, meeting_link, mode=None, quality=None):
+        self.mode = mode or getattr(settings, 'MEET_BOT_SCREENSHOTS', 'on_failure')
+        if self.mode not in SCREENSHOT_MODES:
+            raise ValueError(f"Unknown screenshot mode: {self.mode}")
+        self.quality = quality or getattr(settings, 'MEET_BOT_SCREENSHOT_QUALITY', 50)
+        self.keep = getattr(settings, 'MEET_BOT_SCREENSHOT_KEEP', 10)
+
+        meeting_code = re.sub(r'[^\w-]', '_', urlparse(meeting_link).path.strip('/')) or 'meeting'
+        root = getattr(settings, 'MEET_BOT_SCREENSHOT_DIR', os.path.join(settings.BASE_DIR, 'screenshots'))
+        self.directory = os.path.join(root, meeting_code)
+
+    def wants(self, failure=False):
+        return self.mode == 'phases' or (failure and self.mode == 'on_failure')
+
+    def _options(self):
+        return {'type': 'jpeg', 'quality': self.quality}
+
+    def _save(self, label, data):
+        filename = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{label}.jpg"
+        _writer.submit(_write, self.directory, filename, data, self.keep)
+
+    def capture(self, page, label, failure=False):
+        """Capture ``page`` if the mode asks for it (sync Playwright)."""
+        if not self.wants(failure) or page is None or page.is_closed():
+            return
+        try:
+            self._save(label, page.screenshot(**self._options()))
+        except Exception as e:
+            logger.error(f"Screenshot '{label}' failed: {e}")
+
+    async def capture_async(self, page, label, failure=False):
+        """Capture ``page`` if the mode asks for it (async Playwright)."""
+        if not self.wants(failure) or page is None or page.is_closed():
+            return
+        try:
+            self._save(label, await page.screenshot(**self._options()))
+        except Exception as e:
+            logger.error(f"Screenshot '{label}' failed: {e}")
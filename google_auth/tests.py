@@ -1,3 +1,883 @@
-from django.test import TestCase
+import asyncio
+import logging
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import httplib2
+import pytz
+from django.db import IntegrityError, connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.utils import timezone
+from google.oauth2.credentials import Credentials
+from googleapiclient.errors import HttpError
+
+from .admission import AdmissionController
+from .browser_pool import BrowserPool, PooledBrowser
+from .calendar_sync import (
+    EVENT_FIELDS, PAGE_SIZE, EventStream, cancel_unseen, sync_calendar_to_db, sync_calendars_to_db,
+    upsert_meetings,
+)
+from .calendar_watch import LocalCalendarNotifier, handle_notification, notification_dispatcher
+from .credentials import CredentialManager
+from .events import EventPublisher
+from .log_pipeline import DedupFilter, RateLimitFilter
+from .meeting_jobs import MeetingJobRunner, meeting_job_runner
+from .models import CalendarSyncState, Meeting, MeetingJob, OAuthToken
+from .playwright_google_meet import _run_steps, _run_steps_async, browser_launch_options
+from .recurrence import expand_occurrences, occurrence_id
+from .scheduler import MeetingScheduler
+
+
+def utc(*args):
+    return pytz.UTC.localize(datetime(*args))
+
+
+ACCOUNT = 'bot@example.com'
+MEETING = 'https://meet.google.com/abc-defg-hij'
+
+
+def calendar_event(event_id, start='2030-01-07T10:00:00Z', **fields):
+    """An events.list item as Google returns it for a Meet call."""
+    event = {
+        'id': event_id,
+        'status': 'confirmed',
+        'summary': f'Meeting {event_id}',
+        'start': {'dateTime': start},
+        'end': {'dateTime': start.replace('T10:', 'T11:')},
+        'hangoutLink': f'https://meet.google.com/{event_id}',
+    }
+    event.update(fields)
+    return event
+
+
+class FakeRequest:
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self):
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+
+class FakeCalendarService:
+    """Serves canned events.list responses per calendar and records the parameters of each call."""
+
+    def __init__(self, responses):
+        self.responses = responses  # calendar id -> responses (or exceptions to raise), in order
+        self.requests = []
+
+    def events(self):
+        return self
+
+    def list(self, **params):
+        self.requests.append(params)
+        return FakeRequest(self.responses[params['calendarId']].pop(0))
+
+
+class EventStreamTests(SimpleTestCase):
+    def service(self):
+        return FakeCalendarService({'primary': [
+            # Google only sends nextSyncToken on the last page; a stray one on an earlier page is ignored
+            {'items': [calendar_event('a')], 'nextPageToken': 'page-2', 'nextSyncToken': 'too-early'},
+            {'items': [calendar_event('b'), calendar_event('c')], 'nextPageToken': 'page-3'},
+            {'items': [], 'nextSyncToken': 'token-1'},
+        ]})
+
+    def test_follows_page_tokens_with_the_fields_mask(self):
+        service = self.service()
+        stream = EventStream(service, calendarId='primary', singleEvents=True)
+        self.assertEqual([event['id'] for event in stream], ['a', 'b', 'c'])
+
+        self.assertEqual(stream.pages_fetched, 3)
+        self.assertEqual([request.get('pageToken') for request in service.requests], [None, 'page-2', 'page-3'])
+        for request in service.requests:
+            self.assertEqual(request['fields'], EVENT_FIELDS)
+            self.assertEqual(request['maxResults'], PAGE_SIZE)
+            self.assertEqual(request['calendarId'], 'primary')
+
+    def test_takes_the_sync_token_from_the_last_page_only(self):
+        stream = EventStream(self.service(), calendarId='primary')
+        events = iter(stream)
+        next(events)
+        self.assertIsNone(stream.next_sync_token)
+        self.assertEqual(stream.pages_fetched, 1)
+
+        list(events)
+        self.assertEqual(stream.next_sync_token, 'token-1')
+
+
+class CalendarSyncTests(TestCase):
+    def test_full_sync_stores_the_sync_token(self):
+        service = FakeCalendarService({'primary': [{'items': [calendar_event('a')], 'nextSyncToken': 'token-1'}]})
+        result = sync_calendar_to_db(service, 'primary', ACCOUNT)
+
+        self.assertTrue(result['full_sync'])
+        self.assertEqual(result['upserted_event_ids'], ['a'])
+        self.assertIn('timeMin', service.requests[0])
+        self.assertNotIn('syncToken', service.requests[0])
+        state = CalendarSyncState.objects.get(account=ACCOUNT, calendar_id='primary')
+        self.assertEqual(state.sync_token, 'token-1')
+        self.assertIsNotNone(state.last_full_sync)
+
+    def test_next_sync_sends_the_stored_token(self):
+        service = FakeCalendarService({'primary': [
+            {'items': [calendar_event('a')], 'nextSyncToken': 'token-1'},
+            {'items': [calendar_event('a', summary='Moved')], 'nextSyncToken': 'token-2'},
+        ]})
+        sync_calendar_to_db(service, 'primary', ACCOUNT)
+        result = sync_calendar_to_db(service, 'primary', ACCOUNT)
+
+        self.assertFalse(result['full_sync'])
+        self.assertEqual(service.requests[1]['syncToken'], 'token-1')
+        self.assertNotIn('timeMin', service.requests[1])
+        self.assertEqual(CalendarSyncState.objects.get(account=ACCOUNT, calendar_id='primary').sync_token, 'token-2')
+        self.assertEqual(Meeting.objects.get(account=ACCOUNT, event_id='a').summary, 'Moved')
+
+    def test_expired_token_falls_back_to_a_full_resync(self):
+        CalendarSyncState.objects.create(account=ACCOUNT, calendar_id='primary', sync_token='stale')
+        Meeting.objects.create(event_id='deleted', account=ACCOUNT, start_time=utc(2030, 1, 7, 9))
+        service = FakeCalendarService({'primary': [
+            HttpError(httplib2.Response({'status': 410}), b'Gone'),
+            {'items': [calendar_event('a')], 'nextSyncToken': 'token-2'},
+        ]})
+        result = sync_calendar_to_db(service, 'primary', ACCOUNT)
+
+        self.assertTrue(result['full_sync'])
+        self.assertEqual(service.requests[0]['syncToken'], 'stale')
+        self.assertNotIn('syncToken', service.requests[1])
+        self.assertEqual(CalendarSyncState.objects.get(account=ACCOUNT, calendar_id='primary').sync_token, 'token-2')
+        # Events deleted while the token was stale never arrive as cancelled; the resync drops them
+        self.assertEqual(result['cancelled_event_ids'], ['deleted'])
+        self.assertEqual(Meeting.objects.get(account=ACCOUNT, event_id='deleted').status, Meeting.STATUS_CANCELLED)
+
+
+class UpsertMeetingsTests(TestCase):
+    def test_resyncing_an_event_updates_its_row(self):
+        upsert_meetings([calendar_event('a')], account=ACCOUNT)
+        upsert_meetings([calendar_event('a', summary='Renamed', start='2030-01-08T10:00:00Z')], account=ACCOUNT)
+
+        meeting = Meeting.objects.get(account=ACCOUNT, event_id='a')
+        self.assertEqual(Meeting.objects.count(), 1)
+        self.assertEqual(meeting.summary, 'Renamed')
+        self.assertEqual(meeting.start_time, utc(2030, 1, 8, 10))
+
+    def test_event_ids_are_unique_per_account(self):
+        upsert_meetings([calendar_event('a')], account=ACCOUNT)
+        upsert_meetings([calendar_event('a')], account='other@example.com')
+        self.assertEqual(Meeting.objects.filter(event_id='a').count(), 2)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Meeting.objects.create(event_id='a', account=ACCOUNT, start_time=utc(2030, 1, 7, 10))
+
+        # A cancellation only touches the account it was synced for
+        upsert_meetings([{'id': 'a', 'status': 'cancelled'}], account=ACCOUNT)
+        self.assertEqual(Meeting.objects.get(account=ACCOUNT, event_id='a').status, Meeting.STATUS_CANCELLED)
+        self.assertEqual(Meeting.objects.get(account='other@example.com', event_id='a').status,
+                         Meeting.STATUS_CONFIRMED)
+
+    def test_cancel_unseen_cancels_upcoming_meetings_a_full_sync_missed(self):
+        upsert_meetings([calendar_event('kept'), calendar_event('gone')], account=ACCOUNT)
+        upsert_meetings([calendar_event('elsewhere')], calendar_id='team', account=ACCOUNT)
+        Meeting.objects.create(event_id='past', account=ACCOUNT, start_time=utc(2020, 1, 1, 10))
+
+        self.assertEqual(cancel_unseen(ACCOUNT, 'primary', {'kept'}), ['gone'])
+        statuses = dict(Meeting.objects.values_list('event_id', 'status'))
+        self.assertEqual(statuses, {
+            'kept': Meeting.STATUS_CONFIRMED,
+            'gone': Meeting.STATUS_CANCELLED,
+            'elsewhere': Meeting.STATUS_CONFIRMED,
+            'past': Meeting.STATUS_CONFIRMED,
+        })
+
+
+@mock.patch.object(notification_dispatcher, 'notify')
+class CalendarNotificationTests(TestCase):
+    def setUp(self):
+        self.notifier = LocalCalendarNotifier()
+        self.channel = self.notifier.register_channel('team', ACCOUNT)
+
+    def test_change_schedules_a_sync_of_the_account(self, notify):
+        self.assertEqual(self.notifier.notify(self.channel), 200)
+        notify.assert_called_once_with(ACCOUNT, 'team')
+
+    def test_sync_handshake_only_confirms_the_channel(self, notify):
+        self.assertEqual(self.notifier.notify(self.channel, state='sync'), 200)
+        notify.assert_not_called()
+
+    def test_rejects_a_wrong_token(self, notify):
+        status, _ = handle_notification({
+            'X-Goog-Channel-ID': self.channel.channel_id,
+            'X-Goog-Channel-Token': 'forged',
+            'X-Goog-Resource-State': 'exists',
+        })
+        self.assertEqual(status, 404)
+        notify.assert_not_called()
+
+    def test_rejects_an_unknown_channel(self, notify):
+        status, _ = handle_notification({'X-Goog-Channel-ID': 'unknown', 'X-Goog-Resource-State': 'exists'})
+        self.assertEqual(status, 404)
+        notify.assert_not_called()
+
+    def test_webhook_reads_the_channel_headers(self, notify):
+        response = self.client.post(
+            '/auth/google/calendar/notifications/',
+            HTTP_X_GOOG_CHANNEL_ID=self.channel.channel_id,
+            HTTP_X_GOOG_CHANNEL_TOKEN=self.channel.token,
+            HTTP_X_GOOG_RESOURCE_STATE='exists',
+        )
+        self.assertEqual(response.status_code, 200)
+        notify.assert_called_once_with(ACCOUNT, 'team')
+
+
+class CredentialManagerTests(TransactionTestCase):
+    # Refreshes run on the manager's own threads, so the token row has to be committed
+
+    def setUp(self):
+        self.token = OAuthToken.objects.create(
+            token='old', refresh_token='refresh', token_uri='https://oauth2.googleapis.com/token',
+            client_id='client', client_secret='secret', scopes='https://www.googleapis.com/auth/calendar.readonly',
+            account=ACCOUNT, expiry=timezone.now() + timedelta(hours=1),
+        )
+        self.manager = CredentialManager()
+        self.addCleanup(self.manager.stop)
+        self.refreshed = []
+
+    def refresh(self, credentials, request):
+        time.sleep(0.1)  # Keep the refresh in flight while the other callers arrive
+        self.refreshed.append(credentials)
+        credentials.token = 'new'
+        credentials.expiry = (timezone.now() + timedelta(hours=1)).replace(tzinfo=None)
+
+    def test_callers_of_an_expired_token_share_one_refresh(self):
+        self.manager.get(ACCOUNT).expiry = (timezone.now() - timedelta(minutes=1)).replace(tzinfo=None)
+        start = threading.Barrier(8)
+        results = []
+
+        def get():
+            start.wait()
+            results.append(self.manager.get(ACCOUNT))
+
+        with mock.patch.object(Credentials, 'refresh', autospec=True, side_effect=self.refresh):
+            threads = [threading.Thread(target=get) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(self.refreshed), 1)
+        self.assertEqual([credentials.token for credentials in results], ['new'] * 8)
+        self.token.refresh_from_db()
+        self.assertEqual(self.token.token, 'new')
+
+    def test_invalidate_reloads_the_stored_token(self):
+        self.assertEqual(self.manager.get(ACCOUNT).token, 'old')
+        OAuthToken.objects.filter(pk=self.token.pk).update(token='signed-in-again')
+        self.assertEqual(self.manager.get(ACCOUNT).token, 'old')
+
+        self.manager.invalidate(ACCOUNT)
+        self.assertEqual(self.manager.get(ACCOUNT).token, 'signed-in-again')
+
+    def test_refresh_ahead_starts_with_the_first_cached_token(self):
+        self.assertIsNone(self.manager.get('nobody@example.com'))
+        self.assertIsNone(self.manager._thread)
+
+        self.manager.get(ACCOUNT)
+        self.assertTrue(self.manager._thread.is_alive())
+
+
+class SyncCalendarsTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch('google_auth.calendar_sync.get_calendar_service', side_effect=lambda *args: self.service)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def sync(self):
+        return sync_calendars_to_db(object(), ACCOUNT, ['primary', 'team'])
+
+    def test_merges_events_shared_by_several_calendars(self):
+        Meeting.objects.create(event_id='gone', account=ACCOUNT, calendar_id='team', start_time=utc(2030, 1, 7, 9))
+        self.service = FakeCalendarService({
+            'primary': [{'items': [calendar_event('shared'), calendar_event('a')], 'nextSyncToken': 'primary-1'}],
+            'team': [{'items': [calendar_event('shared', summary='Team copy'), {'id': 'a', 'status': 'cancelled'},
+                                {'id': 'gone', 'status': 'cancelled'}],
+                      'nextSyncToken': 'team-1'}],
+        })
+        result = self.sync()
+
+        self.assertEqual(result['total_events'], 2)
+        self.assertEqual(sorted(result['upserted_event_ids']), ['a', 'shared'])
+        self.assertEqual(result['cancelled_event_ids'], ['gone'])
+        # Stored once, from the first configured calendar
+        shared = Meeting.objects.get(account=ACCOUNT, event_id='shared')
+        self.assertEqual((shared.calendar_id, shared.summary), ('primary', 'Meeting shared'))
+        # Cancelled on one calendar but still active on another
+        self.assertEqual(Meeting.objects.get(account=ACCOUNT, event_id='a').status, Meeting.STATUS_CONFIRMED)
+        self.assertEqual(Meeting.objects.get(account=ACCOUNT, event_id='gone').status, Meeting.STATUS_CANCELLED)
+
+    def test_each_calendar_keeps_its_own_sync_token(self):
+        self.service = FakeCalendarService({
+            'primary': [{'items': [calendar_event('a')], 'nextSyncToken': 'primary-1'},
+                        {'items': [], 'nextSyncToken': 'primary-2'}],
+            'team': [{'items': [calendar_event('b')], 'nextSyncToken': 'team-1'},
+                     {'items': [calendar_event('b', summary='Moved')], 'nextSyncToken': 'team-2'}],
+        })
+        self.sync()
+        result = self.sync()
+
+        self.assertFalse(result['full_sync'])
+        tokens = {request['calendarId']: request.get('syncToken') for request in self.service.requests[2:]}
+        self.assertEqual(tokens, {'primary': 'primary-1', 'team': 'team-1'})
+        states = dict(CalendarSyncState.objects.filter(account=ACCOUNT).values_list('calendar_id', 'sync_token'))
+        self.assertEqual(states, {'primary': 'primary-2', 'team': 'team-2'})
+        self.assertEqual(Meeting.objects.get(account=ACCOUNT, event_id='b').summary, 'Moved')
+
+
+class RecurrenceTests(SimpleTestCase):
+    def master(self, **fields):
+        defaults = {'event_id': 'abc', 'account': 'bot@example.com', 'time_zone': 'Europe/Berlin'}
+        defaults.update(fields)
+        return Meeting(**defaults)
+
+    def test_keeps_wall_clock_time_across_dst(self):
+        # 09:00 in Berlin is 08:00 UTC before the switch on 29 March and 07:00 UTC after it
+        master = self.master(start_time=utc(2026, 3, 27, 8), end_time=utc(2026, 3, 27, 9),
+                             recurrence='RRULE:FREQ=DAILY;COUNT=3')
+        occurrences = list(expand_occurrences(master, utc(2026, 3, 1), utc(2026, 4, 1)))
+        self.assertEqual(occurrences, [
+            (utc(2026, 3, 27, 8), utc(2026, 3, 27, 9)),
+            (utc(2026, 3, 28, 8), utc(2026, 3, 28, 9)),
+            (utc(2026, 3, 29, 7), utc(2026, 3, 29, 8)),
+        ])
+
+    def test_skips_exdates(self):
+        master = self.master(start_time=utc(2026, 3, 27, 8), end_time=utc(2026, 3, 27, 9),
+                             recurrence='RRULE:FREQ=DAILY;COUNT=3\nEXDATE;TZID=Europe/Berlin:20260328T090000')
+        starts = [start for start, _ in expand_occurrences(master, utc(2026, 3, 1), utc(2026, 4, 1))]
+        self.assertEqual(starts, [utc(2026, 3, 27, 8), utc(2026, 3, 29, 7)])
+
+    def test_only_yields_the_requested_window(self):
+        master = self.master(start_time=utc(2026, 3, 2, 8), recurrence='RRULE:FREQ=WEEKLY')
+        starts = [start for start, _ in expand_occurrences(master, utc(2026, 3, 9, 8), utc(2026, 3, 23, 8))]
+        self.assertEqual(starts, [utc(2026, 3, 9, 8), utc(2026, 3, 16, 8)])
+
+    def test_all_day_occurrences_stay_at_midnight_utc(self):
+        master = self.master(start_time=utc(2026, 3, 28), end_time=utc(2026, 3, 29), all_day=True,
+                             recurrence='RRULE:FREQ=DAILY;COUNT=3')
+        occurrences = list(expand_occurrences(master, utc(2026, 3, 1), utc(2026, 4, 1)))
+        self.assertEqual([start for start, _ in occurrences],
+                         [utc(2026, 3, 28), utc(2026, 3, 29), utc(2026, 3, 30)])
+        self.assertEqual(occurrences[1][1], utc(2026, 3, 30))
+
+    def test_occurrence_ids_match_google(self):
+        self.assertEqual(occurrence_id(self.master(), utc(2026, 3, 29, 7)), 'abc_20260329T070000Z')
+        self.assertEqual(occurrence_id(self.master(all_day=True), utc(2026, 3, 29)), 'abc_20260329')
+
+
+class MeetingSchedulerTests(TestCase):
+    def setUp(self):
+        self.joined = []
+        self.scheduler = MeetingScheduler(max_concurrent=1, join_func=self.joined.append)
+        self.scheduler.lead = timedelta(0)
+
+    def tearDown(self):
+        self.scheduler._executor.shutdown(wait=True)
+
+    def meeting(self, pk, start_time, **fields):
+        defaults = {'event_id': f'event{pk}', 'summary': f'Meeting {pk}',
+                    'meet_link': 'https://meet.google.com/aaa-aaaa-aaa'}
+        defaults.update(fields)
+        return Meeting(pk=pk, start_time=start_time, **defaults)
+
+    def fire(self):
+        self.scheduler._fire_due()
+        self.scheduler._executor.shutdown(wait=True)
+
+    def test_fires_due_meetings_once(self):
+        past = timezone.now() - timedelta(seconds=1)
+        self.scheduler.schedule(self.meeting(1, past))
+        self.scheduler.schedule(self.meeting(2, timezone.now() + timedelta(hours=1)))
+        self.fire()
+        self.assertEqual([meeting.pk for meeting in self.joined], [1])
+        self.assertEqual([meeting.pk for meeting in self.scheduler.pending()], [2])
+
+    def test_moved_and_unscheduled_meetings_skip_their_stale_entries(self):
+        past = timezone.now() - timedelta(seconds=1)
+        self.scheduler.schedule(self.meeting(1, past))
+        self.scheduler.schedule(self.meeting(1, timezone.now() + timedelta(hours=1)))
+        self.scheduler.schedule(self.meeting(2, past))
+        self.scheduler.unschedule(2)
+        self.fire()
+        self.assertEqual(self.joined, [])
+        self.assertEqual([meeting.pk for meeting in self.scheduler.pending()], [1])
+
+    def test_refresh_picks_up_changes_after_the_watermark(self):
+        meeting = Meeting.objects.create(
+            event_id='event1', start_time=timezone.now() + timedelta(hours=1),
+            meet_link='https://meet.google.com/aaa-aaaa-aaa',
+        )
+        self.scheduler.refresh()
+        self.assertEqual([m.pk for m in self.scheduler.pending()], [meeting.pk])
+
+        meeting.start_time += timedelta(minutes=30)
+        meeting.save()
+        self.scheduler.refresh()
+        self.assertEqual(self.scheduler.pending()[0].start_time, meeting.start_time)
+
+        meeting.status = Meeting.STATUS_CANCELLED
+        meeting.save()
+        self.scheduler.refresh()
+        self.assertEqual(self.scheduler.pending(), [])
+
+
+class FakeChromium:
+    """Stands in for a pooled Chromium process, counting how many run at once."""
+    endpoint = 'ws://127.0.0.1/devtools/browser/fake'
+    port = 0
+
+    def __init__(self, running):
+        self.running = running
+        self.uses = 0
+        self.active = 0
+        self.retiring = False
+        running.append(self)
+        running.peak = max(running.peak, len(running))
+
+    def alive(self):
+        return True
+
+    def rss_mb(self):
+        return None
+
+    def terminate(self):
+        self.running.remove(self)
+
+
+class RunningBrowsers(list):
+    peak = 0
+
+
+class FakeBrowserPool(BrowserPool):
+    def __init__(self, **kwargs):
+        super().__init__(max_uses=kwargs.pop('max_uses', 100), max_rss_mb=1024, **kwargs)
+        self.running = RunningBrowsers()
+
+    def _launch(self, executable_path):
+        time.sleep(0.05)  # Long enough for concurrent leases to pile up behind the launch
+        return FakeChromium(self.running)
+
+
+class BrowserPoolTests(SimpleTestCase):
+    def test_never_runs_more_browsers_than_its_size(self):
+        pool = FakeBrowserPool(size=2)
+        start = threading.Barrier(10)
+        leases = []
+
+        def lease():
+            start.wait()
+            leases.append(pool.lease('chromium'))
+
+        threads = [threading.Thread(target=lease) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(leases), 10)
+        self.assertLessEqual(pool.running.peak, 2)
+        for lease in leases:
+            pool.release(lease)
+        self.assertEqual(len(pool.running), 2)
+        pool.close()
+        self.assertEqual(pool.running, [])
+
+    def test_overflow_browser_is_stopped_on_release(self):
+        # The only pooled browser is retired after one use but still busy
+        pool = FakeBrowserPool(size=1, max_uses=1, wait_timeout=0.1)
+        first = pool.lease('chromium')
+        overflow = pool.lease('chromium')
+        self.assertTrue(overflow.overflow)
+        self.assertEqual(len(pool.running), 2)
+
+        pool.release(overflow)
+        self.assertEqual(pool.running, [first.browser])
+        pool.release(first)
+        self.assertEqual(pool.running, [])
+
+    def test_browser_that_exits_at_launch_fails_with_its_output(self):
+        # The Python interpreter rejects Chromium's flags and exits straight away
+        with self.assertRaisesRegex(RuntimeError, 'exited with code 2.*unknown option'):
+            PooledBrowser(sys.executable)
+
+
+def join_steps(calls):
+    """A step generator like MeetAutomationBase's: results are sent back and errors thrown in."""
+    try:
+        title = yield calls[0]
+        yield calls[1]
+    except ValueError as e:
+        yield calls[2]
+        return f'{title} failed: {e}'
+    return f'{title} joined'
+
+
+class MeetStepsTests(SimpleTestCase):
+    @staticmethod
+    def fail():
+        raise ValueError('no join button')
+
+    def test_sync_and_async_runners_follow_the_same_steps(self):
+        closed = []
+
+        async def title():
+            return 'Meet'
+
+        async def close():
+            closed.append('async')
+
+        self.assertEqual(_run_steps(join_steps([lambda: 'Meet', lambda: None, None])), 'Meet joined')
+        self.assertEqual(
+            asyncio.run(_run_steps_async(join_steps([title, self.fail, close]))), 'Meet failed: no join button'
+        )
+        self.assertEqual(
+            _run_steps(join_steps([lambda: 'Meet', self.fail, lambda: closed.append('sync')])),
+            'Meet failed: no join button'
+        )
+        self.assertEqual(closed, ['async', 'sync'])
+
+    def test_uncaught_errors_reach_the_caller(self):
+        def steps():
+            yield self.fail
+
+        with self.assertRaises(ValueError):
+            _run_steps(steps())
+        with self.assertRaises(ValueError):
+            asyncio.run(_run_steps_async(steps()))
+
+
+class BrowserLaunchOptionsTests(SimpleTestCase):
+    def test_production_mode_picks_new_headless_through_playwright(self):
+        options = browser_launch_options(production=True)
+        self.assertEqual((options['headless'], options['channel']), (True, 'chromium'))
+        self.assertFalse([arg for arg in options['args'] if arg.startswith('--headless')])
+
+    def test_development_mode_shows_the_browser(self):
+        options = browser_launch_options(production=False)
+        self.assertFalse(options['headless'])
+        self.assertNotIn('channel', options)
+
+
+class LogFilterTests(SimpleTestCase):
+    def record(self, message, **extra):
+        record = logging.LogRecord('google_auth.browser_console', logging.WARNING, __file__, 0, message, None, None)
+        record.__dict__.update(extra)
+        return record
+
+    def test_rate_limit_is_per_console_type(self):
+        rate_limit = RateLimitFilter(rate=2, per=60)
+        allowed = [rate_limit.filter(self.record(f'error {i}', console_type='error')) for i in range(3)]
+        self.assertEqual(allowed, [True, True, False])
+        self.assertTrue(rate_limit.filter(self.record('warning', console_type='warning')))
+
+    def test_dedup_drops_repeats_and_counts_them(self):
+        dedup = DedupFilter(window=30)
+        self.assertTrue(dedup.filter(self.record('boom', meeting='a')))
+        self.assertFalse(dedup.filter(self.record('boom', meeting='a')))
+        self.assertFalse(dedup.filter(self.record('boom', meeting='a')))
+        self.assertTrue(dedup.filter(self.record('boom', meeting='b')))
+
+        record = self.record('other', meeting='a')
+        self.assertTrue(dedup.filter(record))
+        self.assertEqual(record.getMessage(), '[previous message repeated 2 times] other')
+
+
+class FakeAsyncBrowser:
+    def __init__(self):
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+
+class FakePlaywrightDriver:
+    """What ``async_playwright().start()`` returns, counting drivers and launches."""
+
+    def __init__(self, drivers):
+        self.chromium = self
+        self.launched = []
+        self.stopped = False
+        drivers.append(self)
+
+    async def launch(self, **options):
+        await asyncio.sleep(0.01)
+        self.launched.append(FakeAsyncBrowser())
+        return self.launched[-1]
+
+    async def stop(self):
+        self.stopped = True
+
+
+class MeetingJobRunnerTests(SimpleTestCase):
+    def setUp(self):
+        self.drivers = []
+
+        async def start():
+            await asyncio.sleep(0.01)
+            return FakePlaywrightDriver(self.drivers)
+
+        patcher = mock.patch('google_auth.meeting_jobs.async_playwright')
+        patcher.start().return_value.start = start
+        self.addCleanup(patcher.stop)
+
+    def test_concurrent_jobs_share_one_browser_launch(self):
+        runner = MeetingJobRunner()
+
+        async def get_browsers():
+            return await asyncio.gather(*(runner._get_browser() for _ in range(5)))
+
+        browsers = asyncio.run(get_browsers())
+        self.assertEqual(len(self.drivers), 1)
+        self.assertEqual(len(self.drivers[0].launched), 1)
+        self.assertTrue(all(browser is browsers[0] for browser in browsers))
+
+    def test_lost_browser_is_replaced_and_its_driver_stopped(self):
+        runner = MeetingJobRunner()
+
+        async def get_browsers():
+            first = await runner._get_browser()
+            first.connected = False
+            return first, await runner._get_browser()
+
+        first, second = asyncio.run(get_browsers())
+        self.assertIsNot(first, second)
+        self.assertEqual(len(self.drivers), 2)
+        self.assertTrue(self.drivers[0].stopped)
+        self.assertFalse(self.drivers[1].stopped)
+
+
+@mock.patch.object(meeting_job_runner, 'cancel')
+@mock.patch.object(meeting_job_runner, 'start')
+class MeetingJobViewTests(TestCase):
+    url = '/auth/playwright/join-meeting/'
+
+    def submit(self, **data):
+        return self.client.post(self.url, data, content_type='application/json')
+
+    def test_submit_queues_the_job_and_returns_at_once(self, start, cancel):
+        response = self.submit(meeting_link=MEETING, start_at='2030-01-07T10:00:00Z')
+        self.assertEqual(response.status_code, 202)
+        job = MeetingJob.objects.get(pk=response.json()['job_id'])
+        self.assertEqual((job.meet_link, job.status), (MEETING, MeetingJob.STATUS_SCHEDULED))
+        start.assert_called_once_with(job, utc(2030, 1, 7, 10))
+
+    def test_rejects_a_bad_link_or_start_at(self, start, cancel):
+        self.assertEqual(self.submit(meeting_link='https://example.com/abc').status_code, 400)
+        self.assertEqual(self.submit(meeting_link=MEETING, start_at='tomorrow').status_code, 400)
+        self.assertFalse(MeetingJob.objects.exists())
+        start.assert_not_called()
+
+    def test_unknown_job(self, start, cancel):
+        self.assertEqual(self.client.get(f'{self.url}999/').status_code, 404)
+        self.assertEqual(self.client.delete(f'{self.url}999/').status_code, 404)
+
+    def test_delete_cancels_a_queued_job(self, start, cancel):
+        job = MeetingJob.objects.create(meet_link=MEETING, scheduled_at=timezone.now())
+        response = self.client.delete(f'{self.url}{job.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            (response.json()['status'], response.json()['failure_reason']), (MeetingJob.STATUS_FAILED, 'cancelled')
+        )
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.failure_reason), (MeetingJob.STATUS_FAILED, 'cancelled'))
+        cancel.assert_called_once_with(job.pk)
+
+    def test_delete_leaves_a_finished_job_alone(self, start, cancel):
+        job = MeetingJob.objects.create(meet_link=MEETING, scheduled_at=timezone.now(), status=MeetingJob.STATUS_LEFT)
+        self.assertEqual(self.client.delete(f'{self.url}{job.pk}/').status_code, 409)
+        job.refresh_from_db()
+        self.assertEqual(job.status, MeetingJob.STATUS_LEFT)
+        cancel.assert_not_called()
+
+
+class MeetingJobTests(TestCase):
+    lease = timedelta(seconds=60)
+
+    def job(self, **fields):
+        defaults = {'meet_link': 'https://meet.google.com/aaa-aaaa-aaa', 'scheduled_at': timezone.now()}
+        defaults.update(fields)
+        return MeetingJob.objects.create(**defaults)
+
+    @skipUnlessDBFeature('has_select_for_update_skip_locked')
+    def test_claim_takes_due_jobs_soonest_first(self):
+        now = timezone.now()
+        later = self.job(scheduled_at=now - timedelta(minutes=1))
+        sooner = self.job(scheduled_at=now - timedelta(minutes=2))
+        self.job(scheduled_at=now + timedelta(hours=1))
+        self.job(worker_id='other:1')
+
+        claimed = MeetingJob.claim('host:1', 5, now, self.lease)
+        self.assertEqual([job.pk for job in claimed], [sooner.pk, later.pk])
+        for job in claimed:
+            self.assertEqual(job.worker_id, 'host:1')
+            self.assertEqual(job.attempts, 1)
+            self.assertGreater(job.lease_expires_at, now)
+
+    @skipUnlessDBFeature('has_select_for_update_skip_locked')
+    def test_claim_respects_the_limit(self):
+        for _ in range(3):
+            self.job(scheduled_at=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(len(MeetingJob.claim('host:1', 2, timezone.now(), self.lease)), 2)
+        self.assertEqual(len(MeetingJob.claim('host:2', 2, timezone.now(), self.lease)), 1)
+
+    def test_requeue_expired(self):
+        expired = timezone.now() - timedelta(seconds=1)
+        retry = self.job(worker_id='host:1', attempts=1, lease_expires_at=expired,
+                         status=MeetingJob.STATUS_IN_MEETING)
+        exhausted = self.job(worker_id='host:1', attempts=3, lease_expires_at=expired)
+        alive = self.job(worker_id='host:1', attempts=1, lease_expires_at=timezone.now() + self.lease)
+        done = self.job(worker_id='host:1', attempts=1, lease_expires_at=expired, status=MeetingJob.STATUS_LEFT)
+
+        self.assertEqual(MeetingJob.requeue_expired(3), (1, 1))
+
+        retry.refresh_from_db()
+        self.assertEqual((retry.status, retry.worker_id), (MeetingJob.STATUS_SCHEDULED, ''))
+        self.assertIsNone(retry.lease_expires_at)
+        exhausted.refresh_from_db()
+        self.assertEqual(exhausted.status, MeetingJob.STATUS_FAILED)
+        alive.refresh_from_db()
+        self.assertEqual(alive.worker_id, 'host:1')
+        done.refresh_from_db()
+        self.assertEqual(done.status, MeetingJob.STATUS_LEFT)
+
+    def test_requeue_expired_fails_everything_without_requeue(self):
+        job = self.job(worker_id='host:1', attempts=1, lease_expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(MeetingJob.requeue_expired(3, requeue=False), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual(job.status, MeetingJob.STATUS_FAILED)
+
+    def test_transition_never_leaves_a_final_status(self):
+        job = self.job(status=MeetingJob.STATUS_LEFT)
+        self.assertFalse(MeetingJob.transition(job.pk, MeetingJob.STATUS_IN_MEETING))
+        with self.assertRaises(ValueError):
+            MeetingJob.transition(job.pk, MeetingJob.STATUS_SCHEDULED)
+
+
+class EventPublisherTests(SimpleTestCase):
+    def test_subscribers_only_get_their_meeting(self):
+        publisher = EventPublisher(shared=False)
+
+        async def receive():
+            one = publisher.subscribe(MEETING)
+            every = publisher.subscribe()
+            publisher.publish('joined', MEETING)
+            publisher.publish('joined', 'https://meet.google.com/xyz-wxyz-xyz')
+            return await one.get(timeout=1), await every.get(timeout=1)
+
+        one, every = asyncio.run(receive())
+        self.assertEqual([event['meeting'] for event in one], ['abc-defg-hij'])
+        self.assertEqual([event['meeting'] for event in every], ['abc-defg-hij', 'xyz-wxyz-xyz'])
+
+    @override_settings(BOT_EVENTS_BUFFER_SIZE=2)
+    def test_slow_subscriber_drops_the_oldest_events(self):
+        publisher = EventPublisher(shared=False)
+
+        async def receive():
+            subscription = publisher.subscribe()
+            for n in range(5):
+                publisher.publish('phase', MEETING, n=n)
+            return subscription, await subscription.get(timeout=1)
+
+        subscription, events = asyncio.run(receive())
+        self.assertEqual([event['data']['n'] for event in events], [3, 4])
+        self.assertEqual(subscription.dropped, 3)
+
+    def test_unsubscribed_and_closed_subscribers_get_nothing(self):
+        publisher = EventPublisher(shared=False)
+
+        async def receive():
+            gone = publisher.subscribe()
+            publisher.unsubscribe(gone)
+            publisher.publish('joined', MEETING)
+            return await gone.get(timeout=0.05), publisher.subscribe()
+
+        events, closed = asyncio.run(receive())
+        self.assertEqual(events, [])
+
+        # Its loop is closed now, so the next event removes it
+        publisher.publish('left', MEETING)
+        self.assertNotIn(closed, publisher._subscriptions)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'bot events cross processes through PostgreSQL NOTIFY')
+class SharedEventPublisherTests(TransactionTestCase):
+    def test_events_reach_subscribers_through_notify(self):
+        publisher = EventPublisher()
+        self.addCleanup(publisher.stop, 5)
+
+        async def receive():
+            subscription = publisher.subscribe(MEETING)
+            listening = await asyncio.get_running_loop().run_in_executor(None, publisher._listening.wait, 5)
+            # Sent from the sender thread's own connection, as a bot in another process would
+            publisher.publish('joined', MEETING, attempt=1)
+            return listening, await subscription.get(timeout=5)
+
+        listening, events = asyncio.run(receive())
+        self.assertTrue(listening)
+        self.assertEqual(len(events), 1)
+        self.assertEqual((events[0]['type'], events[0]['meeting']), ('joined', 'abc-defg-hij'))
+        self.assertEqual(events[0]['data'], {'attempt': 1})
+
+
+@mock.patch.object(AdmissionController, '_host_load', return_value=(None, None, None))
+class AdmissionControllerTests(SimpleTestCase):
+    def test_admits_up_to_the_budget(self, _):
+        controller = AdmissionController(budget=2)
+        first = controller.admit('https://meet.google.com/aaa-aaaa-aaa', 1)
+        controller.admit('https://meet.google.com/bbb-bbbb-bbb', 2)
+        self.assertEqual(controller.available(), 0)
+
+        admitted = threading.Event()
+        waiter = threading.Thread(
+            target=lambda: controller.admit('https://meet.google.com/ccc-cccc-ccc', 3) and admitted.set()
+        )
+        waiter.start()
+        self.assertFalse(admitted.wait(0.2))
+
+        controller.release(first)
+        self.assertTrue(admitted.wait(5))
+        waiter.join()
+
+    def test_waiting_requests_are_admitted_in_start_order(self, _):
+        controller = AdmissionController(budget=1)
+        running = controller.admit('https://meet.google.com/aaa-aaaa-aaa', 1)
+        admitted = []
+        now = timezone.now()
+        controller._request('https://meet.google.com/ccc-cccc-ccc', 3, now + timedelta(minutes=10),
+                            lambda: admitted.append(3))
+        controller._request('https://meet.google.com/bbb-bbbb-bbb', 2, now + timedelta(minutes=5),
+                            lambda: admitted.append(2))
+
+        controller.release(running)
+        self.assertEqual(admitted, [2])
+
+    def test_merges_joins_of_the_same_meeting(self, _):
+        controller = AdmissionController(budget=2)
+        primary = controller.admit('https://meet.google.com/aaa-aaaa-aaa', 1)
+        merged = controller.admit('https://meet.google.com/aaa-aaaa-aaa?authuser=1', 2)
+        self.assertIs(merged.merged_into, primary)
+        self.assertEqual(controller.available(), 1)
+
+        # Releasing the merged join frees nothing; releasing the primary ends the merge
+        controller.release(merged)
+        self.assertEqual(controller.available(), 1)
+        controller.release(primary)
+        self.assertIsNone(controller.admit('https://meet.google.com/aaa-aaaa-aaa', 3).merged_into)
+
+    def test_available_counts_reserved_jobs(self, _):
+        controller = AdmissionController(budget=3)
+        controller.admit('https://meet.google.com/aaa-aaaa-aaa', 1)
+        self.assertEqual(controller.available(1), 1)
+        self.assertEqual(controller.available(5), 0)
@@ -1,19 +1,24 @@
-import csv
 import os
+import json
 import secrets
+from datetime import datetime
 
 import pytz
 from django.shortcuts import redirect
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from google_auth_oauthlib.flow import Flow
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
-from google.auth.transport.requests import Request
-from google.auth.exceptions import RefreshError
-from .models import OAuthToken
-from .playwright_google_meet import GoogleMeetAutomation
+from .admission import admission_controller
+from .calendar_service import build_calendar_service, service_cache
+from .calendar_sync import export_meetings_csv, sync_calendars_to_db
+from .calendar_watch import handle_notification
+from .credentials import credential_manager, resolve_account
+from .events import event_publisher
+from .meeting_jobs import meeting_job_runner
+from .models import MeetingJob, OAuthToken
 
 
 def get_flow():
@@ -51,161 +56,82 @@ def google_callback(request):
         if expiry.tzinfo is None:
             expiry = timezone.make_aware(expiry)
 
-        # Clear existing tokens and save new one
-        OAuthToken.objects.all().delete()
-        token_entry = OAuthToken.objects.create(
-            token=credentials.token,
-            refresh_token=credentials.refresh_token or '',
-            token_uri=credentials.token_uri,
-            client_id=credentials.client_id,
-            client_secret=credentials.client_secret,
-            scopes=','.join(credentials.scopes) if isinstance(credentials.scopes, list) else credentials.scopes,
-            universe_domain=getattr(credentials, 'universe_domain', ''),
-            account=getattr(credentials, 'account', ''),
-            expiry=expiry
+        # The primary calendar id is the account's email address
+        account = build_calendar_service(credentials).calendarList().get(calendarId='primary').execute()['id']
+
+        # Save or replace this account's token, leaving other accounts untouched
+        token_entry, _ = OAuthToken.objects.update_or_create(
+            account=account,
+            defaults=dict(
+                token=credentials.token,
+                refresh_token=credentials.refresh_token or '',
+                token_uri=credentials.token_uri,
+                client_id=credentials.client_id,
+                client_secret=credentials.client_secret,
+                scopes=','.join(credentials.scopes) if isinstance(credentials.scopes, list) else credentials.scopes,
+                universe_domain=getattr(credentials, 'universe_domain', ''),
+                expiry=expiry
+            )
         )
 
-        print(f"New token saved. Expiry: {expiry}")
-        return JsonResponse({"message": "Authentication successful", "token_id": token_entry.id})
+        # Drop credentials and Calendar services built with this account's previous grant
+        credential_manager.invalidate(account)
+        service_cache.invalidate(account)
+
+        print(f"New token saved for {account}. Expiry: {expiry}")
+        return JsonResponse({"message": "Authentication successful", "token_id": token_entry.id, "account": account})
 
     except Exception as e:
         print(f"Error in callback: {str(e)}")
         return JsonResponse({"error": str(e)}, status=500)
 
 
-from django.utils import timezone
-from datetime import datetime, timezone as dt_timezone
-
-from google.auth import _helpers
-
-
-def get_stored_credentials():
-    try:
-        latest_token = OAuthToken.objects.latest('id')
-
-        # Ensure expiry is timezone-aware
-        expiry = latest_token.get_expiry()  # Use the model method
-        expiry = expiry.replace(tzinfo=None)
-        credentials = Credentials(
-            token=latest_token.token,
-            refresh_token=latest_token.refresh_token,
-            token_uri=latest_token.token_uri,
-            client_id=latest_token.client_id,
-            client_secret=latest_token.client_secret,
-            scopes=latest_token.scopes.split(',') if isinstance(latest_token.scopes, str) else latest_token.scopes,
-            expiry=expiry
-        )
-        return credentials
-    except OAuthToken.DoesNotExist:
-        return None
+def get_stored_credentials(account=None):
+    """Return cached, refreshed-ahead credentials for ``account`` (latest signed-in account when None)."""
+    return credential_manager.get(account)
 
 
 def extract_meeting_details(request):
-    """Extract meeting details from Google Calendar and save to CSV, avoiding duplicates."""
-    credentials = get_stored_credentials()
+    """Extract meeting details from Google Calendar and upsert them into the Meeting table."""
+    account = resolve_account(request.GET.get('account'))
+    credentials = get_stored_credentials(account) if account else None
     print(f"\n{'=' * 50}")
-    print(f"Calendar check started at: {datetime.now()}")
+    print(f"Calendar check started at: {datetime.now()} for account: {account}")
 
     if not credentials:
         print("No credentials found!")
         return JsonResponse({"error": "User not authenticated"}, status=401)
 
     try:
-        # Initialize the Calendar API service
-        service = build("calendar", "v3", credentials=credentials)
         now = datetime.now(pytz.UTC)
 
-        print(f"Checking for events after: {now}")
-
-        # Fetch events from Google Calendar
-        events_result = service.events().list(
-            calendarId='primary',
-            timeMin=now.isoformat(),
-            maxResults=10,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-
-        events = events_result.get('items', [])
-        print(f"Found {len(events)} upcoming events")
-
-        # Debug: Print each event found
-        for event in events:
-            print(f"Event: {event.get('summary')} at {event.get('start', {}).get('dateTime')}")
-
-        meeting_details = []
-        csv_filepath = 'meeting_invites.csv'
-
-        # Define CSV headers
-        csv_headers = ['Summary', 'Start Time', 'End Time', 'Meet Link', 'Conference URI']
-
-        print(f"Writing to CSV: {os.path.abspath(csv_filepath)}")
-
-        # Read existing entries to avoid duplicates
-        existing_entries = set()
-        if os.path.exists(csv_filepath):
-            with open(csv_filepath, 'r', newline='', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    # Create a tuple of values to use as a unique identifier
-                    entry_key = (
-                        row['Summary'],
-                        row['Start Time'],
-                        row['End Time'],
-                        row['Meet Link'],
-                        row['Conference URI']
-                    )
-                    existing_entries.add(entry_key)
-            print(f"Found {len(existing_entries)} existing entries in CSV")
-        else:
-            # Create new file with headers if it doesn't exist
-            with open(csv_filepath, 'w', newline='', encoding='utf-8') as file:
-                writer = csv.DictWriter(file, fieldnames=csv_headers)
-                writer.writeheader()
-                print("Created new CSV file with headers")
-
-        # Append new, non-duplicate entries to CSV file
-        new_entries_count = 0
-        with open(csv_filepath, mode='a', newline='', encoding='utf-8') as file:
-            writer = csv.DictWriter(file, fieldnames=csv_headers)
-
-            for event in events:
-                meeting_info = {
-                    'Summary': event.get('summary', 'No Title'),
-                    'Start Time': event.get('start', {}).get('dateTime', ''),
-                    'End Time': event.get('end', {}).get('dateTime', ''),
-                    'Meet Link': event.get('hangoutLink', ''),
-                    'Conference URI': event.get('conferenceData', {})
-                    .get('entryPoints', [{}])[0].get('uri', '')
-                }
-
-                # Check if this entry already exists
-                entry_key = (
-                    meeting_info['Summary'],
-                    meeting_info['Start Time'],
-                    meeting_info['End Time'],
-                    meeting_info['Meet Link'],
-                    meeting_info['Conference URI']
-                )
-
-                if entry_key not in existing_entries:
-                    meeting_details.append(meeting_info)
-                    writer.writerow(meeting_info)
-                    existing_entries.add(entry_key)
-                    new_entries_count += 1
-                    print(f"Wrote new event: {meeting_info['Summary']}")
-                else:
-                    print(f"Skipped duplicate event: {meeting_info['Summary']}")
-
-        print(f"Added {new_entries_count} new events to CSV")
+        # Fetch only the events changed since the last run (full resync when needed) from
+        # every configured calendar concurrently and bulk upsert them into the Meeting table
+        sync_result = sync_calendars_to_db(credentials, account)
+
+        total_events = sync_result['total_events']
+        upserted_count = sync_result['upserted']
+        cancelled_event_ids = sync_result['cancelled_event_ids']
+        print(f"Upserted {upserted_count} events, cancelled {len(cancelled_event_ids)} events "
+              f"from calendars {sync_result['calendars']} (full sync: {sync_result['full_sync']})")
+
+        # Optional legacy CSV export of upcoming meetings
+        csv_filepath = getattr(settings, 'MEETING_CSV_EXPORT', None)
+        if csv_filepath:
+            export_meetings_csv(csv_filepath)
+            print(f"Exported upcoming meetings to CSV: {os.path.abspath(csv_filepath)}")
+
         print(f"{'=' * 50}\n")
 
         # Return JSON response with results
         return JsonResponse({
-            "meetings": meeting_details,
-            "total_events_found": len(events),
-            "new_events_added": new_entries_count,
-            "message": f"Found {len(events)} events, added {new_entries_count} new events to CSV",
+            "total_events_found": total_events,
+            "events_upserted": upserted_count,
+            "cancelled_event_ids": cancelled_event_ids,
+            "account": account,
+            "calendars": sync_result['calendars'],
+            "full_sync": sync_result['full_sync'],
+            "message": f"Found {total_events} events, upserted {upserted_count} meetings",
             "timestamp": now.isoformat()
         })
 
@@ -220,32 +146,110 @@ def extract_meeting_details(request):
         }, status=500)
 
 
+@csrf_exempt
+def calendar_notification_view(request):
+    """Receive Google Calendar push notifications and trigger an incremental sync"""
+    if request.method != 'POST':
+        return JsonResponse({"error": "POST method required"}, status=405)
+
+    status, message = handle_notification(request.headers)
+    return JsonResponse({"message": message}, status=status)
+
+
 @csrf_exempt
 def join_meeting_view(request):
-    """Django view to trigger Google Meet automation"""
+    """
+    Queue a bot for a Google Meet (POST) or list what is running or late (GET).
+
+    GET also reports admission control: live and waiting bots, host load and
+    recent launch waits.
+
+    POST takes ``meeting_link`` and an optional ISO ``start_at`` as JSON or
+    form data and returns the MeetingJob straight away; the meeting itself
+    runs on the background job runner.
+    """
+    if request.method == 'GET':
+        jobs = MeetingJob.objects.running_or_late()[:500]
+        return JsonResponse({"jobs": [job.as_dict() for job in jobs], "admission": admission_controller.stats()})
+    if request.method != 'POST':
+        return JsonResponse({"error": "GET or POST method required"}, status=405)
+
+    try:
+        data = json.loads(request.body) if request.content_type == 'application/json' else request.POST
+    except ValueError:
+        return JsonResponse({"status": "error", "message": "Invalid JSON body"}, status=400)
+
+    start_at = None
+    if data.get('start_at'):
+        start_at = parse_datetime(data['start_at'])
+        if start_at is None:
+            return JsonResponse({"status": "error", "message": "Invalid start_at"}, status=400)
+        if timezone.is_naive(start_at):
+            start_at = timezone.make_aware(start_at)
+
+    try:
+        job = meeting_job_runner.submit(data.get('meeting_link'), start_at)
+    except ValueError as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=400)
+
+    return JsonResponse(job.as_dict(), status=202)
+
+
+@csrf_exempt
+def meeting_job_view(request, job_id):
+    """Status of a meeting job (GET) or cancel it (DELETE)"""
+    if request.method not in ('GET', 'DELETE'):
+        return JsonResponse({"error": "GET or DELETE method required"}, status=405)
+
+    if request.method == 'DELETE':
+        # Whichever process holds the job stops its bot at its next lease heartbeat;
+        # a queued job is simply never claimed
+        if MeetingJob.transition(job_id, MeetingJob.STATUS_FAILED, 'cancelled'):
+            meeting_job_runner.cancel(job_id)
+        elif MeetingJob.objects.filter(pk=job_id).exists():
+            return JsonResponse({"status": "error", "message": "Job already finished"}, status=409)
+
+    job = MeetingJob.objects.filter(pk=job_id).first()
+    if job is None:
+        return JsonResponse({"status": "error", "message": "Unknown job"}, status=404)
+    return JsonResponse(job.as_dict())
+
+
+def _format_event(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def _event_stream(meeting):
+    subscription = event_publisher.subscribe(meeting)
+    try:
+        # Open the stream right away so proxies and clients see the response start
+        yield ": connected\n\n"
+        while True:
+            events = await subscription.get(timeout=getattr(settings, 'BOT_EVENTS_HEARTBEAT_SECONDS', 15))
+            if not events:
+                yield ": heartbeat\n\n"
+                continue
+            yield ''.join(_format_event(event) for event in events)
+    finally:
+        event_publisher.unsubscribe(subscription)
+
+
+async def bot_events_view(request):
+    """
+    Stream live bot events as Server-Sent Events.
+
+    ``?meeting=`` (a Meet link or code) limits the stream to one meeting.
+    Bots in every process publish through Postgres NOTIFY (see
+    EventPublisher), so this shows the scheduler's and workers' bots too.
+    Serve it through ASGI.
+    """
     if request.method != 'GET':
         return JsonResponse({"error": "GET method required"}, status=405)
 
-    try:
-        google_meet = GoogleMeetAutomation()
-        response = google_meet.join_google_meet()
-        google_meet.close_browser()
-
-        if response["status"] == "success":
-            return JsonResponse({
-                "status": "success",
-                "message": response["message"]
-            })
-        else:
-            return JsonResponse({
-                "status": "error",
-                "message": response["message"]
-            }, status=500)
-    except Exception as e:
-        return JsonResponse({
-            "status": "error",
-            "message": str(e)
-        }, status=500)
+    response = StreamingHttpResponse(_event_stream(request.GET.get('meeting')), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
 def cleanup_old_files(directory, max_files=10):
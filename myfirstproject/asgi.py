@@ -5,6 +5,13 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+
+The live bot event stream (auth/playwright/events/) is a long-lived async
+response; serve it with an ASGI server, e.g.
+
+    uvicorn myfirstproject.asgi:application
+
+Under WSGI every open stream would hold a worker thread.
 """
 
 import os
@@ -17,6 +17,21 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 GOOGLE_CLIENT_SECRET_FILE = os.path.join(BASE_DIR, "client_secret.json")
 GOOGLE_REDIRECT_URI = "https://e68f-2401-4900-87f7-734a-7ca3-e0d9-dfd8-fb8f.ngrok-free.app/auth/google/callback/"  # Update with ngrok URL
 GOOGLE_SCOPES = ['https://www.googleapis.com/auth/calendar.readonly']
+# Calendars read for accounts without their own OAuthToken.calendar_ids list
+GOOGLE_CALENDAR_IDS = ['primary']
+# Maximum number of calendars fetched concurrently
+CALENDAR_FETCH_WORKERS = 8
+# Fetch recurring series as masters (RRULE/EXDATE + exceptions) and expand them locally
+# instead of receiving every occurrence from the API (singleEvents=True)
+CALENDAR_EXPAND_RECURRENCE_LOCALLY = False
+# Occurrences of locally expanded series are materialised this many days ahead
+CALENDAR_RECURRENCE_HORIZON_DAYS = 14
+# OAuth access tokens are refreshed in the background this many seconds before they expire
+GOOGLE_TOKEN_REFRESH_AHEAD_SECONDS = 300
+# Public HTTPS address Google pushes Calendar change notifications to
+CALENDAR_WEBHOOK_URL = "https://e68f-2401-4900-87f7-734a-7ca3-e0d9-dfd8-fb8f.ngrok-free.app/auth/google/calendar/notifications/"  # Update with ngrok URL
+# Watch channels expiring within this many hours are replaced by renew_calendar_watches
+CALENDAR_WATCH_RENEW_BEFORE_HOURS = 24
 os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -139,10 +154,108 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 CSRF_USE_SESSIONS = True
 CSRF_COOKIE_SAMESITE = 'None'
+# Optional legacy export of upcoming meetings (e.g. 'meeting_invites.csv'); None disables it
+MEETING_CSV_EXPORT = None
+
+# Calendar polling engine (poll_calendars): every account is polled once per interval,
+# accounts are spread over the slots and at most CALENDAR_POLL_WORKERS polls run at once
+CALENDAR_POLL_INTERVAL_SECONDS = 300
+CALENDAR_POLL_SLOTS = 60
+CALENDAR_POLL_WORKERS = 8
+
+# 'daemon': joins are fired by the resident `manage.py run_scheduler` process.
+# 'queue': run_scheduler only queues MeetingJob rows; `manage.py bot_worker` processes on
+#          any number of hosts claim and join them.
+# 'cron': legacy mode, one crontab entry per meeting (see setup_meeting_crons).
+MEETING_SCHEDULER_BACKEND = 'daemon'
+# run_scheduler: how often changed meetings are picked up, how far ahead meetings are
+# held in memory and how many joins may run at the same time
+MEETING_SCHEDULER_REFRESH_SECONDS = 2
+MEETING_SCHEDULER_LOOKAHEAD_HOURS = 24
+MEETING_SCHEDULER_MAX_CONCURRENT = None  # None: one per admitted bot (MEET_BOT_MAX_BOTS)
+# Seconds before the start time the browser is launched and parked on the meeting page,
+# so only the join click is left at start time (0 launches at start time)
+MEETING_PREWARM_SECONDS = 60
+# Low-footprint bots for servers without a display: new headless Chromium with fake
+# camera/mic (switched off before joining), images/fonts/analytics blocked and a small
+# viewport so Meet sends the lowest video resolutions
+MEET_BOT_PRODUCTION_MODE = False
+
+# Keep a Chromium profile per calendar account (up to PROFILE_SLOTS meetings of one account
+# at a time) so Meet's HTTP and V8 code caches survive between joins. Such meetings launch
+# their own browser instead of using the pool. Caches are cleared once a profile grows
+# past PROFILE_MAX_MB.
+MEET_BOT_PERSISTENT_PROFILE = False
+MEET_BOT_PROFILE_DIR = os.path.join(BASE_DIR, '.browser_profiles')
+MEET_BOT_PROFILE_SLOTS = 2
+MEET_BOT_PROFILE_MAX_MB = 500
+
+# Long-lived Chromium processes shared by concurrent meetings, each meeting gets its own
+# context (0 launches a browser per meeting). A browser is replaced after MAX_USES
+# meetings or once its process tree uses more than MAX_RSS_MB (needs psutil). A meeting
+# that finds no browser to share waits up to WAIT_SECONDS, then launches one of its own.
+BROWSER_POOL_SIZE = 2
+BROWSER_POOL_MAX_USES = 20
+BROWSER_POOL_MAX_RSS_MB = 2048
+BROWSER_POOL_WAIT_SECONDS = 60
+
 CRONJOBS = [
-    ('50 18 * * *', 'google_auth.management.commands.extract_calendar_events.Command.handle'),
+    # Daily safety-net sync of every account; changes normally arrive through push notifications
+    ('50 18 * * *', 'django.core.management.call_command', ['poll_calendars', '--once']),
+    ('0 * * * *', 'django.core.management.call_command', ['renew_calendar_watches']),
 ]
 
+# Meetings started through the join-meeting API run as jobs on a background event loop
+# sharing one browser; at most this many are attended at the same time
+MEETING_JOB_MAX_CONCURRENT = 20
+
+# Admission control in front of every bot launch in a process: at most MAX_BOTS browsers,
+# and another one only while host memory (counting EXPECTED_MB for each bot still starting)
+# and CPU stay under their limits (needs psutil). Joins for a meeting that already has a
+# bot are merged into it (bot workers also check other hosts' bots), and get a bot of their
+# own if that one fails or leaves before their start; the rest wait in start time order.
+# The budget is per process: on a host running bots, run them from one process (e.g. one
+# bot_worker with the queue backend) for the budget to cover the whole host.
+MEET_BOT_MAX_BOTS = 4
+MEET_BOT_MAX_MEMORY_PERCENT = 85
+MEET_BOT_MAX_CPU_PERCENT = 90
+MEET_BOT_EXPECTED_MB = 400
+
+# Bot workers (queue backend) poll the queue every POLL_SECONDS. Every process running
+# bots (workers, run_scheduler, the web job API) renews its jobs' leases every
+# HEARTBEAT_SECONDS. A job whose lease was not renewed for LEASE_SECONDS (its process
+# died) is re-queued for another worker, up to MAX_ATTEMPTS claims; without the queue
+# backend it is marked failed.
+MEETING_QUEUE_POLL_SECONDS = 2
+MEETING_QUEUE_HEARTBEAT_SECONDS = 10
+MEETING_QUEUE_LEASE_SECONDS = 30
+MEETING_QUEUE_MAX_ATTEMPTS = 3
+
+# Live bot events (auth/playwright/events/): each subscriber keeps at most BUFFER_SIZE
+# unread events, dropping the oldest, and gets a keep-alive comment every HEARTBEAT_SECONDS.
+# Bots in any process (web, run_scheduler, bot_worker) reach it through Postgres NOTIFY
+BOT_EVENTS_BUFFER_SIZE = 100
+BOT_EVENTS_HEARTBEAT_SECONDS = 15
+
+# Bot screenshots: 'off', 'on_failure' or 'phases' (prejoin, joined, ended and failures).
+# Viewport JPEGs are written in the background to SCREENSHOT_DIR/<meeting code>/, keeping
+# the newest SCREENSHOT_KEEP per meeting.
+MEET_BOT_SCREENSHOTS = 'on_failure'
+MEET_BOT_SCREENSHOT_QUALITY = 50
+MEET_BOT_SCREENSHOT_DIR = os.path.join(BASE_DIR, 'screenshots')
+MEET_BOT_SCREENSHOT_KEEP = 10
+
+# Browser console messages and page errors of the bots (see google_auth.log_pipeline).
+# They are written from a background thread to their own size-rotated file. Only
+# messages at or above LOG_LEVEL are kept, at most RATE_PER_MINUTE per message type,
+# and identical repeats within DEDUP_SECONDS are collapsed.
+MEET_BOT_CONSOLE_LOG_FILE = os.path.join(BASE_DIR, 'browser_console.log')
+MEET_BOT_CONSOLE_LOG_LEVEL = 'WARNING'
+MEET_BOT_CONSOLE_LOG_MAX_BYTES = 10 * 1024 * 1024
+MEET_BOT_CONSOLE_LOG_BACKUPS = 3
+MEET_BOT_CONSOLE_RATE_PER_MINUTE = 30
+MEET_BOT_CONSOLE_DEDUP_SECONDS = 30
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -155,8 +268,10 @@ LOGGING = {
     'handlers': {
         'file': {
             'level': 'DEBUG',
-            'class': 'logging.FileHandler',
+            'class': 'logging.handlers.RotatingFileHandler',
             'filename': 'google_meet_automation.log',
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
             'formatter': 'verbose',
         },
         'console': {
@@ -171,6 +286,61 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': True,
         },
+        'google_auth.admission': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': True,
+        },
+        'google_auth.bot_worker': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': True,
+        },
+        'google_auth.events': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': True,
+        },
+        'google_auth.meeting_jobs': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': True,
+        },
+        'google_auth.screenshots': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': True,
+        },
+        'google_auth.log_pipeline': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': True,
+        },
+        'google_auth.browser_pool': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': True,
+        },
+        'google_auth.scheduler': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': True,
+        },
+        'google_auth.polling': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': True,
+        },
+        'google_auth.calendar_watch': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': True,
+        },
+        'google_auth.calendar_sync': {
+            'handlers': ['file', 'console'],
+            'level': 'INFO',
+            'propagate': True,
+        },
         'django': {
             'handlers': ['file', 'console'],
             'level': 'INFO',
@@ -4,12 +4,18 @@ from google_auth.views import (
     google_login,
     google_callback,
     extract_meeting_details,
-    join_meeting_view
+    calendar_notification_view,
+    join_meeting_view,
+    meeting_job_view,
+    bot_events_view
 )
 
 urlpatterns = [
     path('auth/google/login/', google_login, name='google_login'),
     path('auth/google/callback/', google_callback, name='google_callback'),
     path('auth/google/calendar/', extract_meeting_details, name='google_calendar'),
+    path('auth/google/calendar/notifications/', calendar_notification_view, name='calendar_notifications'),
     path('auth/playwright/join-meeting/', join_meeting_view, name='join_google_meet'),
+    path('auth/playwright/join-meeting/<int:job_id>/', meeting_job_view, name='meeting_job'),
+    path('auth/playwright/events/', bot_events_view, name='bot_events'),
 ]
\ No newline at end of file